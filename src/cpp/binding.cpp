@@ -1,6 +1,7 @@
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
 #include "nash_solver.h"
+#include "game_reduction.h"
 
 namespace py = pybind11;
 
@@ -9,5 +10,30 @@ PYBIND11_MODULE(nash_solver, m) {
     
     m.def("solve_zero_sum_game", &solve_zero_sum_game, 
           "Solve a two-player zero-sum game using fictitious play",
-          py::arg("payoff_matrix"));
+          py::arg("payoff_matrix"),
+          py::call_guard<py::gil_scoped_release>());
+
+    m.def("solve_zero_sum_game_anytime", &solve_zero_sum_game_anytime,
+          "Fictitious play bounded by a time budget; returns (strategy, iterations, converged)",
+          py::arg("payoff_matrix"),
+          py::arg("time_budget_ms"),
+          py::call_guard<py::gil_scoped_release>());
+
+    py::class_<ReducedSolution>(m, "ReducedSolution")
+        .def_readonly("strategy", &ReducedSolution::strategy)
+        .def_readonly("original_rows", &ReducedSolution::original_rows)
+        .def_readonly("original_cols", &ReducedSolution::original_cols)
+        .def_readonly("reduced_rows", &ReducedSolution::reduced_rows)
+        .def_readonly("reduced_cols", &ReducedSolution::reduced_cols)
+        .def_readonly("iterations", &ReducedSolution::iterations)
+        .def_readonly("converged", &ReducedSolution::converged);
+
+    m.def("solve_zero_sum_game_reduced", &solve_zero_sum_game_reduced,
+          "Eliminate dominated and duplicate strategies, solve the reduced game and expand "
+          "the strategy back to the original rows; a negative time budget means no limit",
+          py::arg("payoff_matrix"),
+          py::arg("time_budget_ms") = -1.0,
+          py::arg("weak") = true,
+          py::arg("tolerance") = 1e-9,
+          py::call_guard<py::gil_scoped_release>());
 }
\ No newline at end of file
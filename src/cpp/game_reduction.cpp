@@ -0,0 +1,166 @@
+#include "game_reduction.h"
+#include "nash_solver.h"
+#include <cmath>
+
+namespace {
+
+enum class Comparison { Dominated, Duplicate, None };
+
+// Compares strategy a against strategy b over the live opponent strategies.
+// For rows the player maximises (sign = 1); for columns it minimises (sign = -1).
+Comparison compare(const std::vector<std::vector<double>>& m, int a, int b,
+                   const std::vector<int>& live, bool rows, double sign,
+                   bool weak, double tolerance) {
+    bool all_equal = true;
+    bool any_strictly_better = false;
+    bool all_strictly_better = true;
+
+    for (int k : live) {
+        double va = rows ? m[a][k] : m[k][a];
+        double vb = rows ? m[b][k] : m[k][b];
+        double diff = sign * (vb - va);  // > 0 when b is better than a here
+
+        if (diff < -tolerance) {
+            return Comparison::None;
+        }
+        if (diff > tolerance) {
+            any_strictly_better = true;
+            all_equal = false;
+        } else {
+            all_strictly_better = false;
+            if (std::fabs(diff) > tolerance) {
+                all_equal = false;
+            }
+        }
+    }
+
+    if (all_equal) {
+        return Comparison::Duplicate;
+    }
+    if (weak ? any_strictly_better : all_strictly_better) {
+        return Comparison::Dominated;
+    }
+    return Comparison::None;
+}
+
+// One elimination sweep over rows or columns; returns true if anything was removed.
+bool sweep(const std::vector<std::vector<double>>& m, std::vector<int>& own,
+           const std::vector<int>& other, std::vector<int>& representative,
+           bool rows, bool weak, double tolerance) {
+    double sign = rows ? 1.0 : -1.0;
+
+    for (size_t ai = 0; ai < own.size(); ++ai) {
+        for (size_t bi = 0; bi < own.size(); ++bi) {
+            if (ai == bi) {
+                continue;
+            }
+            int a = own[ai];
+            int b = own[bi];
+            Comparison result = compare(m, a, b, other, rows, sign, weak, tolerance);
+
+            // Merge duplicates into the earlier strategy only, so each pair is merged once
+            if (result == Comparison::Dominated || (result == Comparison::Duplicate && b < a)) {
+                for (int& rep : representative) {
+                    if (rep == a) {
+                        rep = result == Comparison::Duplicate ? b : -1;
+                    }
+                }
+                own.erase(own.begin() + ai);
+                return true;
+            }
+        }
+    }
+    return false;
+}
+
+}  // namespace
+
+void reduce_game(const std::vector<std::vector<double>>& payoff_matrix, bool weak, double tolerance,
+                 std::vector<int>& kept_rows, std::vector<int>& kept_cols,
+                 std::vector<int>& row_representative) {
+    int n_rows = payoff_matrix.size();
+    int n_cols = n_rows > 0 ? payoff_matrix[0].size() : 0;
+
+    kept_rows.resize(n_rows);
+    kept_cols.resize(n_cols);
+    row_representative.resize(n_rows);
+    std::vector<int> col_representative(n_cols);
+
+    for (int i = 0; i < n_rows; ++i) {
+        kept_rows[i] = i;
+        row_representative[i] = i;
+    }
+    for (int j = 0; j < n_cols; ++j) {
+        kept_cols[j] = j;
+        col_representative[j] = j;
+    }
+
+    bool changed = n_cols > 0;
+    while (changed) {
+        changed = false;
+        while (kept_rows.size() > 1 &&
+               sweep(payoff_matrix, kept_rows, kept_cols, row_representative, true, weak, tolerance)) {
+            changed = true;
+        }
+        while (kept_cols.size() > 1 &&
+               sweep(payoff_matrix, kept_cols, kept_rows, col_representative, false, weak, tolerance)) {
+            changed = true;
+        }
+    }
+}
+
+ReducedSolution solve_zero_sum_game_reduced(const std::vector<std::vector<double>>& payoff_matrix,
+                                            double time_budget_ms, bool weak, double tolerance) {
+    ReducedSolution solution;
+    solution.original_rows = payoff_matrix.size();
+    solution.original_cols = solution.original_rows > 0 ? payoff_matrix[0].size() : 0;
+
+    if (solution.original_rows == 0 || solution.original_cols == 0) {
+        return solution;
+    }
+
+    std::vector<int> kept_rows, kept_cols, row_representative;
+    reduce_game(payoff_matrix, weak, tolerance, kept_rows, kept_cols, row_representative);
+    solution.reduced_rows = kept_rows.size();
+    solution.reduced_cols = kept_cols.size();
+
+    std::vector<std::vector<double>> reduced(kept_rows.size(), std::vector<double>(kept_cols.size()));
+    for (size_t i = 0; i < kept_rows.size(); ++i) {
+        for (size_t j = 0; j < kept_cols.size(); ++j) {
+            reduced[i][j] = payoff_matrix[kept_rows[i]][kept_cols[j]];
+        }
+    }
+
+    std::vector<double> reduced_strategy;
+    if (kept_rows.size() == 1) {
+        // A single surviving row is the exact solution; no need to iterate
+        reduced_strategy.assign(1, 1.0);
+    } else if (time_budget_ms < 0) {
+        reduced_strategy = solve_zero_sum_game(reduced);
+        solution.iterations = -1;
+    } else {
+        std::tie(reduced_strategy, solution.iterations, solution.converged) =
+            solve_zero_sum_game_anytime(reduced, time_budget_ms);
+    }
+
+    std::vector<double> kept_probability(solution.original_rows, 0.0);
+    std::vector<int> group_size(solution.original_rows, 0);
+    for (size_t i = 0; i < kept_rows.size(); ++i) {
+        kept_probability[kept_rows[i]] = reduced_strategy[i];
+    }
+    for (int rep : row_representative) {
+        if (rep >= 0) {
+            group_size[rep] += 1;
+        }
+    }
+
+    solution.strategy.assign(solution.original_rows, 0.0);
+    for (int i = 0; i < solution.original_rows; ++i) {
+        int rep = row_representative[i];
+        if (rep >= 0) {
+            solution.strategy[i] = kept_probability[rep] / group_size[rep];
+        }
+    }
+
+    return solution;
+}
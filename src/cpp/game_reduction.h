@@ -0,0 +1,30 @@
+#pragma once
+#include <vector>
+
+// Result of solving a game after iterated elimination of dominated strategies.
+// strategy is indexed by the rows of the original matrix.
+struct ReducedSolution {
+    std::vector<double> strategy;
+    int original_rows = 0;
+    int original_cols = 0;
+    int reduced_rows = 0;
+    int reduced_cols = 0;
+    int iterations = 0;
+    bool converged = true;
+};
+
+// Removes rows and columns that are strictly (or, with weak = true, weakly)
+// dominated, repeating until nothing changes, and merges duplicate rows and
+// columns. kept_rows/kept_cols are original indices; row_representative maps
+// every original row to the kept row standing in for it, or -1 if eliminated.
+void reduce_game(const std::vector<std::vector<double>>& payoff_matrix, bool weak, double tolerance,
+                 std::vector<int>& kept_rows, std::vector<int>& kept_cols,
+                 std::vector<int>& row_representative);
+
+// Reduces the game, solves the smaller matrix, and expands the strategy back
+// to the original rows (merged duplicates share their row's probability).
+// A negative time_budget_ms runs the solver to completion. A game that
+// reduces to a single row is solved exactly, whatever the budget.
+ReducedSolution solve_zero_sum_game_reduced(const std::vector<std::vector<double>>& payoff_matrix,
+                                            double time_budget_ms, bool weak = true,
+                                            double tolerance = 1e-9);
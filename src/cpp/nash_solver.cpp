@@ -2,8 +2,17 @@
 #include <algorithm>
 #include <numeric>
 #include <cmath>
+#include <chrono>
 
-std::vector<double> solve_zero_sum_game(const std::vector<std::vector<double>>& payoff_matrix) {
+namespace {
+
+// Fictitious play. Stops after max_iterations, or once the deadline passes
+// when one is given; iterations_run and timed_out report how far it got.
+std::vector<double> fictitious_play(const std::vector<std::vector<double>>& payoff_matrix,
+                                    const std::chrono::steady_clock::time_point* deadline,
+                                    int& iterations_run, bool& timed_out) {
+    iterations_run = 0;
+    timed_out = false;
     int n_rows = payoff_matrix.size();
 
     if (n_rows == 0) {
@@ -23,7 +32,14 @@ std::vector<double> solve_zero_sum_game(const std::vector<std::vector<double>>&
     const double convergence_threshold = 1e-6;
 
     for (int iter = 0; iter < max_iterations; ++iter) {
-        // Best response for column player
+        // Checking the clock every iteration would dominate small matrices
+        if (deadline && (iter & 15) == 0 && std::chrono::steady_clock::now() >= *deadline) {
+            timed_out = true;
+            break;
+        }
+        iterations_run = iter + 1;
+
+        // Best response for column player, who receives the negated payoff
         std::vector<double> col_payoffs(n_cols, 0.0);
         for (int j = 0; j < n_cols; ++j) {
             for (int i = 0; i < n_rows; ++i) {
@@ -31,7 +47,7 @@ std::vector<double> solve_zero_sum_game(const std::vector<std::vector<double>>&
             }
         }
 
-        int best_col = std::min_element(col_payoffs.begin(), col_payoffs.end()) - col_payoffs.begin();
+        int best_col = std::max_element(col_payoffs.begin(), col_payoffs.end()) - col_payoffs.begin();
 
         std::vector<double> new_col_strategy(n_cols, 0.0);
         new_col_strategy[best_col] = 1.0;
@@ -76,4 +92,23 @@ std::vector<double> solve_zero_sum_game(const std::vector<std::vector<double>>&
     }
 
     return row_strategy;
+}
+
+}  // namespace
+
+std::vector<double> solve_zero_sum_game(const std::vector<std::vector<double>>& payoff_matrix) {
+    int iterations_run = 0;
+    bool timed_out = false;
+    return fictitious_play(payoff_matrix, nullptr, iterations_run, timed_out);
+}
+
+std::tuple<std::vector<double>, int, bool> solve_zero_sum_game_anytime(
+        const std::vector<std::vector<double>>& payoff_matrix, double time_budget_ms) {
+    auto deadline = std::chrono::steady_clock::now() +
+        std::chrono::duration_cast<std::chrono::steady_clock::duration>(
+            std::chrono::duration<double, std::milli>(std::max(0.0, time_budget_ms)));
+    int iterations_run = 0;
+    bool timed_out = false;
+    std::vector<double> strategy = fictitious_play(payoff_matrix, &deadline, iterations_run, timed_out);
+    return std::make_tuple(strategy, iterations_run, !timed_out);
 }
\ No newline at end of file
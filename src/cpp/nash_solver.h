@@ -1,5 +1,11 @@
 #pragma once
 #include <vector>
 #include <iostream>
+#include <tuple>
 
-std::vector<double> solve_zero_sum_game(const std::vector<std::vector<double>>& payoff_matrix);
\ No newline at end of file
+std::vector<double> solve_zero_sum_game(const std::vector<std::vector<double>>& payoff_matrix);
+
+// Same solver, but returns whatever strategy it has when the time budget runs
+// out. Returns (strategy, iterations run, whether all iterations completed).
+std::tuple<std::vector<double>, int, bool> solve_zero_sum_game_anytime(
+    const std::vector<std::vector<double>>& payoff_matrix, double time_budget_ms);
\ No newline at end of file
@@ -1,39 +1,60 @@
 using System;
 using System.Collections.Generic;
 using System.Collections.ObjectModel;
+using Newtonsoft.Json;
 
 namespace PokemonDashboard.Models
 {
     public class BattleState
     {
+        [JsonProperty("battle_tag")]
+        public string? BattleTag { get; set; }
+        [JsonProperty("active_pokemon")]
         public ActivePokemonPair? ActivePokemon { get; set; }
+        [JsonProperty("payoff_matrix")]
         public Dictionary<string, Dictionary<string, double>>? PayoffMatrix { get; set; }
+        [JsonProperty("move_probabilities")]
         public Dictionary<string, double>? MoveProbabilities { get; set; }
+        [JsonProperty("turn")]
         public int Turn { get; set; }
+        [JsonProperty("weather")]
         public string? Weather { get; set; }
+        [JsonProperty("fields")]
         public List<string>? Fields { get; set; }
     }
     
     public class ActivePokemonPair
     {
+        [JsonProperty("self")]
         public Pokemon? Self { get; set; }
+        [JsonProperty("opponent")]
         public Pokemon? Opponent { get; set; }
     }
     
     public class Pokemon
     {
+        [JsonProperty("species")]
         public string? Species { get; set; }
+        [JsonProperty("hp")]
         public double Hp { get; set; }
+        [JsonProperty("types")]
         public List<string>? Types { get; set; }
+        [JsonProperty("moves")]
         public List<Move>? Moves { get; set; }
     }
     
     public class Move
     {
+        [JsonProperty("id")]
         public string? Id { get; set; }
+        [JsonProperty("name")]
         public string? Name { get; set; }
+        [JsonProperty("type")]
         public string? Type { get; set; }
+        [JsonProperty("base_power")]
         public int BasePower { get; set; }
-        public int Category { get; set; }
+        // PHYSICAL, SPECIAL or STATUS
+        [JsonProperty("category")]
+        public string? Category { get; set; }
     }
 }
\ No newline at end of file
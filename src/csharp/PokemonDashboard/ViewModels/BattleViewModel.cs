@@ -0,0 +1,154 @@
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using CommunityToolkit.Mvvm.ComponentModel;
+using PokemonDashboard.Models;
+
+namespace PokemonDashboard.ViewModels
+{
+    /// <summary>
+    /// One live battle in the dashboard list. Only ever updated on the UI thread
+    /// from a pre-rendered <see cref="BattleFrame"/>.
+    /// </summary>
+    public partial class BattleViewModel : ViewModelBase
+    {
+        public BattleViewModel(string battleTag)
+        {
+            BattleTag = battleTag;
+        }
+
+        public string BattleTag { get; }
+
+        [ObservableProperty]
+        private int _turn;
+
+        [ObservableProperty]
+        private string _summary = string.Empty;
+
+        [ObservableProperty]
+        private DateTime _lastUpdated;
+
+        public string BattleInfo { get; private set; } = string.Empty;
+        public string OurPokemonInfo { get; private set; } = string.Empty;
+        public string OpponentPokemonInfo { get; private set; } = string.Empty;
+        public string PayoffMatrixText { get; private set; } = string.Empty;
+        public IReadOnlyList<KeyValuePair<string, double>> MoveProbabilities { get; private set; } =
+            Array.Empty<KeyValuePair<string, double>>();
+
+        public void Apply(BattleFrame frame)
+        {
+            Turn = frame.Turn;
+            Summary = frame.Summary;
+            LastUpdated = frame.ReceivedAt;
+            BattleInfo = frame.BattleInfo;
+            OurPokemonInfo = frame.OurPokemonInfo;
+            OpponentPokemonInfo = frame.OpponentPokemonInfo;
+            PayoffMatrixText = frame.PayoffMatrixText;
+            MoveProbabilities = frame.MoveProbabilities;
+        }
+    }
+
+    /// <summary>
+    /// Display strings for one battle state, rendered on the listener thread so
+    /// the UI thread only assigns them.
+    /// </summary>
+    public sealed class BattleFrame
+    {
+        public int Turn { get; private init; }
+        public DateTime ReceivedAt { get; private init; }
+        public string Summary { get; private init; } = string.Empty;
+        public string BattleInfo { get; private init; } = string.Empty;
+        public string OurPokemonInfo { get; private init; } = "No Pokémon data available";
+        public string OpponentPokemonInfo { get; private init; } = "No Pokémon data available";
+        public string PayoffMatrixText { get; private init; } = "No payoff matrix available";
+        public IReadOnlyList<KeyValuePair<string, double>> MoveProbabilities { get; private init; } =
+            Array.Empty<KeyValuePair<string, double>>();
+
+        public static BattleFrame Render(string battleTag, BattleState state)
+        {
+            var self = state.ActivePokemon?.Self;
+            var opponent = state.ActivePokemon?.Opponent;
+
+            var summary = new StringBuilder();
+            summary.Append(battleTag).Append("  T").Append(state.Turn);
+            if (self != null && opponent != null)
+            {
+                summary.Append("  ").Append(self.Species).Append(' ').Append((self.Hp * 100).ToString("F0")).Append('%')
+                       .Append(" vs ").Append(opponent.Species).Append(' ').Append((opponent.Hp * 100).ToString("F0")).Append('%');
+            }
+
+            return new BattleFrame
+            {
+                Turn = state.Turn,
+                ReceivedAt = DateTime.Now,
+                Summary = summary.ToString(),
+                BattleInfo = $"{battleTag} - Turn: {state.Turn}, Weather: {state.Weather}",
+                OurPokemonInfo = self != null ? RenderPokemon("Our Pokémon", self) : "No Pokémon data available",
+                OpponentPokemonInfo = opponent != null ? RenderPokemon("Opponent's Pokémon", opponent) : "No Pokémon data available",
+                PayoffMatrixText = state.PayoffMatrix != null ? RenderPayoffMatrix(state.PayoffMatrix) : "No payoff matrix available",
+                MoveProbabilities = state.MoveProbabilities?.ToArray() ?? Array.Empty<KeyValuePair<string, double>>(),
+            };
+        }
+
+        private static string RenderPokemon(string label, Pokemon pokemon)
+        {
+            var text = new StringBuilder();
+            text.Append(label).Append(": ").Append(pokemon.Species).Append('\n');
+            text.Append("Types: ").Append(pokemon.Types != null ? string.Join(", ", pokemon.Types) : "Unknown").Append('\n');
+            text.Append("HP: ").Append((pokemon.Hp * 100).ToString("F0")).Append('%');
+
+            if (pokemon.Moves != null)
+            {
+                foreach (var move in pokemon.Moves)
+                {
+                    text.Append("\n  ").Append(move.Name).Append(" (").Append(move.Type)
+                        .Append(") - Power: ").Append(move.BasePower);
+                }
+            }
+
+            return text.ToString();
+        }
+
+        private static string RenderPayoffMatrix(Dictionary<string, Dictionary<string, double>> payoffMatrix)
+        {
+            // Get all opponent move IDs, in first-seen order
+            var oppMoveIds = new List<string>();
+            var seen = new HashSet<string>();
+            foreach (var ourMove in payoffMatrix)
+            {
+                foreach (var oppMove in ourMove.Value)
+                {
+                    if (seen.Add(oppMove.Key))
+                        oppMoveIds.Add(oppMove.Key);
+                }
+            }
+
+            var text = new StringBuilder("Payoff Matrix:\n");
+
+            // Build header row
+            text.Append("Our Move \\ Opp Move");
+            foreach (var oppMoveId in oppMoveIds)
+            {
+                text.Append('\t').Append(oppMoveId);
+            }
+            text.Append('\n');
+
+            // Build data rows
+            foreach (var ourMove in payoffMatrix)
+            {
+                text.Append(ourMove.Key);
+                foreach (var oppMoveId in oppMoveIds)
+                {
+                    if (ourMove.Value.TryGetValue(oppMoveId, out double payoff))
+                        text.Append('\t').Append(payoff.ToString("F2"));
+                    else
+                        text.Append("\t-");
+                }
+                text.Append('\n');
+            }
+
+            return text.ToString();
+        }
+    }
+}
@@ -1,7 +1,8 @@
 using System;
+using System.Collections.Concurrent;
 using System.Collections.Generic;
 using System.Collections.ObjectModel;
-using System.ComponentModel;
+using System.IO;
 using System.Net;
 using System.Net.Sockets;
 using System.Text;
@@ -15,227 +16,194 @@ namespace PokemonDashboard.ViewModels
 {
     public class MainViewModel : ViewModelBase
     {
-        private BattleState _currentBattle;
-        private Thread _listenerThread;
-        private TcpListener _server;
-        private bool _isRunning;
-        
+        private const int Port = 8888;
+        // Senders that do not tag their messages all share one battle entry
+        private const string DefaultBattleTag = "battle";
+        // UI refresh rate; updates arriving faster are coalesced per battle
+        private static readonly TimeSpan FrameInterval = TimeSpan.FromMilliseconds(1000.0 / 20);
+
+        private readonly ConcurrentDictionary<string, BattleFrame> _pendingFrames = new();
+        private readonly Dictionary<string, BattleViewModel> _battlesByTag = new();
+        private readonly DispatcherTimer _frameTimer;
+        private CancellationTokenSource? _cts;
+        private TcpListener? _server;
+
         private string _battleInfo;
         public string BattleInfo
         {
             get => _battleInfo;
             set => SetProperty(ref _battleInfo, value);
         }
-        
+
         private string _ourPokemonInfo;
         public string OurPokemonInfo
         {
             get => _ourPokemonInfo;
             set => SetProperty(ref _ourPokemonInfo, value);
         }
-        
+
         private string _opponentPokemonInfo;
         public string OpponentPokemonInfo
         {
             get => _opponentPokemonInfo;
             set => SetProperty(ref _opponentPokemonInfo, value);
         }
-        
+
         private string _payoffMatrixText;
         public string PayoffMatrixText
         {
             get => _payoffMatrixText;
             set => SetProperty(ref _payoffMatrixText, value);
         }
-        
-        private Dictionary<string, double> _moveProbabilities;
+
         private ObservableCollection<KeyValuePair<string, double>> _moveProbabilitiesCollection;
-        
+
         public ObservableCollection<KeyValuePair<string, double>> MoveProbabilities
         {
             get => _moveProbabilitiesCollection;
             private set => SetProperty(ref _moveProbabilitiesCollection, value);
         }
-        
+
+        public ObservableCollection<BattleViewModel> Battles { get; } = new();
+
+        private BattleViewModel? _selectedBattle;
+        public BattleViewModel? SelectedBattle
+        {
+            get => _selectedBattle;
+            set
+            {
+                if (SetProperty(ref _selectedBattle, value) && value != null)
+                    ShowBattle(value);
+            }
+        }
+
         public MainViewModel()
         {
-            BattleInfo = "Waiting for battle data...";
-            OurPokemonInfo = "No Pokémon data available";
-            OpponentPokemonInfo = "No Pokémon data available";
-            PayoffMatrixText = "No payoff matrix available";
-            _moveProbabilities = new Dictionary<string, double>();
-            MoveProbabilities = new ObservableCollection<KeyValuePair<string, double>>();
-            
+            _battleInfo = "Waiting for battle data...";
+            _ourPokemonInfo = "No Pokémon data available";
+            _opponentPokemonInfo = "No Pokémon data available";
+            _payoffMatrixText = "No payoff matrix available";
+            _moveProbabilitiesCollection = new ObservableCollection<KeyValuePair<string, double>>();
+
+            _frameTimer = new DispatcherTimer { Interval = FrameInterval };
+            _frameTimer.Tick += (_, _) => FlushPendingFrames();
+            _frameTimer.Start();
+
             StartServer();
         }
-        
+
         private void StartServer()
         {
-            _isRunning = true;
-            _listenerThread = new Thread(ListenForData);
-            _listenerThread.IsBackground = true;
-            _listenerThread.Start();
+            _cts = new CancellationTokenSource();
+            _ = Task.Run(() => ListenForDataAsync(_cts.Token));
         }
-        
-        private void ListenForData()
+
+        public void StopServer()
+        {
+            _cts?.Cancel();
+            _server?.Stop();
+            _frameTimer.Stop();
+        }
+
+        private async Task ListenForDataAsync(CancellationToken token)
         {
             try
             {
-                _server = new TcpListener(IPAddress.Parse("127.0.0.1"), 8888);
+                _server = new TcpListener(IPAddress.Parse("127.0.0.1"), Port);
                 _server.Start();
-                
-                Console.WriteLine("Dashboard server started, listening on port 8888");
-                
-                while (_isRunning)
+
+                Console.WriteLine($"Dashboard server started, listening on port {Port}");
+
+                while (!token.IsCancellationRequested)
                 {
-                    try
-                    {
-                        using (TcpClient client = _server.AcceptTcpClient())
-                        using (NetworkStream stream = client.GetStream())
-                        {
-                            // Read data
-                            byte[] buffer = new byte[16384]; // Larger buffer
-                            int bytesRead = stream.Read(buffer, 0, buffer.Length);
-                            string data = Encoding.UTF8.GetString(buffer, 0, bytesRead);
-                            
-                            // Parse battle state
-                            try 
-                            {
-                                _currentBattle = JsonConvert.DeserializeObject<BattleState>(data);
-                                
-                                // Update UI on UI thread
-                                Dispatcher.UIThread.Post(UpdateUI);
-                            }
-                            catch (Exception ex)
-                            {
-                                Console.WriteLine("Error parsing data: " + ex.Message);
-                            }
-                        }
-                    }
-                    catch (Exception ex)
-                    {
-                        Console.WriteLine("Client connection error: " + ex.Message);
-                    }
+                    TcpClient client = await _server.AcceptTcpClientAsync(token);
+                    // Each client gets its own reader; agents can stay connected and stream
+                    _ = HandleClientAsync(client, token);
                 }
             }
+            catch (OperationCanceledException)
+            {
+            }
             catch (Exception ex)
             {
                 Console.WriteLine("Server error: " + ex.Message);
             }
         }
-        
-        private void UpdateUI()
+
+        private async Task HandleClientAsync(TcpClient client, CancellationToken token)
         {
-            if (_currentBattle == null)
-                return;
-                
-            // Update battle info
-            BattleInfo = $"Turn: {_currentBattle.Turn}, Weather: {_currentBattle.Weather}";
-            
-            // Update our Pokémon info
-            if (_currentBattle.ActivePokemon?.Self != null)
-            {
-                var pokemon = _currentBattle.ActivePokemon.Self;
-                var types = pokemon.Types != null ? string.Join(", ", pokemon.Types) : "Unknown";
-                var hp = pokemon.Hp * 100;
-                
-                var movesText = "";
-                if (pokemon.Moves != null)
-                {
-                    foreach (var move in pokemon.Moves)
-                    {
-                        movesText += $"\n  {move.Name} ({move.Type}) - Power: {move.BasePower}";
-                    }
-                }
-                
-                OurPokemonInfo = $"Our Pokémon: {pokemon.Species}\nTypes: {types}\nHP: {hp:F0}%{movesText}";
-            }
-            
-            // Update opponent Pokémon info
-            if (_currentBattle.ActivePokemon?.Opponent != null)
-            {
-                var pokemon = _currentBattle.ActivePokemon.Opponent;
-                var types = pokemon.Types != null ? string.Join(", ", pokemon.Types) : "Unknown";
-                var hp = pokemon.Hp * 100;
-                
-                var movesText = "";
-                if (pokemon.Moves != null)
-                {
-                    foreach (var move in pokemon.Moves)
-                    {
-                        movesText += $"\n  {move.Name} ({move.Type}) - Power: {move.BasePower}";
-                    }
-                }
-                
-                OpponentPokemonInfo = $"Opponent's Pokémon: {pokemon.Species}\nTypes: {types}\nHP: {hp:F0}%{movesText}";
-            }
-            
-            // Update payoff matrix
-            if (_currentBattle.PayoffMatrix != null)
+            try
             {
-                var matrixText = "Payoff Matrix:\n";
-                
-                // Get all opponent move IDs
-                var oppMoveIds = new HashSet<string>();
-                foreach (var ourMove in _currentBattle.PayoffMatrix)
-                {
-                    foreach (var oppMove in ourMove.Value)
-                    {
-                        oppMoveIds.Add(oppMove.Key);
-                    }
-                }
-                
-                // Build header row
-                matrixText += "Our Move \\ Opp Move";
-                foreach (var oppMoveId in oppMoveIds)
-                {
-                    matrixText += $"\t{oppMoveId}";
-                }
-                matrixText += "\n";
-                
-                // Build data rows
-                foreach (var ourMove in _currentBattle.PayoffMatrix)
+                using (client)
+                using (var reader = new StreamReader(client.GetStream(), Encoding.UTF8))
                 {
-                    matrixText += ourMove.Key;
-                    
-                    foreach (var oppMoveId in oppMoveIds)
+                    // Messages are framed as one JSON document per line. A client that
+                    // sends a single document and closes the connection also works.
+                    string? line;
+                    while ((line = await reader.ReadLineAsync(token)) != null)
                     {
-                        if (ourMove.Value.TryGetValue(oppMoveId, out double payoff))
+                        if (string.IsNullOrWhiteSpace(line))
+                            continue;
+
+                        try
                         {
-                            matrixText += $"\t{payoff:F2}";
+                            var battle = JsonConvert.DeserializeObject<BattleState>(line);
+                            if (battle == null)
+                                continue;
+
+                            var battleTag = battle.BattleTag ?? DefaultBattleTag;
+                            // Only the latest frame of each battle survives until the next UI tick
+                            _pendingFrames[battleTag] = BattleFrame.Render(battleTag, battle);
                         }
-                        else
+                        catch (JsonException ex)
                         {
-                            matrixText += "\t-";
+                            Console.WriteLine("Error parsing data: " + ex.Message);
                         }
                     }
-                    
-                    matrixText += "\n";
                 }
-                
-                PayoffMatrixText = matrixText;
             }
-            
-            // Update move probabilities
-            if (_currentBattle.MoveProbabilities != null)
+            catch (OperationCanceledException)
             {
-                _moveProbabilities = _currentBattle.MoveProbabilities;
-                MoveProbabilities.Clear();
-                foreach (var kvp in _moveProbabilities)
+            }
+            catch (Exception ex)
+            {
+                Console.WriteLine("Client connection error: " + ex.Message);
+            }
+        }
+
+        private void FlushPendingFrames()
+        {
+            if (_pendingFrames.IsEmpty)
+                return;
+
+            foreach (var battleTag in _pendingFrames.Keys)
+            {
+                if (!_pendingFrames.TryRemove(battleTag, out var frame))
+                    continue;
+
+                if (!_battlesByTag.TryGetValue(battleTag, out var battle))
                 {
-                    MoveProbabilities.Add(kvp);
+                    battle = new BattleViewModel(battleTag);
+                    _battlesByTag[battleTag] = battle;
+                    Battles.Add(battle);
                 }
+
+                battle.Apply(frame);
+
+                if (SelectedBattle == null)
+                    SelectedBattle = battle;
+                else if (battle == SelectedBattle)
+                    ShowBattle(battle);
             }
         }
-        
-        protected bool SetProperty<T>(ref T field, T value, [System.Runtime.CompilerServices.CallerMemberName] string propertyName = null)
+
+        private void ShowBattle(BattleViewModel battle)
         {
-            if (EqualityComparer<T>.Default.Equals(field, value)) return false;
-            field = value;
-            PropertyChanged?.Invoke(this, new PropertyChangedEventArgs(propertyName));
-            return true;
+            BattleInfo = battle.BattleInfo;
+            OurPokemonInfo = battle.OurPokemonInfo;
+            OpponentPokemonInfo = battle.OpponentPokemonInfo;
+            PayoffMatrixText = battle.PayoffMatrixText;
+            MoveProbabilities = new ObservableCollection<KeyValuePair<string, double>>(battle.MoveProbabilities);
         }
-        
-        public new event PropertyChangedEventHandler PropertyChanged;
     }
-}
\ No newline at end of file
+}
@@ -34,6 +34,9 @@ public partial class MainWindowViewModel : ObservableObject
     private HttpListener? _listener;
     private CancellationTokenSource? _cts;
 
+    // Live battle states streamed by the agents' DashboardConnector (TCP, port 8888)
+    public MainViewModel Battles { get; } = new();
+
     public MainWindowViewModel()
     {
         BattleLog = "Welcome to Pokemon Battle Dashboard!\nWaiting for battles to begin...";
@@ -220,6 +223,7 @@ public partial class MainWindowViewModel : ObservableObject
         _cts?.Cancel();
         _listener?.Stop();
         _listener?.Close();
+        Battles.StopServer();
     }
 }
 
@@ -1,3 +1,4 @@
+using System;
 using Avalonia.Controls;
 using Avalonia.Markup.Xaml;
 using PokemonDashboard.ViewModels;
@@ -11,6 +12,13 @@ public partial class MainWindow : Window
         InitializeComponent();
     }
 
+    protected override void OnClosed(EventArgs e)
+    {
+        // Release the listening ports so a restarted dashboard can bind them
+        (DataContext as MainWindowViewModel)?.StopServer();
+        base.OnClosed(e);
+    }
+
     private void InitializeComponent()
     {
         AvaloniaXamlLoader.Load(this);
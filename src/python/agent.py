@@ -1,25 +1,38 @@
 # Core agent implementation
 from poke_env.player.player import Player
 from battle_state import BattleStateTracker
-from payoff_builder import PayoffMatrixBuilder
+from payoff_builder import PayoffMatrixBuilder, switch_row_id
 from dashboard_connector import DashboardConnector
 from data_collector import BattleDataCollector
 from opponent_model import OpponentModel
+from battle_snapshot import BattleSnapshot
+from decision_executor import DecisionExecutor, run_decision_pipeline
+from anytime_decision import AnytimeDecider, TurnDeadline, parse_timer_seconds
+from game_search import SearchDecider
+from concurrent.futures import ThreadPoolExecutor
 import random
-import sys
-import os
+import time
 import logging
 
-build_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../cpp/build'))
-if build_path not in sys.path:
-    sys.path.insert(0, build_path)
-
-import nash_solver
-
 logger = logging.getLogger(__name__)
 
 class GameTheoryAgent(Player):
-    def __init__(self, account_configuration=None, server_configuration=None, battle_format=None, *args, **kwargs):
+    def __init__(self, account_configuration=None, server_configuration=None, battle_format=None, *args,
+                 executor_mode=None, max_workers=None, max_in_flight=4,
+                 turn_time_budget=5.0, timer_safety_margin=3.0, payoff_options=None,
+                 search_options=None, **kwargs):
+        """
+        :param executor_mode: None to decide on the event loop, "thread" or "process"
+            to run the decision pipeline in a worker pool
+        :param max_workers: Size of the worker pool
+        :param max_in_flight: Maximum number of decisions computed concurrently
+        :param turn_time_budget: Seconds allowed for each decision
+        :param timer_safety_margin: Seconds kept in reserve when the Showdown timer is on
+        :param payoff_options: Extra PayoffMatrixBuilder keyword arguments,
+            e.g. {"stochastic_damage": True}
+        :param search_options: SearchDecider keyword arguments to look several turns
+            ahead, e.g. {"max_depth": 3}; None decides on the one-turn matrix only
+        """
         super().__init__(
             account_configuration=account_configuration,
             server_configuration=server_configuration,
@@ -29,10 +42,49 @@ class GameTheoryAgent(Player):
         )
         self.battle_state_tracker = BattleStateTracker()
         self.opponent_model = OpponentModel()
-        self.payoff_builder = PayoffMatrixBuilder(opponent_model=self.opponent_model)
+        self.payoff_builder = PayoffMatrixBuilder(opponent_model=self.opponent_model, **(payoff_options or {}))
         self.dashboard_connector = DashboardConnector()
         self.data_collector = BattleDataCollector()
-        self.last_moves = {}
+        # Moveset knowledge is written to SQLite off the event loop, one battle at a time
+        self._knowledge_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="knowledge")
+        self.turn_time_budget = turn_time_budget
+        self.timer_safety_margin = timer_safety_margin
+        self.timer_status = {}  # battle_tag -> (seconds left this turn, monotonic time seen)
+        self.last_decision_tiers = {}
+        if search_options is None:
+            self.decider = AnytimeDecider(self.payoff_builder)
+        else:
+            self.decider = SearchDecider(self.payoff_builder, **search_options)
+        self.decision_executor = None
+        if executor_mode:
+            self.decision_executor = DecisionExecutor(
+                mode=executor_mode,
+                max_workers=max_workers,
+                max_in_flight=max_in_flight,
+                decider=self.decider,
+                payoff_options=payoff_options,
+                search_options=search_options
+            )
+
+    async def stop(self):
+        """Disconnect from the server and the dashboard and shut down the worker pools."""
+        await self.ps_client.stop_listening()
+        self.dashboard_connector.close()
+        self._knowledge_writer.shutdown()
+        if self.decision_executor is not None:
+            self.decision_executor.shutdown()
+            self.decision_executor = None
+
+    async def _handle_battle_message(self, split_messages):
+        self.data_collector.record_messages(split_messages)
+        
+        # Track the Showdown timer so decisions never outlive the turn clock
+        for message in split_messages[1:]:
+            if len(message) > 2 and message[1] == "inactive":
+                seconds_left = parse_timer_seconds(message[2])
+                if seconds_left is not None:
+                    self.timer_status[split_messages[0][0][1:]] = (seconds_left, time.monotonic())
+        await super()._handle_battle_message(split_messages)
 
     def choose_move(self, battle):
         logger.debug(f"=== Starting move selection for battle {battle.battle_tag} ===")
@@ -42,76 +94,91 @@ class GameTheoryAgent(Player):
         logger.debug(f"Active Pokemon: {battle.active_pokemon.species if battle.active_pokemon else 'None'}")
         logger.debug(f"Opponent Active Pokemon: {battle.opponent_active_pokemon.species if battle.opponent_active_pokemon else 'None'}")
         
-        self.data_collector.record_battle_state(
-            battle, 
-            battle.turn, 
-            our_move=self.last_moves.get(battle.battle_tag)
-        )
-        
-        if battle.available_moves:
-            logger.debug(f"We have {len(battle.available_moves)} moves available")
+        if battle.available_moves or battle.available_switches:
+            logger.debug(f"We have {len(battle.available_moves)} moves and "
+                         f"{len(battle.available_switches)} switches available")
+            deadline = self._turn_deadline(battle)
+            if self.decision_executor is not None:
+                return self._choose_move_in_executor(battle, deadline)
             try:
-                logger.debug("Building payoff matrix...")
-                payoff_matrix = self.payoff_builder.build_matrix(battle)
-                logger.debug(f"Payoff matrix built successfully: {payoff_matrix}")
-                
-                logger.debug("Solving game theory...")
-                move_probabilities = self._solve_game_theory(battle, payoff_matrix)
-                logger.debug(f"Game theory solved successfully. Move probabilities: {move_probabilities}")
-                
-                logger.debug("Sending data to dashboard...")
-                try:
-                    self.dashboard_connector.send_battle_state(
-                        battle, 
-                        payoff_matrix, 
-                        move_probabilities
-                    )
-                    logger.debug("Dashboard update sent successfully")
-                except Exception as e:
-                    logger.error(f"Error sending data to dashboard: {str(e)}")
-                
-                logger.debug("Selecting move from distribution...")
-                selected_move = self._select_move_from_distribution(battle, move_probabilities)
-                logger.debug(f"Selected move: {selected_move.id}")
-                self.last_moves[battle.battle_tag] = selected_move
-                move_order = self.create_order(selected_move)
-                logger.debug(f"Created move order: {move_order}")
-                return move_order
+                logger.debug("Building payoff matrix and solving game theory...")
+                payoff_matrix, move_probabilities, tier = run_decision_pipeline(
+                    battle, self.decider, deadline
+                )
+                logger.debug(f"Game theory solved ({tier}). Move probabilities: {move_probabilities}")
+                return self._create_order_from_strategy(battle, payoff_matrix, move_probabilities, tier)
             except Exception as e:
                 logger.error(f"Error in move selection: {str(e)}")
                 logger.debug("Falling back to default move")
                 return self.choose_default_move(battle)
         
-        logger.debug("No moves available, attempting to switch")
-        if battle.available_switches:
-            logger.debug(f"Available switches: {[pkmn.species for pkmn in battle.available_switches]}")
-            switch_move = self.choose_random_switch(battle)
-            logger.debug(f"Selected switch move: {switch_move}")
-            return switch_move
-        
-        logger.debug("No switches available, using default move")
+        logger.debug("No moves or switches available, using default move")
         default_move = self.choose_default_move(battle)
         logger.debug(f"Selected default move: {default_move}")
         return default_move
     
-    def _solve_game_theory(self, battle, payoff_matrix):
-        matrix_for_solver = []
-        move_ids = []
+    def _turn_deadline(self, battle):
+        """Deadline for this decision, capped by the Showdown timer if it is running.
         
-        for our_move_id, opponent_moves in payoff_matrix.items():
-            move_ids.append(our_move_id)
-            row = []
-            for opp_move_id, payoff in opponent_moves.items():
-                row.append(payoff)
-            matrix_for_solver.append(row)
+        :param battle: Current battle
+        :return: TurnDeadline
+        """
+        budget = self.turn_time_budget
+        timer = self.timer_status.get(battle.battle_tag)
+        if timer is not None:
+            seconds_left, seen_at = timer
+            timer_left = seconds_left - (time.monotonic() - seen_at) - self.timer_safety_margin
+            budget = min(budget, max(0.0, timer_left))
+        return TurnDeadline(budget)
+    
+    async def _choose_move_in_executor(self, battle, deadline):
+        """Run the decision pipeline in the worker pool and await the result.
         
-        mixed_strategy = nash_solver.solve_zero_sum_game(matrix_for_solver)
-        move_probabilities = {move_id: prob for move_id, prob in zip(move_ids, mixed_strategy)}
+        Only a BattleSnapshot crosses into the pool, so the live battle can keep
+        being updated by incoming messages while the decision is computed.
         
-        return move_probabilities
+        :param battle: Current battle
+        :param deadline: TurnDeadline for this decision
+        :return: BattleOrder for the chosen move
+        """
+        try:
+            snapshot = BattleSnapshot.from_battle(battle)
+            payoff_matrix, move_probabilities, tier = await self.decision_executor.decide(
+                snapshot, deadline
+            )
+            logger.debug(f"Game theory solved in executor ({tier}). Move probabilities: {move_probabilities}")
+            return self._create_order_from_strategy(battle, payoff_matrix, move_probabilities, tier)
+        except Exception as e:
+            logger.error(f"Error in move selection: {str(e)}")
+            logger.debug("Falling back to default move")
+            return self.choose_default_move(battle)
+    
+    def _create_order_from_strategy(self, battle, payoff_matrix, move_probabilities, tier):
+        self.last_decision_tiers[battle.battle_tag] = tier
+        if tier not in ("full", "search"):
+            logger.info(f"Decision for {battle.battle_tag} turn {battle.turn} degraded to {tier}")
+        
+        logger.debug("Sending data to dashboard...")
+        try:
+            self.dashboard_connector.send_battle_state(
+                battle, 
+                payoff_matrix, 
+                move_probabilities
+            )
+            logger.debug("Dashboard update sent successfully")
+        except Exception as e:
+            logger.error(f"Error sending data to dashboard: {str(e)}")
+        
+        logger.debug("Selecting move from distribution...")
+        selected_move = self._select_move_from_distribution(battle, move_probabilities)
+        logger.debug(f"Selected move: {selected_move}")
+        move_order = self.create_order(selected_move)
+        logger.debug(f"Created move order: {move_order}")
+        return move_order
     
     def _select_move_from_distribution(self, battle, move_probabilities):
         available_move_ids = {move.id: move for move in battle.available_moves}
+        available_move_ids.update({switch_row_id(pokemon): pokemon for pokemon in battle.available_switches})
         
         filtered_probs = {move_id: prob for move_id, prob in move_probabilities.items() 
                          if move_id in available_move_ids}
@@ -130,7 +197,7 @@ class GameTheoryAgent(Player):
             if r <= cumulative_prob:
                 return available_move_ids[move_id]
         
-        return random.choice(list(battle.available_moves))
+        return random.choice(list(available_move_ids.values()))
     
     def choose_random_switch(self, battle):
         """Choose a random switch option from available switches.
@@ -170,8 +237,23 @@ class GameTheoryAgent(Player):
         """Called when a battle finishes."""
         won = battle.won
         self.data_collector.finalize_battle(battle, won=won)
+        knowledge = self.payoff_builder.knowledge
+        self._knowledge_writer.submit(self._record_sets, knowledge, knowledge.battle_sets(battle))
         
-        if battle.battle_tag in self.last_moves:
-            del self.last_moves[battle.battle_tag]
+        self.timer_status.pop(battle.battle_tag, None)
+        self.last_decision_tiers.pop(battle.battle_tag, None)
+        self.decider.forget_battle(battle.battle_tag)
+        self.payoff_builder.forget_battle(battle.battle_tag)
+        if self.decision_executor is not None:
+            self.decision_executor.forget_battle(battle.battle_tag)
+        logger.debug(f"Decision tiers so far: {dict(self.decider.tier_counts)}; "
+                     f"dominance reduction kept {self.decider.reduction_ratio():.0%} of matrix cells")
             
-        super()._battle_finished_callback(battle)
\ No newline at end of file
+        super()._battle_finished_callback(battle)
+    
+    def _record_sets(self, knowledge, sets):
+        """Add a finished battle's sets to the knowledge base (runs on the writer thread)."""
+        try:
+            knowledge.record_sets(sets)
+        except Exception as e:
+            logger.error(f"Error recording movesets: {str(e)}")
\ No newline at end of file
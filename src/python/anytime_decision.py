@@ -0,0 +1,219 @@
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+build_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../cpp/build'))
+if build_path not in sys.path:
+    sys.path.insert(0, build_path)
+
+import nash_solver
+
+# Showdown sends "|inactive|Time left: 150 sec this turn | 280 sec total"
+TIMER_PATTERN = re.compile(r"Time left: (\d+) sec")
+
+
+def solve_payoff_matrix(payoff_matrix, time_budget=None):
+    """Solve a payoff matrix dict with the native Nash solver.
+
+    Dominated and duplicate rows/columns are eliminated natively before
+    solving; the strategy comes back expanded to every original row.
+
+    Args:
+        payoff_matrix: {our_move_id: {opp_move_id: payoff}}
+        time_budget: Seconds the solver may run, or None for a full solve
+
+    Returns:
+        Tuple of (move_probabilities, converged, solution) where solution is
+        the native ReducedSolution with the original and reduced sizes
+    """
+    matrix_for_solver = []
+    move_ids = []
+
+    for our_move_id, opponent_moves in payoff_matrix.items():
+        move_ids.append(our_move_id)
+        matrix_for_solver.append(list(opponent_moves.values()))
+
+    time_budget_ms = -1.0 if time_budget is None else max(0.0, time_budget) * 1000.0
+    solution = nash_solver.solve_zero_sum_game_reduced(matrix_for_solver, time_budget_ms)
+    move_probabilities = {move_id: prob for move_id, prob in zip(move_ids, solution.strategy)}
+    return move_probabilities, solution.converged, solution
+
+
+def parse_timer_seconds(message):
+    """Return the seconds left this turn from an |inactive| message, if any."""
+    match = TIMER_PATTERN.search(message)
+    return int(match.group(1)) if match else None
+
+
+class TurnDeadline:
+    """Absolute per-turn deadline on the monotonic clock (picklable)."""
+
+    def __init__(self, budget):
+        self.budget = budget
+        self.expires_at = time.monotonic() + budget
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        return time.monotonic() >= self.expires_at
+
+
+class AnytimeDecider:
+    """Builds and solves the payoff matrix within a per-turn deadline.
+
+    When the full pipeline does not fit in the deadline, the best strategy
+    still available is returned, in this order of preference:
+
+    - "full": model-weighted matrix, solver ran to completion
+    - "cached": last full strategy seen for the same matchup in this battle
+    - "partial": model-weighted matrix, solver stopped at the deadline
+    - "uniform_prior": matrix built without the opponent model
+    - "heuristic": best expected damage, no matrix at all
+
+    The tier used for every decision is counted in tier_counts and returned
+    to the caller. A thread pool may share one decider, so the strategy
+    cache and the counters are only touched under a lock.
+    """
+
+    TIERS = ("full", "cached", "partial", "uniform_prior", "heuristic")
+
+    def __init__(self, payoff_builder, min_solve_time=0.005):
+        """Initialize the decider.
+
+        Args:
+            payoff_builder: PayoffMatrixBuilder used to build matrices
+            min_solve_time: Seconds the solver needs to be worth starting
+        """
+        self.payoff_builder = payoff_builder
+        self.min_solve_time = min_solve_time
+        self.strategy_cache = {}  # battle_tag -> {matchup key: move probabilities}
+        self.tier_counts = Counter()
+        # Matrix cells before/after dominance reduction, summed over solves
+        self.reduction_totals = Counter()
+        self._model_build_time = 0.0  # Moving average of model-weighted builds
+        self._lock = threading.Lock()
+
+    def decide(self, battle, deadline=None):
+        """Choose a mixed strategy for the current turn.
+
+        Args:
+            battle: Battle or BattleSnapshot
+            deadline: TurnDeadline, or None to always run the full pipeline
+
+        Returns:
+            Tuple of (payoff_matrix, move_probabilities, tier)
+        """
+        key = self._matchup_key(battle)
+        with self._lock:
+            cached = self.strategy_cache.get(battle.battle_tag, {}).get(key)
+        payoff_matrix = None
+
+        # Skip the model when its usual cost no longer fits in the deadline
+        if deadline is None or deadline.remaining() > self._model_build_time + self.min_solve_time:
+            try:
+                started = time.monotonic()
+                payoff_matrix = self.payoff_builder.build_matrix(battle)
+                elapsed = time.monotonic() - started
+                self._model_build_time = 0.8 * self._model_build_time + 0.2 * elapsed
+            except Exception as e:
+                print(f"Error building payoff matrix: {e}")
+
+        if payoff_matrix and (deadline is None or deadline.remaining() >= self.min_solve_time):
+            move_probabilities, converged, solution = solve_payoff_matrix(
+                payoff_matrix, deadline.remaining() if deadline else None
+            )
+            self._record_reduction(solution)
+            if converged:
+                self._cache_strategy(battle.battle_tag, key, move_probabilities)
+                return self._record(payoff_matrix, move_probabilities, "full")
+            if cached:
+                return self._record(payoff_matrix, cached, "cached")
+            return self._record(payoff_matrix, move_probabilities, "partial")
+
+        if cached:
+            return self._record(payoff_matrix or {}, cached, "cached")
+
+        try:
+            payoff_matrix = self.payoff_builder.build_matrix(battle, use_opponent_model=False)
+            if payoff_matrix:
+                if deadline is None or deadline.remaining() >= self.min_solve_time:
+                    move_probabilities, _, solution = solve_payoff_matrix(
+                        payoff_matrix, deadline.remaining() if deadline else None
+                    )
+                    self._record_reduction(solution)
+                else:
+                    move_probabilities = self._best_response(payoff_matrix)
+                return self._record(payoff_matrix, move_probabilities, "uniform_prior")
+        except Exception as e:
+            print(f"Error building uniform-prior payoff matrix: {e}")
+
+        return self._record({}, self._heuristic_strategy(battle), "heuristic")
+
+    def forget_battle(self, battle_tag):
+        """Drop cached strategies for a finished battle."""
+        with self._lock:
+            self.strategy_cache.pop(battle_tag, None)
+
+    def _cache_strategy(self, battle_tag, key, move_probabilities):
+        with self._lock:
+            if battle_tag not in self.strategy_cache:
+                # Process-pool workers never see battles finish, so keep this bounded
+                if len(self.strategy_cache) >= self.payoff_builder.MAX_CACHED_BATTLES:
+                    self.strategy_cache.pop(next(iter(self.strategy_cache)))
+                self.strategy_cache[battle_tag] = {}
+            self.strategy_cache[battle_tag][key] = move_probabilities
+
+    def _record_reduction(self, solution):
+        with self._lock:
+            self.reduction_totals["solves"] += 1
+            self.reduction_totals["cells"] += solution.original_rows * solution.original_cols
+            self.reduction_totals["reduced_cells"] += solution.reduced_rows * solution.reduced_cols
+
+    def reduction_ratio(self):
+        """Fraction of matrix cells left after dominance reduction, over all solves."""
+        if not self.reduction_totals["cells"]:
+            return 1.0
+        return self.reduction_totals["reduced_cells"] / self.reduction_totals["cells"]
+
+    def _record(self, payoff_matrix, move_probabilities, tier):
+        with self._lock:
+            self.tier_counts[tier] += 1
+        return payoff_matrix, move_probabilities, tier
+
+    def _matchup_key(self, battle):
+        our = battle.active_pokemon.species if battle.active_pokemon else None
+        opp = battle.opponent_active_pokemon.species if battle.opponent_active_pokemon else None
+        options = [move.id for move in battle.available_moves]
+        options.extend(pokemon.species for pokemon in battle.available_switches)
+        return our, opp, tuple(sorted(options))
+
+    def _best_response(self, payoff_matrix):
+        """Pure strategy on the row with the best total payoff against the prior."""
+        best_move_id = max(payoff_matrix, key=lambda move_id: sum(payoff_matrix[move_id].values()))
+        return {best_move_id: 1.0}
+
+    def _heuristic_strategy(self, battle):
+        """Pure strategy on the move with the highest expected raw damage."""
+        best_move_id = None
+        best_score = -1.0
+
+        for move in battle.available_moves:
+            try:
+                score = move.base_power * move.accuracy
+                if battle.opponent_active_pokemon:
+                    score *= self.payoff_builder._calculate_type_effectiveness(
+                        move, battle.opponent_active_pokemon
+                    )
+                if battle.active_pokemon and move.type in battle.active_pokemon.types:
+                    score *= 1.5
+            except Exception:
+                score = 0.0
+
+            if score > best_score:
+                best_move_id, best_score = move.id, score
+
+        return {best_move_id: 1.0} if best_move_id is not None else {}
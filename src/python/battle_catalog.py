@@ -0,0 +1,330 @@
+import json
+import os
+import sqlite3
+from collections import defaultdict
+from contextlib import contextmanager
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS battles (
+    battle_id TEXT PRIMARY KEY,
+    file TEXT NOT NULL,
+    format TEXT,
+    result TEXT,
+    started_at TEXT,
+    ended_at TEXT,
+    n_turns INTEGER
+);
+CREATE TABLE IF NOT EXISTS turns (
+    battle_id TEXT NOT NULL,
+    turn_index INTEGER NOT NULL,
+    turn INTEGER,
+    our_species TEXT,
+    opponent_species TEXT,
+    our_move TEXT,
+    opponent_move TEXT,
+    byte_start INTEGER,
+    byte_end INTEGER,
+    PRIMARY KEY (battle_id, turn_index)
+);
+CREATE TABLE IF NOT EXISTS revealed_moves (
+    battle_id TEXT NOT NULL,
+    species TEXT NOT NULL,
+    move_id TEXT NOT NULL,
+    PRIMARY KEY (battle_id, species, move_id)
+);
+CREATE INDEX IF NOT EXISTS battles_format_result ON battles (format, result, started_at);
+CREATE INDEX IF NOT EXISTS turns_opponent_species ON turns (opponent_species);
+CREATE INDEX IF NOT EXISTS turns_our_species ON turns (our_species);
+CREATE INDEX IF NOT EXISTS revealed_moves_species ON revealed_moves (species, move_id);
+"""
+
+# Seconds a writer waits for another process's transaction (e.g. tournament workers)
+BUSY_TIMEOUT = 30.0
+
+
+def dump_battle_with_offsets(battle_data):
+    """Serialize a battle record as JSON, keeping each turn on its own line.
+
+    The output is an ordinary JSON document readable with json.load, but
+    each turn also sits at a known byte range so it can be read alone.
+
+    Args:
+        battle_data: Battle data dictionary with a "turns" list
+
+    Returns:
+        Tuple of (JSON text, list of (byte_start, byte_end) per turn)
+    """
+    header = {key: value for key, value in battle_data.items() if key != "turns"}
+    # ensure_ascii keeps one byte per character, so string offsets are byte offsets.
+    # Header values take one line each, and events one line per event
+    text = "{\n"
+    for key, value in header.items():
+        if key == "events" and value:
+            text += '  "events": [\n' + ",\n".join("    " + json.dumps(event) for event in value) + "\n  ],\n"
+        else:
+            text += f"  {json.dumps(key)}: {json.dumps(value)},\n"
+    text += '  "turns": [\n'
+
+    offsets = []
+    turns = battle_data.get("turns") or []
+    for i, turn in enumerate(turns):
+        encoded = json.dumps(turn)
+        text += "    "
+        offsets.append((len(text), len(text) + len(encoded)))
+        text += encoded + (",\n" if i < len(turns) - 1 else "\n")
+
+    text += "  ]\n}"
+    return text, offsets
+
+
+class BattleCatalog:
+    """SQLite index over the battle files in a data directory.
+
+    Battles are indexed by format, result and dates; turns by the species on
+    both sides and the moves used; revealed opponent moves by species. Turn
+    rows point at byte ranges in the battle file, so queries only parse the
+    turns they return.
+    """
+
+    def __init__(self, db_path="logs/battle_data/catalog.sqlite"):
+        """Open (and create if needed) the catalog database.
+
+        Args:
+            db_path: Path to the SQLite file
+        """
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def add_battle(self, filepath, battle_data, offsets=None):
+        """Index one battle file.
+
+        Args:
+            filepath: Path of the battle file
+            battle_data: Battle data dictionary stored in the file
+            offsets: Byte ranges of the turns, or None if unknown
+        """
+        battle_id = battle_data.get("battle_id") or os.path.basename(filepath)
+        turns = battle_data.get("turns") or []
+        offsets = offsets or [(None, None)] * len(turns)
+
+        turn_rows = []
+        for i, (turn, (start, end)) in enumerate(zip(turns, offsets)):
+            turn_rows.append((
+                battle_id, i, turn.get("turn"),
+                self._species(turn.get("our_active")),
+                self._species(turn.get("opponent_active")),
+                self._move_id(turn.get("our_move")),
+                self._move_id(turn.get("opponent_move")),
+                start, end,
+            ))
+
+        move_rows = set()
+        for species_key, pokemon in (battle_data.get("opponent_team") or {}).items():
+            species = self._species(pokemon) or species_key
+            for move_id in (pokemon or {}).get("moves") or {}:
+                move_rows.add((battle_id, species, move_id))
+        for turn in turns:
+            species = self._species(turn.get("opponent_active"))
+            move_id = self._move_id(turn.get("opponent_move"))
+            if species and move_id:
+                move_rows.add((battle_id, species, move_id))
+
+        with self._connect() as conn:
+            conn.execute("DELETE FROM turns WHERE battle_id = ?", (battle_id,))
+            conn.execute("DELETE FROM revealed_moves WHERE battle_id = ?", (battle_id,))
+            conn.execute(
+                "INSERT OR REPLACE INTO battles VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (battle_id, os.path.abspath(filepath), battle_data.get("format"),
+                 battle_data.get("result"), battle_data.get("started_at"),
+                 battle_data.get("ended_at"), len(turns))
+            )
+            conn.executemany("INSERT INTO turns VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", turn_rows)
+            conn.executemany("INSERT OR IGNORE INTO revealed_moves VALUES (?, ?, ?)", sorted(move_rows))
+
+    def rebuild(self, data_dir="logs/battle_data"):
+        """Index every readable battle file in a directory.
+
+        Files written before the catalog existed have no turn offsets; their
+        turns are read by parsing the whole file.
+
+        Returns:
+            Number of files indexed
+        """
+        indexed = 0
+        for filename in sorted(os.listdir(data_dir)):
+            if not filename.endswith(".json"):
+                continue
+            filepath = os.path.join(data_dir, filename)
+            try:
+                with open(filepath, 'r') as f:
+                    battle_data = json.load(f)
+            except Exception as e:
+                print(f"Error processing battle file {filename}: {e}")
+                continue
+            self.add_battle(filepath, battle_data)
+            indexed += 1
+        return indexed
+
+    def query_turns(self, format=None, result=None, our_species=None, opponent_species=None,
+                    revealed_move=None, since=None, until=None, with_opponent_move=False):
+        """Return the turns matching every given filter.
+
+        Args:
+            format: Battle format, e.g. "gen9randombattle"
+            result: "win" or "loss"
+            our_species: Species of our active pokemon
+            opponent_species: Species of the opponent's active pokemon
+            revealed_move: Move the opponent's active species revealed in that battle
+            since: Earliest started_at (ISO date string)
+            until: Latest started_at (ISO date string)
+            with_opponent_move: Only turns with a recorded opponent move
+
+        Returns:
+            List of (battle_id, turn_index, turn dict)
+        """
+        where, params = self._filters(format, result, our_species, opponent_species,
+                                      revealed_move, since, until)
+        if with_opponent_move:
+            where.append("t.opponent_move IS NOT NULL")
+
+        rows = self._select(
+            "SELECT t.battle_id, t.turn_index, b.file, t.byte_start, t.byte_end "
+            "FROM turns t JOIN battles b ON b.battle_id = t.battle_id",
+            where, params
+        )
+        return self._load_turns(rows)
+
+    def battle_files(self, format=None, result=None, our_species=None, opponent_species=None,
+                     revealed_move=None, since=None, until=None):
+        """Return the files of battles with at least one turn matching the filters.
+
+        Filters have the same meaning as in query_turns.
+
+        Returns:
+            Sorted list of file paths
+        """
+        where, params = self._filters(format, result, our_species, opponent_species,
+                                      revealed_move, since, until)
+        query = ("SELECT DISTINCT b.file FROM battles b "
+                 "LEFT JOIN turns t ON t.battle_id = b.battle_id")
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        with self._connect() as conn:
+            return sorted(row[0] for row in conn.execute(query, params))
+
+    def training_pairs(self, format=None, result=None, our_species=None, opponent_species=None,
+                       revealed_move=None, since=None, until=None):
+        """Return consecutive turns where the second one has an opponent move.
+
+        Filters apply to the first turn of each pair, with the same meaning
+        as in query_turns.
+
+        Returns:
+            List of (battle format, current turn dict, next turn dict)
+        """
+        where, params = self._filters(format, result, our_species, opponent_species,
+                                      revealed_move, since, until)
+        where.append("n.opponent_move IS NOT NULL")
+
+        rows = self._select(
+            "SELECT t.battle_id, t.turn_index, b.file, t.byte_start, t.byte_end, "
+            "n.turn_index, n.byte_start, n.byte_end, b.format "
+            "FROM turns t JOIN battles b ON b.battle_id = t.battle_id "
+            "JOIN turns n ON n.battle_id = t.battle_id AND n.turn_index = t.turn_index + 1",
+            where, params
+        )
+
+        # Both turns of a pair are loaded in one pass; a pair with either
+        # turn unreadable is dropped as a whole, so the rest stay aligned
+        loaded = self._load_turns(
+            [turn for row in rows for turn in (row[:5], (row[0], row[5], row[2], row[6], row[7]))],
+            keep_missing=True
+        )
+        return [
+            (row[8], turn[2], next_turn[2])
+            for row, turn, next_turn in zip(rows, loaded[0::2], loaded[1::2])
+            if turn is not None and next_turn is not None
+        ]
+
+    def _filters(self, format, result, our_species, opponent_species, revealed_move, since, until):
+        where, params = [], []
+        for column, value in (("b.format", format), ("b.result", result),
+                              ("t.our_species", our_species),
+                              ("t.opponent_species", opponent_species)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            where.append("b.started_at >= ?")
+            params.append(since)
+        if until is not None:
+            where.append("b.started_at <= ?")
+            params.append(until)
+        if revealed_move is not None:
+            where.append("EXISTS (SELECT 1 FROM revealed_moves r WHERE r.battle_id = t.battle_id "
+                         "AND r.species = t.opponent_species AND r.move_id = ?)")
+            params.append(revealed_move)
+        return where, params
+
+    def _select(self, query, where, params):
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " ORDER BY t.battle_id, t.turn_index"
+        with self._connect() as conn:
+            return conn.execute(query, params).fetchall()
+
+    def _load_turns(self, rows, keep_missing=False):
+        """Read turns from their files, opening each file once, in row order.
+
+        Turns that cannot be read are left out, or kept as None placeholders
+        with keep_missing so positions still match rows.
+        """
+        by_file = defaultdict(list)
+        for position, row in enumerate(rows):
+            by_file[row[2]].append((position, row))
+
+        loaded = [None] * len(rows)
+        for filepath, file_rows in by_file.items():
+            try:
+                with open(filepath, 'rb') as f:
+                    whole = None
+                    for position, (battle_id, turn_index, _, start, end) in file_rows:
+                        try:
+                            if start is not None:
+                                f.seek(start)
+                                turn = json.loads(f.read(end - start))
+                            else:
+                                if whole is None:
+                                    f.seek(0)
+                                    whole = json.load(f)
+                                turn = whole["turns"][turn_index]
+                        except Exception as e:
+                            print(f"Error reading turn {turn_index} of {filepath}: {e}")
+                            continue
+                        loaded[position] = (battle_id, turn_index, turn)
+            except OSError as e:
+                print(f"Error reading battle file {filepath}: {e}")
+
+        if keep_missing:
+            return loaded
+        return [turn for turn in loaded if turn is not None]
+
+    @contextmanager
+    def _connect(self):
+        """Connection for one transaction, committed and closed on exit."""
+        conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT)
+        try:
+            # WAL lets readers run while another process writes; the mode persists in the file
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _species(self, pokemon):
+        return pokemon.get("species") if pokemon else None
+
+    def _move_id(self, move):
+        return move.get("id") if move else None
@@ -0,0 +1,207 @@
+from collections import defaultdict
+from datetime import datetime
+
+from poke_env.data import to_id_str
+
+# Event tuples, stored as JSON arrays in battle files:
+#   ("turn", turn number)
+#   ("switch", side, species, hp fraction)   also for drag/replace
+#   ("move", side, move id)
+#   ("hp", side, hp fraction)                -damage, -heal and -sethp
+#   ("faint", side)
+#   ("weather", weather id or "")
+#   ("win", username) / ("tie",)
+# Sides are the raw Showdown roles ("p1"/"p2"); which one is ours is only
+# resolved when the turns are rebuilt.
+
+SWITCH_MESSAGES = ("switch", "drag", "replace")
+HP_MESSAGES = ("-damage", "-heal", "-sethp")
+
+
+def _hp_fraction(condition):
+    """Parse a Showdown condition like "55/100 par" or "0 fnt"."""
+    hp = condition.split(" ")[0]
+    if "/" not in hp:
+        return 0.0
+    current, maximum = hp.split("/")
+    return int(current) / int(maximum) if int(maximum) else 0.0
+
+
+def parse_event(message):
+    """Turn one split Showdown message into an event tuple.
+
+    Args:
+        message: Message split on "|", e.g. ["", "move", "p2a: Garchomp", "Earthquake", ...]
+
+    Returns:
+        Event tuple, or None for messages that are not recorded
+    """
+    if len(message) < 2:
+        return None
+    kind = message[1]
+
+    try:
+        if kind == "turn":
+            return ("turn", int(message[2]))
+        if kind in SWITCH_MESSAGES and len(message) > 4:
+            return ("switch", message[2][:2], to_id_str(message[3].split(",")[0]), _hp_fraction(message[4]))
+        if kind == "move" and len(message) > 3:
+            return ("move", message[2][:2], to_id_str(message[3]))
+        if kind in HP_MESSAGES and len(message) > 3:
+            return ("hp", message[2][:2], _hp_fraction(message[3]))
+        if kind == "faint" and len(message) > 2:
+            return ("faint", message[2][:2])
+        if kind == "-weather" and len(message) > 2:
+            weather = to_id_str(message[2])
+            return ("weather", "" if weather == "none" else weather)
+        if kind == "win" and len(message) > 2:
+            return ("win", message[2])
+        if kind == "tie":
+            return ("tie",)
+    except (ValueError, IndexError):
+        return None
+    return None
+
+
+class BattleEventRecorder:
+    """Appends compact typed events from the battle message stream.
+
+    Recording a message costs a few string splits and a tuple append; turn
+    snapshots and training labels are only rebuilt from the events once the
+    battle is over.
+    """
+
+    def __init__(self):
+        self.events = defaultdict(list)  # battle_tag -> list of event tuples
+        self.started_at = {}  # battle_tag -> ISO start time
+
+    def record(self, split_messages):
+        """Record the events in one batch of battle messages.
+
+        Args:
+            split_messages: Messages as passed to Player._handle_battle_message
+        """
+        battle_tag = split_messages[0][0][1:]
+        events = self.events[battle_tag]
+        if battle_tag not in self.started_at:
+            self.started_at[battle_tag] = datetime.now().isoformat()
+
+        for message in split_messages[1:]:
+            event = parse_event(message)
+            if event is not None:
+                events.append(event)
+
+    def pop(self, battle_tag):
+        """Remove and return the events and start time of a battle.
+
+        Returns:
+            Tuple of (list of events, ISO start time or None)
+        """
+        return self.events.pop(battle_tag, []), self.started_at.pop(battle_tag, None)
+
+
+def rebuild_turns(events, player_role, our_team=None, opponent_team=None):
+    """Rebuild per-turn records in the BattleDataCollector format.
+
+    The record for turn N holds the state when turn N started and the moves
+    both sides used during turn N - 1, matching what record_battle_state
+    captured when it was called from choose_move. It also holds our_hp, the
+    HP fraction of every one of our pokemon that has been sent out so far
+    (0.0 once fainted); the others are still at full HP.
+
+    Args:
+        events: Event tuples of one battle
+        player_role: Our side, "p1" or "p2"
+        our_team: Our pokemon dicts keyed by species, used for types, level,
+            stats and move data
+        opponent_team: Opponent pokemon dicts keyed by species; only the moves
+            revealed so far are copied into each turn
+
+    Returns:
+        List of turn dictionaries
+    """
+    our_team = our_team or {}
+    opponent_team = opponent_team or {}
+    opponent_role = "p2" if player_role == "p1" else "p1"
+    teams = {player_role: our_team, opponent_role: opponent_team}
+
+    active = {}  # side -> species
+    hp = {}  # (side, species) -> hp fraction
+    revealed = defaultdict(set)  # opponent species -> move ids seen so far
+    moves_this_turn = {}  # side -> (species, move id)
+    last_turn = 0
+    weather = ""
+    turns = []
+
+    def pokemon_record(side):
+        species = active.get(side)
+        if species is None:
+            return None
+        base = teams[side].get(species) or {}
+        data = {
+            "species": species,
+            "types": base.get("types", []),
+            "level": base.get("level"),
+            "hp": hp.get((side, species), 1.0),
+            "status": None,
+        }
+        moves = base.get("moves") or {}
+        if side == opponent_role:
+            moves = {move_id: moves.get(move_id) or {"id": move_id} for move_id in sorted(revealed[species])}
+        if moves:
+            data["moves"] = moves
+        if base.get("stats"):
+            data["stats"] = base["stats"]
+        return data
+
+    def move_record(side):
+        if side not in moves_this_turn:
+            return None
+        species, move_id = moves_this_turn[side]
+        moves = (teams[side].get(species) or {}).get("moves") or {}
+        return moves.get(move_id) or {"id": move_id}
+
+    def turn_record(turn):
+        return {
+            "turn": turn,
+            "weather": weather,
+            "fields": [],
+            "our_active": pokemon_record(player_role),
+            "opponent_active": pokemon_record(opponent_role),
+            "our_move": move_record(player_role),
+            "opponent_move": move_record(opponent_role),
+            "our_hp": {species: fraction for (side, species), fraction in hp.items() if side == player_role},
+        }
+
+    for event in events:
+        kind = event[0]
+        if kind == "turn":
+            turns.append(turn_record(event[1]))
+            last_turn = event[1]
+            moves_this_turn = {}
+        elif kind in ("win", "tie"):
+            # Close the last turn so its moves still label the state before it
+            if moves_this_turn:
+                turns.append(turn_record(last_turn + 1))
+                moves_this_turn = {}
+        elif kind == "switch":
+            _, side, species, fraction = event
+            active[side] = species
+            hp[(side, species)] = fraction
+        elif kind == "move":
+            _, side, move_id = event
+            # Moves called by other moves (Metronome, Sleep Talk...) follow the first one
+            moves_this_turn.setdefault(side, (active.get(side), move_id))
+            if side == opponent_role and active.get(side):
+                revealed[active[side]].add(move_id)
+        elif kind == "hp":
+            _, side, fraction = event
+            if active.get(side):
+                hp[(side, active[side])] = fraction
+        elif kind == "faint":
+            if active.get(event[1]):
+                hp[(event[1], active[event[1]])] = 0.0
+        elif kind == "weather":
+            weather = event[1]
+
+    return turns
@@ -0,0 +1,494 @@
+import argparse
+import inspect
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from poke_env.data import GenData
+from poke_env.environment.move import Move
+from poke_env.environment.move_category import MoveCategory
+from poke_env.environment.pokemon_type import PokemonType
+from poke_env.player.player import Player
+
+from agent import GameTheoryAgent
+from battle_snapshot import BattleSnapshot, MoveSnapshot, PokemonSnapshot
+from data_collector import BattleDataCollector
+from moveset_knowledge import MovesetKnowledge
+from payoff_builder import PayoffMatrixBuilder
+from stat_table import STATS
+from stochastic_damage import CRIT_MULTIPLIER, DAMAGE_ROLLS, crit_chance, move_accuracy
+
+SIDES = ("p1", "p2")
+TEAM_SIZE = 6
+MAX_TURNS = 200
+# Moves the simplified engine cannot model (two-turn, recharge, self-KO...)
+UNSUPPORTED_MOVE_FLAGS = ("charge", "recharge")
+# Of the 510 EV limit only multiples of 4 raise a stat, so 508 are spent
+EV_TOTAL = 508
+EV_MAX = 252
+EV_STEP = 4
+MAX_IV = 31
+
+# Per-process state, created by the pool initializer
+_worker = None
+
+
+def _random_battle_level(base_stat_total):
+    """Approximate Showdown's random battle levels: stronger species play lower."""
+    return int(min(100, max(65, round(100 - (base_stat_total - 450) / 7))))
+
+
+def _random_stats(base_stats, level, rng):
+    """Stats of one pokemon with random IVs, EVs and nature.
+
+    The agent estimates opponents' stats with StatTable's fixed random-battle
+    spread, so simulated pokemon must not share it or the estimate is exact.
+    """
+    ivs = {stat: rng.randint(0, MAX_IV) for stat in STATS}
+    evs = dict.fromkeys(STATS, 0)
+    for _ in range(EV_TOTAL // EV_STEP):
+        evs[rng.choice([stat for stat in STATS if evs[stat] < EV_MAX])] += EV_STEP
+    # Raising and lowering the same stat is one of the five neutral natures
+    boosted, lowered = rng.choice(STATS[1:]), rng.choice(STATS[1:])
+
+    stats = {}
+    for stat in STATS:
+        term = (2 * base_stats[stat] + ivs[stat] + evs[stat] // 4) * level // 100
+        if stat == "hp":
+            stats[stat] = term + level + 10
+            continue
+        value = term + 5
+        if boosted != lowered:
+            if stat == boosted:
+                value = value * 110 // 100
+            elif stat == lowered:
+                value = value * 90 // 100
+        stats[stat] = value
+    return stats
+
+
+class SimPokemon:
+    """Full-information pokemon owned by the simulator."""
+
+    def __init__(self, species, types, level, stats, moves):
+        self.species = species
+        self.types = tuple(types)
+        self.level = level
+        self.stats = stats
+        self.max_hp = stats["hp"]
+        self.hp = self.max_hp
+        self.moves = moves  # move id -> MoveSnapshot
+        self.boosts = {}
+        self.status = None
+        self.revealed = False
+        self.revealed_moves = set()
+
+    @property
+    def current_hp_fraction(self):
+        return self.hp / self.max_hp
+
+    @property
+    def fainted(self):
+        return self.hp <= 0
+
+    def view(self, own):
+        """What one side knows about this pokemon.
+
+        Our own pokemon are fully known, minus the HP stat, as in a Showdown
+        request. Opponents show HP as a percentage, hide their stats and only
+        show the moves they have used.
+        """
+        if own:
+            return PokemonSnapshot(
+                self.species, types=self.types, level=self.level, max_hp=self.max_hp,
+                current_hp_fraction=self.current_hp_fraction,
+                stats={stat: value for stat, value in self.stats.items() if stat != "hp"},
+                moves=self.moves, fainted=self.fainted,
+            )
+        return PokemonSnapshot(
+            self.species, types=self.types, level=self.level, max_hp=100,
+            current_hp_fraction=self.current_hp_fraction,
+            moves={move_id: self.moves[move_id] for move_id in self.revealed_moves},
+            fainted=self.fainted,
+        )
+
+
+class SimBattleView(BattleSnapshot):
+    """One side's view of a simulated battle, shaped like a poke_env Battle."""
+
+    def __init__(self, battle_tag, player_role, won=None, **kwargs):
+        super().__init__(battle_tag, **kwargs)
+        self.player_role = player_role
+        self.won = won
+        self.lost = None if won is None else not won
+
+
+class TeamGenerator:
+    """Random teams from the pokedex and learnsets, random-battle style.
+
+    Levels follow random battles, but every pokemon gets its own IVs, EVs
+    and nature, so its stats differ from what the agent's StatTable assumes.
+    """
+
+    def __init__(self, gen=9):
+        gen_data = GenData.from_gen(gen)
+
+        damaging_moves = {}
+        for move_id, data in gen_data.moves.items():
+            if (data.get("category") == "Status" or (data.get("basePower") or 0) < 40
+                    or data.get("isNonstandard") or data.get("isZ") or data.get("isMax")
+                    or data.get("selfdestruct")
+                    or any(flag in (data.get("flags") or {}) for flag in UNSUPPORTED_MOVE_FLAGS)):
+                continue
+            damaging_moves[move_id] = MoveSnapshot.from_move(Move(move_id, gen=gen))
+
+        self.pool = []  # (species, types, level, base stats, candidate moves)
+        for species, entry in gen_data.pokedex.items():
+            if (entry.get("num", 0) <= 0 or entry.get("evos") or entry.get("isNonstandard")
+                    or entry.get("battleOnly") or entry.get("requiredItem")):
+                continue
+            learnset = gen_data.learnset.get(species) or gen_data.learnset.get(entry.get("baseSpecies", ""), {})
+            candidates = [damaging_moves[move_id] for move_id in (learnset.get("learnset") or {})
+                          if move_id in damaging_moves]
+            if len(candidates) < 4:
+                continue
+            level = _random_battle_level(sum(entry["baseStats"].values()))
+            types = [PokemonType.from_name(t) for t in entry["types"]]
+            # Strongest moves first, so movesets are mostly sensible
+            candidates.sort(key=lambda move: move.base_power * move_accuracy(move), reverse=True)
+            self.pool.append((species, types, level, entry["baseStats"], candidates[:16]))
+
+    def random_team(self, rng, size=TEAM_SIZE):
+        team = []
+        for species, types, level, base_stats, candidates in rng.sample(self.pool, size):
+            stab = [move for move in candidates if move.type in types]
+            moves = rng.sample(stab, min(2, len(stab)))
+            others = [move for move in candidates if move not in moves]
+            moves += rng.sample(others, 4 - len(moves))
+            stats = _random_stats(base_stats, level, rng)
+            team.append(SimPokemon(species, types, level, stats, {move.id: move for move in moves}))
+        return team
+
+
+class SimulatedBattle:
+    """A singles battle resolved in-process with the payoff builder's damage model.
+
+    Covers turn order (switches, then priority, then speed), accuracy, crits,
+    damage rolls, fainting and forced switches. Abilities, items, status and
+    stat-changing effects are not modelled; status moves do nothing.
+
+    Both sides receive Showdown protocol lines for everything that happens, so
+    BattleDataCollector's event recorder logs simulated battles exactly like
+    real ones.
+    """
+
+    def __init__(self, battle_tag, teams, battle_format="gen9randombattle", rng=None):
+        self.battle_tag = battle_tag
+        self.format = battle_format
+        self.teams = dict(zip(SIDES, teams))
+        self.active = {side: team[0] for side, team in self.teams.items()}
+        self.turn = 0
+        self.winner = None
+        self.rng = rng or random.Random()
+        self._lines = []
+
+    def side_tag(self, side):
+        return f"{self.battle_tag}-{side}"
+
+    def view(self, side, forced_switch=False, won=None):
+        """Battle facade for one side's agent."""
+        other = SIDES[1 - SIDES.index(side)]
+        active = self.active[side]
+        opponent_active = self.active[other]
+        bench = [pokemon for pokemon in self.teams[side] if pokemon is not active and not pokemon.fainted]
+        return SimBattleView(
+            self.side_tag(side),
+            side,
+            won=won,
+            turn=self.turn,
+            format=self.format,
+            active_pokemon=active.view(own=True),
+            opponent_active_pokemon=opponent_active.view(own=False),
+            available_moves=[] if forced_switch or active.fainted else list(active.moves.values()),
+            available_switches=[pokemon.view(own=True) for pokemon in bench],
+            team={f"{side}: {pokemon.species}": pokemon.view(own=True) for pokemon in self.teams[side]},
+            opponent_team={
+                f"{other}: {pokemon.species}": pokemon.view(own=False)
+                for pokemon in self.teams[other] if pokemon.revealed
+            },
+        )
+
+    def play(self, agents):
+        """Play the battle to the end.
+
+        Args:
+            agents: {"p1": agent, "p2": agent}; anything with a synchronous
+                choose_move(battle) returning a BattleOrder
+
+        Returns:
+            Winning side, or None for a tie at MAX_TURNS
+        """
+        for side in SIDES:
+            self._switch_in(side, self.active[side])
+        self._next_turn(agents)
+
+        while self.winner is None and self.turn <= MAX_TURNS:
+            actions = {side: self._decide(agents[side], side) for side in SIDES}
+            self._resolve(actions)
+
+            for side in SIDES:
+                if self.winner is None and self.active[side].fainted:
+                    self._switch_in(side, self._decide(agents[side], side, forced_switch=True))
+            self._next_turn(agents)
+
+        if self.winner is not None:
+            self._lines.append(["", "win", self.winner])
+        else:
+            self._lines.append(["", "tie"])
+        self._flush(agents)
+
+        for side in SIDES:
+            finished = getattr(agents[side], '_battle_finished_callback', None)
+            if finished is not None:
+                won = None if self.winner is None else self.winner == side
+                finished(self.view(side, won=won))
+        return self.winner
+
+    def _decide(self, agent, side, forced_switch=False):
+        battle = self.view(side, forced_switch=forced_switch)
+        order = agent.choose_move(battle)
+        if inspect.isawaitable(order):
+            order.close()
+            raise ValueError("Simulated battles need agents that decide synchronously (no executor_mode)")
+
+        choice = getattr(order, 'order', None)
+        if isinstance(choice, PokemonSnapshot):
+            return next(pokemon for pokemon in self.teams[side] if pokemon.species == choice.species)
+        active = self.active[side]
+        if forced_switch or active.fainted:
+            # Agents should never pick a move here; take any healthy pokemon
+            return next(pokemon for pokemon in self.teams[side] if not pokemon.fainted)
+        if isinstance(choice, MoveSnapshot) and choice.id in active.moves:
+            return active.moves[choice.id]
+        return next(iter(active.moves.values()))
+
+    def _resolve(self, actions):
+        switches = [side for side in SIDES if isinstance(actions[side], SimPokemon)]
+        for side in switches:
+            self._switch_in(side, actions[side])
+
+        movers = [side for side in SIDES if side not in switches]
+        if len(movers) == 2:
+            first, second = movers if self.rng.random() < 0.5 else movers[::-1]
+            builder = _move_order_builder()
+            if not builder._determines_move_order(
+                    actions[first], actions[second], self.active[first], self.active[second]):
+                first, second = second, first
+            movers = [first, second]
+
+        for side in movers:
+            if self.winner is not None or self.active[side].fainted:
+                continue
+            self._use_move(side, actions[side])
+
+    def _use_move(self, side, move):
+        other = SIDES[1 - SIDES.index(side)]
+        attacker, defender = self.active[side], self.active[other]
+        attacker.revealed_moves.add(move.id)
+        self._lines.append(["", "move", f"{side}a: {attacker.species}", move.id, f"{other}a: {defender.species}"])
+
+        if move.category == MoveCategory.STATUS:
+            return
+        if self.rng.random() >= move_accuracy(move):
+            self._lines.append(["", "-miss", f"{side}a: {attacker.species}", f"{other}a: {defender.species}"])
+            return
+
+        damage = _move_order_builder()._calculate_move_damage(move, attacker, defender)
+        damage *= self.rng.choice(DAMAGE_ROLLS)
+        if self.rng.random() < crit_chance(move):
+            damage *= CRIT_MULTIPLIER
+        if damage <= 0:
+            return
+        defender.hp = max(0, defender.hp - max(1, int(damage)))
+
+        condition = f"{defender.hp}/{defender.max_hp}" if defender.hp else "0 fnt"
+        self._lines.append(["", "-damage", f"{other}a: {defender.species}", condition])
+        if defender.fainted:
+            self._lines.append(["", "faint", f"{other}a: {defender.species}"])
+            if all(pokemon.fainted for pokemon in self.teams[other]):
+                self.winner = side
+
+    def _switch_in(self, side, pokemon):
+        self.active[side] = pokemon
+        pokemon.revealed = True
+        self._lines.append([
+            "", "switch", f"{side}a: {pokemon.species}", f"{pokemon.species}, L{pokemon.level}",
+            f"{pokemon.hp}/{pokemon.max_hp}",
+        ])
+
+    def _next_turn(self, agents):
+        self.turn += 1
+        if self.winner is None:
+            self._lines.append(["", "turn", str(self.turn)])
+        self._flush(agents)
+
+    def _flush(self, agents):
+        for side in SIDES:
+            collector = getattr(agents[side], 'data_collector', None)
+            if collector is not None:
+                collector.record_messages([[">" + self.side_tag(side)]] + self._lines)
+        self._lines = []
+
+
+class RandomPolicy:
+    """Baseline opponent picking uniformly among the legal actions."""
+
+    def __init__(self, rng=None):
+        self.rng = rng or random.Random()
+
+    def choose_move(self, battle):
+        return Player.create_order(self.rng.choice(battle.available_moves + battle.available_switches))
+
+
+class _NullDashboard:
+    def send_battle_state(self, battle, payoff_matrix, move_probabilities):
+        pass
+
+
+_builder = None
+
+
+def _move_order_builder():
+    """Payoff builder whose damage and speed formulas drive the engine."""
+    global _builder
+    if _builder is None:
+        _builder = PayoffMatrixBuilder(include_switches=False)
+    return _builder
+
+
+def make_simulated_agent(data_dir, battle_format="gen9randombattle", **agent_options):
+    """GameTheoryAgent that never connects to a server and logs to data_dir.
+
+    Simulated teams are not real random-battle sets, so the agent's moveset
+    knowledge is kept in data_dir too.
+    """
+    agent = GameTheoryAgent(battle_format=battle_format, start_listening=False, **agent_options)
+    agent.data_collector = BattleDataCollector(data_dir)
+    agent.payoff_builder.knowledge = MovesetKnowledge(os.path.join(data_dir, "moveset_knowledge.sqlite"))
+    agent.dashboard_connector = _NullDashboard()
+    return agent
+
+
+def _init_simulation_worker(data_dir, battle_format, opponent, agent_options, seed):
+    global _worker
+    rng = random.Random(None if seed is None else seed + os.getpid())
+    agents = {"p1": make_simulated_agent(data_dir, battle_format, **agent_options)}
+    if opponent == "random":
+        agents["p2"] = RandomPolicy(rng)
+    else:
+        agents["p2"] = make_simulated_agent(data_dir, battle_format, **agent_options)
+    _worker = {
+        "agents": agents,
+        "generator": TeamGenerator(),
+        "rng": rng,
+        "format": battle_format,
+        "played": 0,
+    }
+
+
+def simulate_battles(n_battles):
+    """Play n_battles in this worker process.
+
+    Returns:
+        List of (winning side or None, number of turns)
+    """
+    results = []
+    for _ in range(n_battles):
+        rng = _worker["rng"]
+        teams = [_worker["generator"].random_team(rng) for _ in SIDES]
+        battle_tag = f"battle-{_worker['format']}-sim{os.getpid()}x{_worker['played']}"
+        _worker["played"] += 1
+        battle = SimulatedBattle(battle_tag, teams, _worker["format"], rng)
+        results.append((battle.play(_worker["agents"]), battle.turn))
+    return results
+
+
+def run_self_play(n_battles, workers=None, data_dir="logs/battle_data", battle_format="gen9randombattle",
+                  opponent="self", agent_options=None, chunk_size=10, seed=None):
+    """Generate training logs from simulated battles across worker processes.
+
+    Args:
+        n_battles: Number of battles
+        workers: Number of worker processes (defaults to the CPU count)
+        data_dir: Where BattleDataCollector writes the battle files
+        battle_format: Format recorded in the logs
+        opponent: "self" for GameTheoryAgent on both sides, "random" for RandomPolicy
+        agent_options: Extra GameTheoryAgent keyword arguments
+        chunk_size: Battles per job
+        seed: Base random seed (per-process seeds are derived from it)
+
+    Returns:
+        Summary dictionary with win counts, turns and throughput
+    """
+    agent_options = dict(agent_options or {})
+    # Offline battles have no turn clock; keep decisions fast by default
+    agent_options.setdefault("turn_time_budget", 0.05)
+    chunks = [min(chunk_size, n_battles - start) for start in range(0, n_battles, chunk_size)]
+
+    started = time.perf_counter()
+    # poke_env runs its event loop in a background thread, which forked
+    # workers would inherit without it running, so workers are spawned
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_simulation_worker,
+        initargs=(data_dir, battle_format, opponent, agent_options, seed)
+    ) as pool:
+        results = [result for chunk in pool.map(simulate_battles, chunks) for result in chunk]
+    elapsed = time.perf_counter() - started
+
+    return {
+        "battles": len(results),
+        "p1_wins": sum(1 for winner, _ in results if winner == "p1"),
+        "p2_wins": sum(1 for winner, _ in results if winner == "p2"),
+        "ties": sum(1 for winner, _ in results if winner is None),
+        "mean_turns": sum(turns for _, turns in results) / len(results) if results else 0.0,
+        "wall_seconds": elapsed,
+        "battles_per_minute": 60.0 * len(results) / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def main():
+    """Generate training logs with in-process simulated battles."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--battles", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--data-dir", default="logs/battle_data")
+    parser.add_argument("--format", default="gen9randombattle")
+    parser.add_argument("--opponent", choices=("self", "random"), default="self")
+    parser.add_argument("--turn-time-budget", type=float, default=0.05)
+    parser.add_argument("--stochastic-damage", action="store_true")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    summary = run_self_play(
+        args.battles,
+        workers=args.workers,
+        data_dir=args.data_dir,
+        battle_format=args.format,
+        opponent=args.opponent,
+        agent_options={
+            "turn_time_budget": args.turn_time_budget,
+            "payoff_options": {"stochastic_damage": args.stochastic_damage},
+        },
+        seed=args.seed,
+    )
+    print(f"Simulated {summary['battles']} battles in {summary['wall_seconds']:.1f}s "
+          f"({summary['battles_per_minute']:.0f}/min, {summary['mean_turns']:.1f} turns on average): "
+          f"p1 {summary['p1_wins']}, p2 {summary['p2_wins']}, ties {summary['ties']}")
+
+
+if __name__ == "__main__":
+    main()
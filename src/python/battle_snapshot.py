@@ -0,0 +1,201 @@
+from poke_env.environment.move_category import MoveCategory
+from poke_env.environment.pokemon_type import PokemonType
+
+
+def _enum_from_record(enum_class, value):
+    """Parse enums stored by BattleDataCollector, e.g. "FIRE (pokemon type) object"."""
+    if value is None or isinstance(value, enum_class):
+        return value
+    try:
+        return enum_class[str(value).split(" ")[0].upper()]
+    except KeyError:
+        return None
+
+
+class MoveSnapshot:
+    """Picklable copy of the Move attributes used by the decision pipeline."""
+
+    def __init__(self, move_id, type=None, category=None, base_power=0,
+                 accuracy=1.0, priority=0, crit_ratio=0, status=None):
+        self.id = move_id
+        self.type = type
+        self.category = category
+        self.base_power = base_power
+        self.accuracy = accuracy
+        self.priority = priority
+        self.crit_ratio = crit_ratio
+        self.status = status
+
+    @classmethod
+    def from_move(cls, move):
+        """Copy a poke_env Move.
+
+        Args:
+            move: Move object
+
+        Returns:
+            MoveSnapshot
+        """
+        return cls(
+            move.id,
+            type=move.type,
+            category=move.category,
+            base_power=move.base_power,
+            accuracy=move.accuracy,
+            priority=move.priority,
+            crit_ratio=getattr(move, 'crit_ratio', 0),
+            status=getattr(move, 'status', None),
+        )
+
+    @classmethod
+    def from_record(cls, data):
+        """Rebuild a move from a BattleDataCollector move dict.
+
+        Args:
+            data: Dictionary with move data
+
+        Returns:
+            MoveSnapshot
+        """
+        return cls(
+            data["id"],
+            type=_enum_from_record(PokemonType, data.get("type")),
+            category=_enum_from_record(MoveCategory, data.get("category")),
+            base_power=data.get("base_power") or 0,
+            accuracy=data.get("accuracy", 1.0),
+            priority=data.get("priority") or 0,
+        )
+
+
+class PokemonSnapshot:
+    """Picklable copy of the Pokemon attributes used by the decision pipeline."""
+
+    def __init__(self, species, types=(), level=100, max_hp=100, current_hp_fraction=1.0,
+                 stats=None, boosts=None, status=None, moves=None, fainted=False):
+        self.species = species
+        self.types = tuple(types)
+        self.level = level
+        self.max_hp = max_hp
+        self.current_hp_fraction = current_hp_fraction
+        self.stats = dict(stats or {})
+        self.boosts = dict(boosts or {})
+        self.status = status
+        self.moves = dict(moves or {})
+        self.fainted = fainted
+
+    @classmethod
+    def from_pokemon(cls, pokemon):
+        """Copy a poke_env Pokemon.
+
+        Args:
+            pokemon: Pokemon object (may be None)
+
+        Returns:
+            PokemonSnapshot or None
+        """
+        if pokemon is None:
+            return None
+
+        return cls(
+            pokemon.species,
+            types=pokemon.types,
+            level=pokemon.level,
+            max_hp=pokemon.max_hp,
+            current_hp_fraction=pokemon.current_hp_fraction,
+            stats=pokemon.stats if hasattr(pokemon, 'stats') else {},
+            boosts=pokemon.boosts if hasattr(pokemon, 'boosts') else {},
+            status=pokemon.status,
+            moves={
+                move_id: MoveSnapshot.from_move(move)
+                for move_id, move in pokemon.moves.items()
+            } if hasattr(pokemon, 'moves') else {},
+            fainted=getattr(pokemon, 'fainted', False),
+        )
+
+    @classmethod
+    def from_record(cls, data):
+        """Rebuild a pokemon from a BattleDataCollector pokemon dict.
+
+        Args:
+            data: Dictionary with pokemon data (may be None)
+
+        Returns:
+            PokemonSnapshot or None
+        """
+        if not data:
+            return None
+
+        stats = data.get("stats") or {}
+        types = [_enum_from_record(PokemonType, t) for t in data.get("types") or []]
+        return cls(
+            data["species"],
+            types=[t for t in types if t is not None],
+            level=data.get("level") or 100,
+            # Opponent HP is only known as a percentage
+            max_hp=stats.get("hp") or 100,
+            current_hp_fraction=data.get("hp") if data.get("hp") is not None else 1.0,
+            stats=stats,
+            status=data.get("status"),
+            moves={
+                move_id: MoveSnapshot.from_record(move)
+                for move_id, move in (data.get("moves") or {}).items()
+                if move
+            },
+            fainted=data.get("hp") == 0,
+        )
+
+
+class BattleSnapshot:
+    """Compact, picklable view of a battle.
+
+    Exposes the subset of the poke_env Battle interface read by
+    PayoffMatrixBuilder and OpponentModel, so the decision pipeline can run
+    in a worker thread or process without touching the live battle object.
+    """
+
+    def __init__(self, battle_tag, turn=0, format=None, weather=None, fields=None,
+                 active_pokemon=None, opponent_active_pokemon=None,
+                 available_moves=None, available_switches=None, team=None, opponent_team=None):
+        self.battle_tag = battle_tag
+        self.turn = turn
+        self.format = format
+        self.weather = weather if weather is not None else {}
+        self.fields = fields if fields is not None else {}
+        self.active_pokemon = active_pokemon
+        self.opponent_active_pokemon = opponent_active_pokemon
+        self.available_moves = list(available_moves or [])
+        self.available_switches = list(available_switches or [])
+        self.team = dict(team or {})
+        self.opponent_team = dict(opponent_team or {})
+
+    @classmethod
+    def from_battle(cls, battle):
+        """Copy the decision-relevant state of a poke_env Battle.
+
+        Args:
+            battle: Battle object
+
+        Returns:
+            BattleSnapshot
+        """
+        return cls(
+            battle.battle_tag,
+            turn=battle.turn,
+            format=getattr(battle, 'format', None),
+            weather=dict(battle.weather),
+            fields=dict(battle.fields),
+            active_pokemon=PokemonSnapshot.from_pokemon(battle.active_pokemon),
+            opponent_active_pokemon=PokemonSnapshot.from_pokemon(battle.opponent_active_pokemon),
+            available_moves=[MoveSnapshot.from_move(move) for move in battle.available_moves],
+            available_switches=[
+                PokemonSnapshot.from_pokemon(pokemon) for pokemon in battle.available_switches
+            ],
+            team={
+                identifier: PokemonSnapshot.from_pokemon(pokemon)
+                for identifier, pokemon in battle.team.items()
+            },
+            opponent_team={
+                identifier: PokemonSnapshot.from_pokemon(pokemon)
+                for identifier, pokemon in battle.opponent_team.items()
+            },
+        )
@@ -0,0 +1,134 @@
+from collections import defaultdict
+
+OUR_SIDE = "self"
+OPPONENT_SIDE = "opponent"
+
+
+def pokemon_signature(pokemon):
+    """Everything about a pokemon that changes the damage it deals or takes.
+
+    HP is deliberately left out: the table stores damage as a fraction of
+    max HP, which does not depend on how much HP is left.
+    """
+    stats = getattr(pokemon, 'stats', None) or {}
+    boosts = getattr(pokemon, 'boosts', None) or {}
+    moves = getattr(pokemon, 'moves', None) or {}
+    return (
+        tuple(str(t) for t in pokemon.types),
+        pokemon.level,
+        pokemon.max_hp,
+        tuple(sorted(stats.items())),
+        tuple(sorted((stat, stage) for stat, stage in boosts.items() if stage)),
+        tuple(sorted(moves)),
+    )
+
+
+class DamageTable:
+    """Precomputed damage fractions for one battle.
+
+    Entries cover every known move of every known pokemon against every known
+    pokemon on the other side. Pokemon are keyed by (side, species), so mirror
+    matches do not collide. sync() is called once per decision and only
+    recomputes the slices of pokemon that were newly revealed or whose
+    boosts, stats, types or moveset changed since the last sync.
+    """
+
+    def __init__(self, payoff_builder):
+        """Initialize an empty table.
+
+        Args:
+            payoff_builder: PayoffMatrixBuilder whose damage formula fills the table
+        """
+        self.payoff_builder = payoff_builder
+        self.entries = {}  # (attacker key, move id, defender key) -> (damage fraction, type multiplier)
+        self.signatures = {}  # pokemon key -> signature of the pokemon the entries were built from
+        self.pokemon = {}  # pokemon key -> latest pokemon object
+        self._slices = defaultdict(set)  # pokemon key -> entry keys it appears in
+
+    def sync(self, battle):
+        """Bring the table up to date with the battle.
+
+        Args:
+            battle: Battle or BattleSnapshot
+
+        Returns:
+            Number of pokemon whose slices were recomputed
+        """
+        stale = []
+        for side, team in ((OUR_SIDE, self._our_pokemon(battle)),
+                           (OPPONENT_SIDE, self._opponent_pokemon(battle))):
+            for pokemon in team:
+                if pokemon is None or not pokemon.species:
+                    continue
+                key = (side, pokemon.species)
+                self.pokemon[key] = pokemon
+                signature = pokemon_signature(pokemon)
+                if self.signatures.get(key) != signature:
+                    self._invalidate(key)
+                    self.signatures[key] = signature
+                    stale.append(key)
+
+        for key in stale:
+            self._fill(key)
+
+        return len(stale)
+
+    def lookup(self, move, attacker, attacker_side, defender, defender_side):
+        """Damage fraction and type multiplier of move from attacker to defender.
+
+        Missing entries (e.g. predicted opponent moves that were never
+        revealed) are computed once and stored in both pokemon's slices.
+
+        Returns:
+            Tuple of (damage as a fraction of defender max HP, type multiplier)
+        """
+        attacker_key = (attacker_side, attacker.species)
+        defender_key = (defender_side, defender.species)
+        entry_key = (attacker_key, move.id, defender_key)
+        entry = self.entries.get(entry_key)
+        if entry is None:
+            entry = self._store(entry_key, move, attacker, defender)
+        return entry
+
+    def _fill(self, key):
+        pokemon = self.pokemon[key]
+        other_side = OPPONENT_SIDE if key[0] == OUR_SIDE else OUR_SIDE
+
+        for other_key, other in self.pokemon.items():
+            if other_key[0] != other_side:
+                continue
+            for move in pokemon.moves.values():
+                entry_key = (key, move.id, other_key)
+                if entry_key not in self.entries:
+                    self._store(entry_key, move, pokemon, other)
+            for move in other.moves.values():
+                entry_key = (other_key, move.id, key)
+                if entry_key not in self.entries:
+                    self._store(entry_key, move, other, pokemon)
+
+    def _store(self, entry_key, move, attacker, defender):
+        builder = self.payoff_builder
+        damage = builder._calculate_move_damage(move, attacker, defender)
+        entry = (damage / builder._max_hp(defender), builder._calculate_type_effectiveness(move, defender))
+        self.entries[entry_key] = entry
+        self._slices[entry_key[0]].add(entry_key)
+        self._slices[entry_key[2]].add(entry_key)
+        return entry
+
+    def _invalidate(self, key):
+        for entry_key in self._slices.pop(key, ()):
+            self.entries.pop(entry_key, None)
+            other_key = entry_key[2] if entry_key[0] == key else entry_key[0]
+            self._slices[other_key].discard(entry_key)
+
+    def _our_pokemon(self, battle):
+        team = getattr(battle, 'team', None)
+        if team:
+            return list(team.values())
+        return [battle.active_pokemon] + list(battle.available_switches or [])
+
+    def _opponent_pokemon(self, battle):
+        team = getattr(battle, 'opponent_team', None)
+        if team:
+            return list(team.values())
+        return [battle.opponent_active_pokemon]
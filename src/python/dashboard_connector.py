@@ -1,14 +1,39 @@
-import requests
 import json
+import queue
+import socket
+import threading
+import time
 
 class DashboardConnector:
-    def __init__(self, host="localhost", port=5000):
+    """Streams battle states to the dashboard's TCP listener.
+
+    Every state is one JSON document followed by a newline, written to a
+    single persistent connection. Sending only puts the encoded state on a
+    bounded queue; a background thread connects and writes, so a slow or
+    stalled dashboard never blocks the event loop. States are dropped when
+    the queue is full or the dashboard is not running, and connecting is
+    retried after RETRY_SECONDS, so a closed dashboard costs one failed
+    connect per interval, not per turn.
+    """
+
+    RETRY_SECONDS = 5.0
+    # States waiting for the sender thread; newer ones are dropped beyond this
+    MAX_QUEUED = 256
+
+    def __init__(self, host="127.0.0.1", port=8888, timeout=0.5):
         self.host = host
         self.port = port
-        self.base_url = f"http://{host}:{port}"
-    
+        self.timeout = timeout
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=self.MAX_QUEUED)
+        self._thread = None
+        self._socket = None
+        self._retry_at = 0.0
+        self._logged_connection_error = False
+
     def send_battle_state(self, battle, payoff_matrix, move_probabilities):
         battle_state = {
+            "battle_tag": battle.battle_tag,
             "active_pokemon": {
                 "self": self._extract_pokemon_data(battle.active_pokemon),
                 "opponent": self._extract_pokemon_data(battle.opponent_active_pokemon)
@@ -21,39 +46,88 @@ class DashboardConnector:
         }
 
         self._send_to_dashboard(battle_state)
-    
+
+    def close(self):
+        """Stop the sender thread and close the connection to the dashboard."""
+        if self._thread is None:
+            return
+        # Make room for the stop marker; whatever is still queued is dropped anyway
+        while True:
+            try:
+                self._queue.put_nowait(None)
+                break
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    pass
+        self._thread.join()
+        self._thread = None
+
     def _extract_pokemon_data(self, pokemon):
         if not pokemon:
             return None
-        
+
         return {
             "species": pokemon.species,
             "hp": pokemon.current_hp_fraction,
-            "types": [str(type_) for type_ in pokemon.types],
+            "types": [self._name(type_) for type_ in pokemon.types if type_ is not None],
             "moves": [
                 {
                     "id": move.id,
                     "name": move.id.replace("-", " ").title(),
-                    "type": str(move.type),
+                    "type": self._name(move.type),
                     "base_power": move.base_power,
-                    "category": move.category
-                } 
+                    "category": self._name(move.category)
+                }
                 for move in pokemon.moves.values()
             ] if hasattr(pokemon, 'moves') else []
         }
-    
+
+    def _name(self, value):
+        # poke_env enums; snapshots rebuilt from records may already hold strings
+        return value.name if hasattr(value, 'name') else str(value)
+
     def _send_to_dashboard(self, data):
+        # Encoding errors are the caller's to see; only connection failures are quiet
+        message = (json.dumps(data) + "\n").encode("utf-8")
+
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run_sender, name="dashboard", daemon=True)
+            self._thread.start()
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run_sender(self):
+        """Write queued states to the dashboard until close() (sender thread)."""
+        while True:
+            message = self._queue.get()
+            if message is None:
+                break
+            self._write(message)
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def _write(self, message):
+        if self._socket is None:
+            if time.monotonic() < self._retry_at:
+                return
+            try:
+                self._socket = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            except OSError:
+                self._retry_at = time.monotonic() + self.RETRY_SECONDS
+                if not self._logged_connection_error:
+                    print("Dashboard not running - continuing without visualization")
+                    self._logged_connection_error = True
+                return
+
         try:
-            response = requests.post(
-                f"{self.base_url}/battle-state",
-                json=data,
-                timeout=1
-            )
-            if response.status_code != 200:
-                print(f"Error sending data to dashboard: {response.status_code}")
-        except requests.exceptions.RequestException as e:
-            if not hasattr(self, '_logged_connection_error'):
-                print("Dashboard not running - continuing without visualization")
-                self._logged_connection_error = True
-        except Exception as e:
-            print(f"Error sending data to dashboard: {e}")
\ No newline at end of file
+            self._socket.sendall(message)
+        except OSError as e:
+            print(f"Lost connection to dashboard: {e}")
+            self._socket.close()
+            self._socket = None
+            self._retry_at = time.monotonic() + self.RETRY_SECONDS
@@ -1,25 +1,45 @@
-import json
 import os
 import time
 from datetime import datetime
 
+from battle_catalog import BattleCatalog, dump_battle_with_offsets
+from battle_events import BattleEventRecorder, rebuild_turns
+
 class BattleDataCollector:
     """Records battle data for training opponent models."""
     
-    def __init__(self, data_dir="logs/battle_data"):
+    def __init__(self, data_dir="logs/battle_data", catalog=None, index=True):
         """Initialize the data collector.
         
         Args:
             data_dir: Directory to store battle data
+            catalog: BattleCatalog to index saved battles in (defaults to
+                catalog.sqlite inside data_dir, opened when the first battle
+                is saved)
+            index: Whether to index saved battles at all
         """
         self.data_dir = data_dir
         self.current_battles = {}
+        self.event_recorder = BattleEventRecorder()
+        self.index = index
+        self.catalog = catalog if index else None
+    
+    def record_messages(self, split_messages):
+        """Record the events in a batch of battle messages.
+        
+        Battles recorded this way are saved from their event log, with turn
+        records and opponent move labels rebuilt when the battle ends.
         
-        # Create directory if it doesn't exist
-        os.makedirs(data_dir, exist_ok=True)
+        Args:
+            split_messages: Messages as passed to Player._handle_battle_message
+        """
+        self.event_recorder.record(split_messages)
     
     def record_battle_state(self, battle, turn_num, our_move=None, opponent_move=None):
-        """Record the current state of a battle.
+        """Record the current state of a battle by polling the battle object.
+        
+        Superseded by record_messages; kept for callers without access to the
+        message stream.
         
         Args:
             battle: Battle object
@@ -70,6 +90,10 @@ class BattleDataCollector:
         """
         battle_id = battle.battle_tag
         
+        events, started_at = self.event_recorder.pop(battle_id)
+        if events:
+            self.current_battles[battle_id] = self._battle_from_events(battle, events, started_at)
+        
         if battle_id not in self.current_battles:
             return
         
@@ -77,16 +101,63 @@ class BattleDataCollector:
         self.current_battles[battle_id]["result"] = "win" if won else "loss" 
         self.current_battles[battle_id]["ended_at"] = datetime.now().isoformat()
         
-        # Save to file
+        # Save to file, creating the directory on the first battle
+        os.makedirs(self.data_dir, exist_ok=True)
         filename = f"{battle_id}_{int(time.time())}.json"
         filepath = os.path.join(self.data_dir, filename)
         
-        with open(filepath, 'w') as f:
-            json.dump(self.current_battles[battle_id], f, indent=2)
+        # Written as bytes: text-mode newline translation would shift the turn offsets
+        text, offsets = dump_battle_with_offsets(self.current_battles[battle_id])
+        with open(filepath, 'wb') as f:
+            f.write(text.encode('ascii'))
+        
+        if self.index:
+            try:
+                if self.catalog is None:
+                    self.catalog = BattleCatalog(os.path.join(self.data_dir, "catalog.sqlite"))
+                self.catalog.add_battle(filepath, self.current_battles[battle_id], offsets)
+            except Exception as e:
+                print(f"Error indexing battle {battle_id}: {e}")
         
         # Remove from current battles
         del self.current_battles[battle_id]
     
+    def _battle_from_events(self, battle, events, started_at):
+        """Build a battle record from its event log.
+        
+        Teams are extracted once here instead of on every turn.
+        
+        Args:
+            battle: Finished Battle object
+            events: Event tuples recorded for the battle
+            started_at: ISO time the first message was seen
+            
+        Returns:
+            Battle data dictionary in the record_battle_state layout, plus the events
+        """
+        our_team = self._extract_team_data(battle.team)
+        opponent_team = {
+            pokemon.species: self._extract_pokemon_data(pokemon)
+            for pokemon in battle.opponent_team.values()
+        }
+        turns = rebuild_turns(
+            events,
+            battle.player_role,
+            our_team={data["species"]: data for data in our_team.values() if data},
+            opponent_team=opponent_team,
+        )
+        
+        return {
+            "battle_id": battle.battle_tag,
+            "format": battle.format,
+            "started_at": started_at,
+            "player_role": battle.player_role,
+            "our_team": our_team,
+            "opponent_team": opponent_team,
+            "events": [list(event) for event in events],
+            "turns": turns,
+        }
+    
     def _extract_team_data(self, team):
         """Extract relevant data from a team.
         
@@ -121,6 +192,8 @@ class BattleDataCollector:
             "level": pokemon.level,
             "hp": pokemon.current_hp_fraction if hasattr(pokemon, 'current_hp_fraction') else None,
             "status": str(pokemon.status) if pokemon.status else None,
+            "item": getattr(pokemon, 'item', None),
+            "ability": getattr(pokemon, 'ability', None),
         }
         
         if hasattr(pokemon, 'moves') and pokemon.moves:
@@ -150,7 +223,7 @@ class BattleDataCollector:
             "id": move.id,
             "type": str(move.type),
             "base_power": move.base_power,
-            "category": move.category,
+            "category": str(move.category),
             "accuracy": move.accuracy,
             "priority": move.priority
         }
\ No newline at end of file
@@ -0,0 +1,144 @@
+import asyncio
+import itertools
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from anytime_decision import AnytimeDecider
+from game_search import SearchDecider
+from payoff_builder import PayoffMatrixBuilder
+
+# Finished battles announced to process workers with every task; a worker
+# that sees no task for this many battles keeps their caches until evicted
+FORGOTTEN_HISTORY = 256
+
+# Per-process decider, created by the process pool initializer
+_worker_decider = None
+# Highest forgotten-battle sequence number this worker has applied
+_worker_forgotten_seq = 0
+
+
+def run_decision_pipeline(battle, decider, deadline=None):
+    """Build the payoff matrix for a battle and solve it within the deadline.
+
+    Args:
+        battle: Battle or BattleSnapshot
+        decider: AnytimeDecider to use
+        deadline: TurnDeadline for this turn, or None
+
+    Returns:
+        Tuple of (payoff_matrix, move_probabilities, tier)
+    """
+    return decider.decide(battle, deadline)
+
+
+def _init_process_worker(payoff_options, search_options):
+    global _worker_decider
+    payoff_builder = PayoffMatrixBuilder(**payoff_options)
+    if search_options is None:
+        _worker_decider = AnytimeDecider(payoff_builder)
+    else:
+        _worker_decider = SearchDecider(payoff_builder, **search_options)
+
+
+def _process_worker_decide(snapshot, deadline, forgotten=()):
+    global _worker_forgotten_seq
+    for seq, battle_tag in forgotten:
+        if seq > _worker_forgotten_seq:
+            _worker_decider.forget_battle(battle_tag)
+            _worker_decider.payoff_builder.forget_battle(battle_tag)
+            _worker_forgotten_seq = seq
+    # The agent process records every finished battle; pick its sets up here
+    _worker_decider.payoff_builder.knowledge.reload_if_changed()
+    return run_decision_pipeline(snapshot, _worker_decider, deadline)
+
+
+class DecisionExecutor:
+    """Runs the decision pipeline off the asyncio event loop.
+
+    In "thread" mode the agent's own AnytimeDecider is shared by a thread
+    pool; the native solver releases the GIL while it iterates. In "process"
+    mode every worker builds its own AnytimeDecider, PayoffMatrixBuilder and
+    OpponentModel once, and receives BattleSnapshot objects. Workers are
+    spawned, since a forked child would inherit poke_env's event loop without
+    the thread running it. Battles passed to forget_battle ride along with
+    later tasks so every worker drops their damage tables and cached
+    strategies, and workers reload the moveset knowledge base whenever its
+    file changed. At most max_in_flight decisions are submitted at once; the
+    rest wait on the loop.
+    """
+
+    MODES = ("thread", "process")
+
+    def __init__(self, mode="thread", max_workers=None, max_in_flight=4, decider=None,
+                 payoff_options=None, search_options=None):
+        """Initialize the executor.
+
+        Args:
+            mode: "thread" or "process"
+            max_workers: Pool size (defaults to max_in_flight)
+            max_in_flight: Maximum number of decisions running concurrently
+            decider: Shared AnytimeDecider for thread mode
+            payoff_options: PayoffMatrixBuilder keyword arguments for process workers
+            search_options: SearchDecider keyword arguments for process workers,
+                or None for the one-turn AnytimeDecider
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown executor mode: {mode}")
+
+        self.mode = mode
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_workers = max_workers or self.max_in_flight
+        self.decider = decider or AnytimeDecider(PayoffMatrixBuilder())
+        self._semaphore = None
+        self._forgotten = deque(maxlen=FORGOTTEN_HISTORY)  # (sequence number, battle tag)
+        self._forgotten_seq = itertools.count(1)
+
+        if mode == "process":
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_process_worker,
+                initargs=(dict(payoff_options or {}), search_options)
+            )
+        else:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="decision"
+            )
+
+    async def decide(self, snapshot, deadline=None):
+        """Run the decision pipeline for a snapshot in the pool.
+
+        Args:
+            snapshot: BattleSnapshot of the current turn
+            deadline: TurnDeadline for this turn, or None
+
+        Returns:
+            Tuple of (payoff_matrix, move_probabilities, tier)
+        """
+        # Created lazily so it binds to the loop that is actually running
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+
+        loop = asyncio.get_running_loop()
+        async with self._semaphore:
+            if self.mode == "process":
+                return await loop.run_in_executor(
+                    self._pool, _process_worker_decide, snapshot, deadline, tuple(self._forgotten)
+                )
+            return await loop.run_in_executor(
+                self._pool, run_decision_pipeline, snapshot, self.decider, deadline
+            )
+
+    def forget_battle(self, battle_tag):
+        """Have process workers drop the caches of a finished battle.
+
+        In thread mode the decider is the agent's own, which forgets it directly.
+        """
+        if self.mode == "process":
+            self._forgotten.append((next(self._forgotten_seq), battle_tag))
+
+    def shutdown(self, wait=True):
+        """Shut down the underlying pool."""
+        self._pool.shutdown(wait=wait)
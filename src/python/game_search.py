@@ -0,0 +1,338 @@
+from collections import Counter
+
+from anytime_decision import AnytimeDecider, nash_solver
+from damage_table import OUR_SIDE, OPPONENT_SIDE
+from payoff_builder import switch_row_id
+from stochastic_damage import CRIT_MULTIPLIER, crit_chance, move_accuracy
+
+# Random battles field six pokemon; unrevealed opponents count as healthy
+TEAM_SIZE = 6
+# Value of a won battle; above any evaluation of a battle still in progress
+WIN_VALUE = 20.0
+
+
+class _SearchTimeout(Exception):
+    pass
+
+
+class GameTree:
+    """Simultaneous-move game tree for one decision.
+
+    A state is the compact tuple (our active index, opponent active index,
+    our HP, opponent HP), with HP in whole percent per team member, and is
+    used directly as the transposition table key. Every node is a matrix
+    game between our actions (moves of the active pokemon and switches) and
+    the opponent's plausible moves and switches, solved with the native Nash
+    solver.
+
+    Transitions are deterministic expected damage (accuracy and crits folded
+    in) from the battle's DamageTable, in priority/speed order; exact speed
+    ties average both orders; switches happen before any move. A fainted
+    pokemon is replaced by the bench pokemon with the best expected hit on
+    the other side's active. The opponent can only switch to pokemon it has
+    revealed.
+    """
+
+    def __init__(self, payoff_builder, battle, opponent_moves, deadline=None, max_table_entries=200000):
+        """Set up the tree from the battle at the root.
+
+        Args:
+            payoff_builder: PayoffMatrixBuilder whose damage table and stats are used
+            battle: Battle or BattleSnapshot; its damage table must be synced
+            opponent_moves: Pruned (move id, move, probability) list for the
+                opponent's active pokemon
+            deadline: TurnDeadline, or None to search without a time limit
+            max_table_entries: Transposition table entries kept before it is cleared
+        """
+        self.builder = payoff_builder
+        self.table = payoff_builder.damage_table(battle)
+        self.deadline = deadline
+        self.max_table_entries = max_table_entries
+        self.transpositions = {}  # state -> (depth searched, value)
+        self.nodes = 0
+        self.table_hits = 0
+
+        opponent_active = battle.opponent_active_pokemon
+        self.ours = [battle.active_pokemon] + list(battle.available_switches)
+        self.theirs = [opponent_active] + [
+            pokemon for pokemon in battle.opponent_team.values()
+            if pokemon.species != opponent_active.species and not pokemon.fainted
+        ]
+        self.hidden_opponents = max(0, TEAM_SIZE - max(len(battle.opponent_team), 1))
+
+        # The active pokemon may be limited (disabled, choice-locked) at the root only
+        self.root_moves = list(battle.available_moves)
+        self.our_moves = [list(pokemon.moves.values()) for pokemon in self.ours]
+        self.their_moves = [[move for _, move, _ in opponent_moves]] + [
+            [move for _, move, _ in payoff_builder.likely_moves(pokemon)] or [opponent_moves[0][1]]
+            for pokemon in self.theirs[1:]
+        ]
+        self.column_ids = [move_id for move_id, _, _ in opponent_moves]
+        self.column_ids.extend(switch_row_id(pokemon) for pokemon in self.theirs[1:])
+
+        self.our_speed = [payoff_builder._stat(pokemon, 'spe', 0) for pokemon in self.ours]
+        self.their_speed = [payoff_builder._stat(pokemon, 'spe', 0) for pokemon in self.theirs]
+        self._hits = {}  # (attacking side, attacker index, move id, defender index) -> HP percent
+
+    def root_state(self):
+        return (
+            0, 0,
+            tuple(self._percent(pokemon) for pokemon in self.ours),
+            tuple(self._percent(pokemon) for pokemon in self.theirs),
+        )
+
+    def solve_root(self, depth):
+        """Solve the root game with depth turns of lookahead.
+
+        Returns:
+            Tuple of ({row id: {opponent move id: value}}, {row id: probability})
+        """
+        state = self.root_state()
+        rows = [(move.id, move) for move in self.root_moves]
+        rows.extend((switch_row_id(pokemon), k) for k, pokemon in enumerate(self.ours) if k > 0)
+
+        columns = self._their_actions(state)
+        matrix = [
+            [self._child_value(state, action, their_action, depth) for their_action in columns]
+            for _, action in rows
+        ]
+        _, strategy = self._solve(matrix)
+
+        payoff_matrix = {row_id: dict(zip(self.column_ids, values)) for (row_id, _), values in zip(rows, matrix)}
+        move_probabilities = {row_id: prob for (row_id, _), prob in zip(rows, strategy)}
+        return payoff_matrix, move_probabilities
+
+    def value(self, state, depth):
+        """Game value of a state for us, searching depth more turns."""
+        our_active, their_active, our_hp, their_hp = state
+        if not any(our_hp):
+            return -WIN_VALUE
+        if not any(their_hp) and not self.hidden_opponents:
+            return WIN_VALUE
+        # An unrevealed replacement cannot be modelled, so the search stops here
+        if depth == 0 or not our_hp[our_active] or not their_hp[their_active]:
+            return self.evaluate(state)
+
+        entry = self.transpositions.get(state)
+        if entry is not None and entry[0] >= depth:
+            self.table_hits += 1
+            return entry[1]
+        if self.deadline is not None and self.deadline.expired():
+            raise _SearchTimeout()
+        self.nodes += 1
+
+        actions = list(self.our_moves[our_active])
+        actions.extend(k for k, hp in enumerate(our_hp) if hp and k != our_active)
+        columns = self._their_actions(state)
+        matrix = [
+            [self._child_value(state, action, their_action, depth) for their_action in columns]
+            for action in actions
+        ]
+        value, _ = self._solve(matrix)
+
+        if len(self.transpositions) >= self.max_table_entries:
+            self.transpositions.clear()
+        self.transpositions[state] = (depth, value)
+        return value
+
+    def evaluate(self, state):
+        """Remaining HP balance in units of whole pokemon, plus a bonus per KO."""
+        _, _, our_hp, their_hp = state
+        ko_balance = sum(1 for hp in their_hp if not hp) - sum(1 for hp in our_hp if not hp)
+        return ((sum(our_hp) - sum(their_hp)) / 100.0 - self.hidden_opponents
+                + self.builder.KO_WEIGHT * ko_balance)
+
+    def _their_actions(self, state):
+        _, their_active, _, their_hp = state
+        actions = list(self.their_moves[their_active])
+        actions.extend(k for k, hp in enumerate(their_hp) if hp and k != their_active)
+        return actions
+
+    def _child_value(self, state, action, their_action, depth):
+        """Value after one turn; actions are moves, or bench indices to switch to."""
+        our_active, their_active, our_hp, their_hp = state
+        # Switches happen first and the incoming pokemon takes the other side's move
+        our_switch, their_switch = isinstance(action, int), isinstance(their_action, int)
+        if our_switch or their_switch:
+            our_after, their_after = list(our_hp), list(their_hp)
+            if our_switch:
+                our_active = action
+            if their_switch:
+                their_active = their_action
+            if not our_switch:
+                self._attack(OUR_SIDE, our_active, action, their_active, their_after)
+            if not their_switch:
+                self._attack(OPPONENT_SIDE, their_active, their_action, our_active, our_after)
+            return self.value(self._replace(our_active, their_active, our_after, their_after), depth - 1)
+
+        order = self._order(action, their_action, our_active, their_active)
+        orders = (True, False) if order == 0 else (order > 0,)
+        total = 0.0
+        for we_go_first in orders:
+            our_after, their_after = list(our_hp), list(their_hp)
+            hits = [(OUR_SIDE, our_active, action, their_active, their_after),
+                    (OPPONENT_SIDE, their_active, their_action, our_active, our_after)]
+            if not we_go_first:
+                hits.reverse()
+            for side, attacker, move, defender, defender_hp in hits:
+                attacker_hp = our_after if side == OUR_SIDE else their_after
+                if attacker_hp[attacker]:
+                    self._attack(side, attacker, move, defender, defender_hp)
+            total += self.value(self._replace(our_active, their_active, our_after, their_after), depth - 1)
+        return total / len(orders)
+
+    def _attack(self, side, attacker, move, defender, defender_hp):
+        defender_hp[defender] = max(0, defender_hp[defender] - self._damage(side, attacker, move, defender))
+
+    def _damage(self, side, attacker, move, defender):
+        """Expected HP percent one move takes off, cached per decision."""
+        key = (side, attacker, move.id, defender)
+        damage = self._hits.get(key)
+        if damage is None:
+            if side == OUR_SIDE:
+                attacker_pokemon, defender_pokemon, defender_side = self.ours[attacker], self.theirs[defender], OPPONENT_SIDE
+            else:
+                attacker_pokemon, defender_pokemon, defender_side = self.theirs[attacker], self.ours[defender], OUR_SIDE
+            fraction, _ = self.table.lookup(move, attacker_pokemon, side, defender_pokemon, defender_side)
+            expected = fraction * move_accuracy(move) * (1 + crit_chance(move) * (CRIT_MULTIPLIER - 1))
+            damage = self._hits[key] = round(100 * expected)
+        return damage
+
+    def _replace(self, our_active, their_active, our_hp, their_hp):
+        if not our_hp[our_active]:
+            our_active = self._best_replacement(OUR_SIDE, our_hp, their_active, our_active)
+        if not their_hp[their_active]:
+            their_active = self._best_replacement(OPPONENT_SIDE, their_hp, our_active, their_active)
+        return our_active, their_active, tuple(our_hp), tuple(their_hp)
+
+    def _best_replacement(self, side, hp, target, fainted):
+        moves = self.our_moves if side == OUR_SIDE else self.their_moves
+        candidates = [k for k, k_hp in enumerate(hp) if k_hp]
+        if not candidates:
+            return fainted
+        return max(candidates, key=lambda k: max(
+            (self._damage(side, k, move, target) for move in moves[k]), default=0
+        ))
+
+    def _order(self, our_move, their_move, our_active, their_active):
+        """1 if we move first, -1 if they do, 0 on an exact speed tie."""
+        if our_move.priority != their_move.priority:
+            return 1 if our_move.priority > their_move.priority else -1
+        our_speed, their_speed = self.our_speed[our_active], self.their_speed[their_active]
+        return (our_speed > their_speed) - (our_speed < their_speed)
+
+    def _solve(self, matrix):
+        """Value and row strategy of a matrix game."""
+        if len(matrix) == 1:
+            return min(matrix[0]), [1.0]
+        if len(matrix[0]) == 1:
+            best = max(range(len(matrix)), key=lambda i: matrix[i][0])
+            return matrix[best][0], [1.0 if i == best else 0.0 for i in range(len(matrix))]
+
+        time_budget_ms = -1.0 if self.deadline is None else self.deadline.remaining() * 1000.0
+        solution = nash_solver.solve_zero_sum_game_reduced(matrix, time_budget_ms)
+        if not solution.converged and self.deadline is not None and self.deadline.expired():
+            raise _SearchTimeout()
+        strategy = list(solution.strategy)
+        value = min(
+            sum(prob * row[j] for prob, row in zip(strategy, matrix))
+            for j in range(len(matrix[0]))
+        )
+        return value, strategy
+
+    def _percent(self, pokemon):
+        if pokemon.fainted or not pokemon.current_hp_fraction:
+            return 0
+        return max(1, round(100 * pokemon.current_hp_fraction))
+
+
+class SearchDecider(AnytimeDecider):
+    """AnytimeDecider that looks several turns ahead with a GameTree.
+
+    Depths 1, 2, ... max_depth are searched in turn until the deadline; the
+    strategy of the deepest completed search is played. Opponent moves the
+    OpponentModel gives less than min_branch_probability are pruned, keeping
+    at most max_opponent_branches. When not even a one-turn search finishes
+    (or there is nothing to search), the one-turn AnytimeDecider tiers apply.
+    """
+
+    TIERS = ("search",) + AnytimeDecider.TIERS
+
+    def __init__(self, payoff_builder, max_depth=3, min_branch_probability=0.1,
+                 max_opponent_branches=3, max_table_entries=200000, min_solve_time=0.005):
+        """Initialize the decider.
+
+        Args:
+            payoff_builder: PayoffMatrixBuilder used for damage and fallbacks
+            max_depth: Deepest lookahead in turns
+            min_branch_probability: Opponent moves predicted below this are pruned
+            max_opponent_branches: Most opponent moves kept per node
+            max_table_entries: Transposition table entries per search
+            min_solve_time: Seconds the solver needs to be worth starting
+        """
+        super().__init__(payoff_builder, min_solve_time)
+        self.max_depth = max_depth
+        self.min_branch_probability = min_branch_probability
+        self.max_opponent_branches = max_opponent_branches
+        self.max_table_entries = max_table_entries
+        # Totals over searches: searches, depth reached, nodes, table hits
+        self.search_counts = Counter()
+
+    def decide(self, battle, deadline=None):
+        """Choose a mixed strategy for the current turn.
+
+        Args:
+            battle: Battle or BattleSnapshot
+            deadline: TurnDeadline, or None to search to max_depth
+
+        Returns:
+            Tuple of (payoff_matrix, move_probabilities, tier)
+        """
+        result = None
+        if battle.available_moves and battle.active_pokemon and battle.opponent_active_pokemon:
+            try:
+                result = self._search(battle, deadline)
+            except Exception as e:
+                print(f"Error in game tree search: {e}")
+
+        if result is None:
+            return super().decide(battle, deadline)
+        payoff_matrix, move_probabilities = result
+        return self._record(payoff_matrix, move_probabilities, "search")
+
+    def mean_search_depth(self):
+        """Average depth of the strategies played from the search."""
+        if not self.search_counts["searches"]:
+            return 0.0
+        return self.search_counts["depth"] / self.search_counts["searches"]
+
+    def _search(self, battle, deadline):
+        """Iterative deepening; returns the deepest completed root solution or None."""
+        self.payoff_builder.damage_table(battle).sync(battle)
+        tree = GameTree(
+            self.payoff_builder, battle, self._prune(self.payoff_builder.opponent_move_distribution(battle)),
+            deadline, self.max_table_entries
+        )
+
+        best, reached = None, 0
+        for depth in range(1, self.max_depth + 1):
+            try:
+                best = tree.solve_root(depth)
+            except _SearchTimeout:
+                break
+            reached = depth
+            if deadline is not None and deadline.remaining() < self.min_solve_time:
+                break
+
+        with self._lock:
+            if best is not None:
+                self.search_counts["searches"] += 1
+                self.search_counts["depth"] += reached
+            self.search_counts["nodes"] += tree.nodes
+            self.search_counts["table_hits"] += tree.table_hits
+        return best
+
+    def _prune(self, opponent_moves):
+        ranked = sorted(opponent_moves, key=lambda entry: entry[2], reverse=True)
+        kept = [entry for entry in ranked if entry[2] >= self.min_branch_probability]
+        return (kept or ranked[:1])[:self.max_opponent_branches]
@@ -87,6 +87,8 @@ async def main():
             logger.error(f"Error during battles: {e}")
             await send_update(f"Error during battles: {str(e)}")
             raise
+        finally:
+            await player.stop()
 
         logger.info("Sending final update...")
         await send_update("Battle simulation completed!")
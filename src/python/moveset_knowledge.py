@@ -0,0 +1,252 @@
+import argparse
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS set_counts (
+    species TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    value TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (species, kind, value)
+) WITHOUT ROWID;
+"""
+
+# Kinds of counts kept per species; "seen" counts battles the species appeared in
+KINDS = ("move", "item", "ability")
+SEEN = "seen"
+# Placeholder poke_env reports for an opponent item that was never revealed
+UNKNOWN_ITEM = "unknown_item"
+# Seconds a writer waits for another process's transaction (e.g. tournament workers)
+BUSY_TIMEOUT = 30.0
+
+
+def _empty_entry():
+    return {SEEN: 0, **{kind: {} for kind in KINDS}}
+
+
+class MovesetKnowledge:
+    """Cross-battle counts of the moves, items and abilities seen per species.
+
+    Every finished battle adds one observation per pokemon on both teams:
+    our own sets are complete, the opponent's only what it revealed. Counts
+    live in a small SQLite table, one row per (species, kind, value), updated
+    in place; the whole table is also held in a dict, so looking up a species
+    never touches the disk. Processes sharing the file see each other's
+    battles after reload() or reload_if_changed(). A species' entry is
+    replaced, never changed, once it is in the dict, so one thread may
+    record battles while others look species up.
+    """
+
+    def __init__(self, db_path="models/moveset_knowledge.sqlite"):
+        """Load the counts, if the database exists yet.
+
+        Args:
+            db_path: Path to the SQLite file, created on the first write
+        """
+        self.db_path = db_path
+        self.counts = {}  # species -> {"seen": battles, "move"/"item"/"ability": {value: battles}}
+        self._ranked = {}  # (species, kind) -> (entry, frequencies), valid while the entry is current
+        self._file_version = None  # database file state the counts were read at
+        self.reload()
+
+    def reload(self):
+        """Re-read every count from disk."""
+        # Taken before reading, so a write racing the read is picked up next time
+        self._file_version = self._current_file_version()
+        counts = {}
+        if os.path.exists(self.db_path):
+            with self._connect() as conn:
+                rows = conn.execute("SELECT species, kind, value, count FROM set_counts").fetchall()
+            for species, kind, value, count in rows:
+                entry = counts.get(species) or counts.setdefault(species, _empty_entry())
+                if kind == SEEN:
+                    entry[SEEN] = count
+                elif kind in KINDS:
+                    entry[kind][value] = count
+        self.counts = counts
+        self._ranked = {}
+
+    def reload_if_changed(self):
+        """Reload if any process wrote the database since it was last read.
+
+        Costs two stat calls, so it can run before every decision.
+
+        Returns:
+            True if the counts were reloaded
+        """
+        if self._current_file_version() == self._file_version:
+            return False
+        self.reload()
+        return True
+
+    def _current_file_version(self):
+        # In WAL mode writes land in the -wal file until a checkpoint
+        version = []
+        for path in (self.db_path, self.db_path + "-wal"):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                version.append(None)
+                continue
+            version.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(version)
+
+    def record_battle(self, battle):
+        """Add the sets of both teams of a finished battle.
+
+        Args:
+            battle: Battle or BattleSnapshot
+        """
+        self.record_sets(self.battle_sets(battle))
+
+    @staticmethod
+    def battle_sets(battle):
+        """Sets shown by both teams of a battle, in record_sets' format.
+
+        Copying them out lets record_sets run on another thread while the
+        battle object keeps changing.
+        """
+        pokemon = list(getattr(battle, 'team', {}).values()) + list(getattr(battle, 'opponent_team', {}).values())
+        return [
+            (p.species, list(p.moves), getattr(p, 'item', None), getattr(p, 'ability', None))
+            for p in pokemon if p is not None and p.species
+        ]
+
+    def record_sets(self, sets):
+        """Add one observation per set, in a single transaction.
+
+        Args:
+            sets: Iterable of (species, move ids, item or None, ability or None)
+        """
+        increments = {}
+        for species, moves, item, ability in sets:
+            values = [(SEEN, "")] + [("move", move_id) for move_id in set(moves)]
+            if item and item != UNKNOWN_ITEM:
+                values.append(("item", item))
+            if ability:
+                values.append(("ability", ability))
+            for kind, value in values:
+                key = (species, kind, value)
+                increments[key] = increments.get(key, 0) + 1
+        if not increments:
+            return
+
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            conn.executemany(
+                "INSERT INTO set_counts VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (species, kind, value) DO UPDATE SET count = count + excluded.count",
+                [(species, kind, value, count) for (species, kind, value), count in increments.items()]
+            )
+
+        updated = {}  # species -> new entry, published once complete
+        for (species, kind, value), count in increments.items():
+            entry = updated.get(species)
+            if entry is None:
+                current = self.counts.get(species)
+                entry = updated[species] = _empty_entry() if current is None else {
+                    SEEN: current[SEEN], **{counted: dict(current[counted]) for counted in KINDS}
+                }
+            if kind == SEEN:
+                entry[SEEN] += count
+            else:
+                entry[kind][value] = entry[kind].get(value, 0) + count
+        self.counts.update(updated)
+
+    def rebuild(self, data_dir="logs/battle_data"):
+        """Replace every count with those of the battle files in a directory.
+
+        Returns:
+            Number of battle files read
+        """
+        sets = []
+        read = 0
+        for filename in sorted(os.listdir(data_dir)):
+            if not filename.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(data_dir, filename), 'r') as f:
+                    battle_data = json.load(f)
+            except Exception as e:
+                print(f"Error processing battle file {filename}: {e}")
+                continue
+            for team in (battle_data.get("our_team"), battle_data.get("opponent_team")):
+                for pokemon in (team or {}).values():
+                    if pokemon and pokemon.get("species"):
+                        sets.append((pokemon["species"], list(pokemon.get("moves") or {}),
+                                     pokemon.get("item"), pokemon.get("ability")))
+            read += 1
+
+        if os.path.exists(self.db_path):
+            with self._connect() as conn:
+                conn.execute("DELETE FROM set_counts")
+        self.counts = {}
+        self._ranked = {}
+        self.record_sets(sets)
+        return read
+
+    def frequencies(self, species, kind="move"):
+        """Fraction of observed battles in which a species showed each value.
+
+        Args:
+            species: Species id
+            kind: "move", "item" or "ability"
+
+        Returns:
+            {value: fraction}, most frequent first; empty for unseen species
+        """
+        entry = self.counts.get(species)
+        if not entry or not entry[SEEN]:
+            return {}
+        cached = self._ranked.get((species, kind))
+        if cached is not None and cached[0] is entry:
+            return cached[1]
+        seen = entry[SEEN]
+        counts = sorted(entry[kind].items(), key=lambda item: item[1], reverse=True)
+        ranked = {value: count / seen for value, count in counts}
+        self._ranked[(species, kind)] = (entry, ranked)
+        return ranked
+
+    def battles_seen(self, species):
+        entry = self.counts.get(species)
+        return entry[SEEN] if entry else 0
+
+    @contextmanager
+    def _connect(self):
+        """Connection for one transaction, committed and closed on exit."""
+        conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT)
+        try:
+            # WAL lets readers run while another process writes; the mode persists in the file
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+
+def main():
+    """Rebuild the moveset knowledge base from collected battle data."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--data-dir", default="logs/battle_data")
+    parser.add_argument("--db", default="models/moveset_knowledge.sqlite")
+    parser.add_argument("--show", default=None, help="Print the most frequent sets of this species")
+    args = parser.parse_args()
+
+    knowledge = MovesetKnowledge(args.db)
+    if args.show is None:
+        print(f"Read {knowledge.rebuild(args.data_dir)} battle files; "
+              f"{len(knowledge.counts)} species known.")
+        return
+
+    print(f"{args.show}: seen in {knowledge.battles_seen(args.show)} battles")
+    for kind in KINDS:
+        top = list(knowledge.frequencies(args.show, kind).items())[:8]
+        print(f"  {kind}: " + ", ".join(f"{value} {fraction:.0%}" for value, fraction in top))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,67 @@
 import numpy as np
 import os
+import re
 import json
 import pickle
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
 from sklearn.ensemble import RandomForestClassifier
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
+
+GENERAL_SHARD = ("general",)
+
+# Every leaf stores a probability per move class, so fully grown trees over
+# hundreds of moves take gigabytes; bounded trees keep a shard in megabytes
+MAX_LEAF_NODES = 128
+MIN_SAMPLES_LEAF = 3
+
+
+def _fit_shard(X, y_encoded):
+    """Fit one shard's forest (runs in a worker process)."""
+    model = RandomForestClassifier(
+        n_estimators=100,
+        max_leaf_nodes=MAX_LEAF_NODES,
+        min_samples_leaf=MIN_SAMPLES_LEAF,
+        random_state=42
+    )
+    model.fit(X, y_encoded)
+    return model
+
 
 class OpponentModel:
-    """Model to predict opponent move probabilities."""
+    """Model to predict opponent move probabilities.
+    
+    Besides the general model trained on every example, a model is trained
+    per opponent species and per battle format when there are enough
+    examples for it. Each is stored as its own artifact and loaded only when
+    a battle needs it; predictions use the most specific model available.
+    Loaded shards live in an LRU cache bounded by their artifact size.
+    """
     
-    def __init__(self, model_dir="models/opponent"):
+    # Shards with fewer examples than this fall back to a broader model
+    MIN_SHARD_EXAMPLES = 30
+    # Seconds before a shard found missing is looked for on disk again, so
+    # shards trained by another process are picked up
+    MISSING_SHARD_RECHECK = 60.0
+    
+    def __init__(self, model_dir="models/opponent", max_memory_bytes=256 * 1024 * 1024):
+        """Initialize the model.
+        
+        Args:
+            model_dir: Directory holding the model artifacts
+            max_memory_bytes: Approximate cap on the size of loaded shard
+                models; the general model is always kept loaded
+        """
         self.model_dir = model_dir
-        self.models = {}  # Trained models
+        self.max_memory_bytes = max_memory_bytes
+        self.models = OrderedDict()  # Loaded models by shard key, least recently used first
+        self.model_sizes = {}  # Shard key -> artifact size in bytes
+        self.resident_bytes = 0
         self.move_encodings = {}  # Maps move IDs to indices
         self.move_reverse_encodings = {}  # Maps indices to move IDs
+        self._missing_shards = {}  # Shard key -> monotonic time it was found missing
+        self._lock = threading.Lock()
         
         # Create directory if it doesn't exist
         os.makedirs(model_dir, exist_ok=True)
@@ -21,37 +70,156 @@ class OpponentModel:
         if os.path.exists(os.path.join(model_dir, "general_model.pkl")):
             self._load_models()
     
-    def train(self, data_dir="logs/battle_data"):
-        """Train the model on collected battle data.
+    def train(self, data_dir="logs/battle_data", catalog=None, workers=None, **filters):
+        """Train the general model and the per-species and per-format shards.
         
         Args:
             data_dir: Directory containing battle data files
+            catalog: Optional BattleCatalog; when given, only the turns
+                matching filters are read instead of every file in data_dir
+            workers: Number of processes fitting shards in parallel
+                (defaults to the CPU count)
+            **filters: BattleCatalog.training_pairs filters, e.g. format or
+                opponent_species. Filtering by opponent_species (or else by
+                format) trains and saves only that species (or format) shard;
+                the general model and other shards are left as they are
             
         Returns:
             bool: True if training was successful, False otherwise
         """
+        if catalog is not None:
+            turn_pairs = catalog.training_pairs(**filters)
+        else:
+            turn_pairs = self._turn_pairs_from_files(data_dir)
+            if turn_pairs is None:
+                return False
+        
+        # Collect training data per shard
+        examples = defaultdict(lambda: ([], []))  # Shard key -> (features, opponent moves)
+        
+        for battle_format, current_turn, next_turn in turn_pairs:
+            # Skip turns with missing data
+            if not current_turn.get("opponent_active") or not next_turn.get("opponent_move"):
+                continue
+            
+            # Extract features
+            features = self._extract_features(current_turn)
+            
+            # Extract target (opponent's move)
+            opponent_move = next_turn["opponent_move"]["id"]
+            
+            species = current_turn["opponent_active"].get("species")
+            for key in self._shard_keys(species, battle_format):
+                examples[key][0].append(features)
+                examples[key][1].append(opponent_move)
+        
+        if GENERAL_SHARD not in examples:
+            print("No usable training examples found.")
+            return False
+        
+        X, y = examples[GENERAL_SHARD]
+        all_moves = set(y)
+        
+        # Extend the encodings with new moves; existing indices stay stable
+        # so shards trained earlier remain valid
+        new_moves = sorted(all_moves - set(self.move_encodings))
+        if new_moves:
+            for move in new_moves:
+                self.move_encodings[move] = len(self.move_encodings)
+            self.move_reverse_encodings = {i: move for move, i in self.move_encodings.items()}
+            
+            # Save encodings
+            encoding_path = os.path.join(self.model_dir, "move_encodings.pkl")
+            with open(encoding_path, 'wb') as f:
+                pickle.dump((self.move_encodings, self.move_reverse_encodings), f)
+        
+        if filters.get("opponent_species") is not None:
+            selected = {("species", filters["opponent_species"])}
+        elif filters.get("format") is not None:
+            selected = {("format", filters["format"])}
+        else:
+            selected = None  # Everything, including the general model
+        
+        shards = [
+            key for key, (shard_X, _) in examples.items()
+            if (key == GENERAL_SHARD and selected is None)
+            or (len(shard_X) >= self.MIN_SHARD_EXAMPLES and (selected is None or key in selected))
+        ]
+        if selected is not None and not shards:
+            print(f"Too few examples to train {sorted(selected)} "
+                  f"(need {self.MIN_SHARD_EXAMPLES}).")
+            return False
+        
+        # A format shard holding every example (all battles in one format)
+        # would be the general model again; it is dropped and falls back to it
+        if selected is None:
+            for key in [key for key in shards if key[0] == "format" and len(examples[key][0]) == len(X)]:
+                shards.remove(key)
+                if os.path.exists(self._model_path(key)):
+                    os.remove(self._model_path(key))
+        
+        # Train models, one shard per process
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                key: pool.submit(
+                    _fit_shard,
+                    examples[key][0],
+                    [self.move_encodings[move] for move in examples[key][1]]
+                )
+                for key in shards
+            }
+            trained = {key: future.result() for key, future in futures.items()}
+        
+        # Save models
+        with self._lock:
+            for key, model in trained.items():
+                model_path = self._model_path(key)
+                os.makedirs(os.path.dirname(model_path), exist_ok=True)
+                with open(model_path, 'wb') as f:
+                    pickle.dump(model, f)
+            
+            # Drop stale shards; they are reloaded from the new artifacts on demand
+            general = self.models.get(GENERAL_SHARD)
+            self.models.clear()
+            self.model_sizes.clear()
+            self.resident_bytes = 0
+            self._missing_shards.clear()
+            general = trained.get(GENERAL_SHARD, general)
+            if general is not None:
+                self._cache_model(GENERAL_SHARD, general)
+        
+        n_shards = len(shards) - (GENERAL_SHARD in trained)
+        print(f"Model trained on {len(X)} examples with {len(all_moves)} unique moves "
+              f"({n_shards} species/format shards).")
+        return True
+    
+    def _turn_pairs_from_files(self, data_dir):
+        """Read consecutive turns from every battle file.
+        
+        Args:
+            data_dir: Directory containing battle data files
+            
+        Returns:
+            List of (battle format, turn, next turn), or None if there is no
+            data to read
+        """
         # Check if data directory exists
         if not os.path.exists(data_dir):
             print(f"Data directory {data_dir} does not exist.")
-            return False
+            return None
             
         # Load battle data
         try:
             battle_files = [f for f in os.listdir(data_dir) if f.endswith(".json")]
         except Exception as e:
             print(f"Error reading battle data directory: {e}")
-            return False
+            return None
         
         if not battle_files:
             print("No battle data found for training.")
-            return False
-        
-        # Collect training data
-        X = []  # Features
-        y = []  # Target (opponent move)
+            return None
         
-        # Track all unique moves
-        all_moves = set()
+        turn_pairs = []
         
         # Process each battle file
         for filename in battle_files:
@@ -60,77 +228,36 @@ class OpponentModel:
                 with open(filepath, 'r') as f:
                     battle_data = json.load(f)
                 
-                # Skip battles with no turns
-                if not battle_data.get("turns"):
-                    continue
-                    
-                # Process each turn
-                for i in range(len(battle_data["turns"]) - 1):  # Skip last turn
-                    current_turn = battle_data["turns"][i]
-                    next_turn = battle_data["turns"][i+1]
-                    
-                    # Skip turns with missing data
-                    if not current_turn.get("opponent_active") or not next_turn.get("opponent_move"):
-                        continue
-                    
-                    # Extract features
-                    features = self._extract_features(current_turn)
-                    
-                    # Extract target (opponent's move)
-                    opponent_move = next_turn["opponent_move"]["id"]
-                    
-                    # Add to training data
-                    X.append(features)
-                    y.append(opponent_move)
-                    
-                    # Add to unique moves
-                    all_moves.add(opponent_move)
+                turns = battle_data.get("turns") or []
+                
+                # Pair each turn with the next one (skip last turn)
+                battle_format = battle_data.get("format")
+                turn_pairs.extend(
+                    (battle_format, turn, next_turn) for turn, next_turn in zip(turns, turns[1:])
+                )
             except Exception as e:
                 print(f"Error processing battle file {filename}: {e}")
                 continue
         
-        if not X:
-            print("No usable training examples found.")
-            return False
-            
-        # Create move encodings if not already created
-        if not self.move_encodings:
-            self.move_encodings = {move: i for i, move in enumerate(sorted(all_moves))}
-            self.move_reverse_encodings = {i: move for move, i in self.move_encodings.items()}
-            
-            # Save encodings
-            encoding_path = os.path.join(self.model_dir, "move_encodings.pkl")
-            with open(encoding_path, 'wb') as f:
-                pickle.dump((self.move_encodings, self.move_reverse_encodings), f)
-        
-        # Convert move IDs to indices
-        y_encoded = [self.move_encodings.get(move, 0) for move in y]
-        
-        # Train model
-        model = RandomForestClassifier(n_estimators=100, random_state=42)
-        model.fit(X, y_encoded)
-        
-        # Save model
-        self.models["general"] = model
-        model_path = os.path.join(self.model_dir, "general_model.pkl")
-        with open(model_path, 'wb') as f:
-            pickle.dump(model, f)
-            
-        print(f"Model trained on {len(X)} examples with {len(all_moves)} unique moves.")
-        return True
+        return turn_pairs
     
-    def predict_moves(self, battle, top_n=3):
+    def predict_moves(self, battle):
         """Predict probabilities of opponent's next move.
         
+        The whole distribution of the most specific model is returned, moves
+        not revealed yet included; PayoffMatrixBuilder weighs it against the
+        sets the species is known to run.
+        
         Args:
             battle: Current battle
-            top_n: Number of top moves to return
             
         Returns:
-            Dictionary of moves with probabilities
+            Dictionary of moves with probabilities, most likely first
         """
+        model = self._select_model(battle)
+        
         # If no model is trained yet, return uniform distribution
-        if "general" not in self.models:
+        if model is None:
             return self._uniform_distribution(battle)
         
         try:
@@ -140,39 +267,123 @@ class OpponentModel:
                 return self._uniform_distribution(battle)
             
             # Get model predictions
-            probabilities = self.models["general"].predict_proba([features])[0]
+            probabilities = model.predict_proba([features])[0]
             
-            # Convert to move IDs with probabilities
+            # Convert to move IDs with probabilities (columns follow the
+            # classes the model was fitted on, not the full encoding)
             move_probs = {}
-            for idx, prob in enumerate(probabilities):
-                if idx in self.move_reverse_encodings:
+            for idx, prob in zip(model.classes_, probabilities):
+                if idx in self.move_reverse_encodings and prob > 0:
                     move_id = self.move_reverse_encodings[idx]
                     move_probs[move_id] = prob
             
-            # If opponent's known moves are limited, filter to those
-            if battle.opponent_active_pokemon and hasattr(battle.opponent_active_pokemon, 'moves'):
-                known_moves = set(battle.opponent_active_pokemon.moves.keys())
-                if known_moves:
-                    move_probs = {move: prob for move, prob in move_probs.items() if move in known_moves}
-            
-            # If we have no probabilities (e.g., all predicted moves are unknown), use uniform
             if not move_probs:
                 return self._uniform_distribution(battle)
             
             # Normalize probabilities
             total_prob = sum(move_probs.values())
-            if total_prob > 0:
-                move_probs = {move: prob / total_prob for move, prob in move_probs.items()}
-            
-            # Return top N moves
             sorted_moves = sorted(move_probs.items(), key=lambda x: x[1], reverse=True)
-            top_moves = dict(sorted_moves[:top_n])
-            
-            return top_moves
+            return {move: prob / total_prob for move, prob in sorted_moves}
         except Exception as e:
             print(f"Error predicting moves: {e}")
             return self._uniform_distribution(battle)
     
+    def _select_model(self, battle):
+        """Most specific trained model for the battle, or None if untrained.
+        
+        Args:
+            battle: Current battle
+            
+        Returns:
+            Fitted classifier or None
+        """
+        opponent = battle.opponent_active_pokemon
+        species = opponent.species if opponent else None
+        for key in self._shard_keys(species, getattr(battle, 'format', None)):
+            model = self._get_model(key)
+            if model is not None:
+                return model
+        return None
+    
+    def _shard_keys(self, species, battle_format):
+        """Shard keys from most to least specific."""
+        keys = []
+        if species:
+            keys.append(("species", species))
+        if battle_format:
+            keys.append(("format", battle_format))
+        keys.append(GENERAL_SHARD)
+        return keys
+    
+    def _model_path(self, key):
+        """Artifact path of a shard."""
+        if key == GENERAL_SHARD:
+            return os.path.join(self.model_dir, "general_model.pkl")
+        kind, name = key
+        return os.path.join(self.model_dir, kind, re.sub(r"[^a-z0-9_-]", "_", name.lower()) + ".pkl")
+    
+    def _get_model(self, key):
+        """Return a shard's model, loading it from disk on first use.
+        
+        Args:
+            key: Shard key
+            
+        Returns:
+            Fitted classifier, or None if the shard was never trained
+        """
+        with self._lock:
+            model = self.models.get(key)
+            if model is not None:
+                self.models.move_to_end(key)
+                return model
+            missing_since = self._missing_shards.get(key)
+            if missing_since is not None and time.monotonic() - missing_since < self.MISSING_SHARD_RECHECK:
+                return None
+        
+        # Unpickling a forest takes a while; other shards stay usable meanwhile
+        model_path = self._model_path(key)
+        try:
+            with open(model_path, 'rb') as f:
+                model = pickle.load(f)
+            size = os.path.getsize(model_path)
+        except FileNotFoundError:
+            model = None
+        except Exception as e:
+            print(f"Error loading model {model_path}: {e}")
+            model = None
+        
+        with self._lock:
+            if model is None:
+                self._missing_shards[key] = time.monotonic()
+                return None
+            self._missing_shards.pop(key, None)
+            # Another thread may have loaded the same shard meanwhile
+            if key in self.models:
+                self.models.move_to_end(key)
+                return self.models[key]
+            self._cache_model(key, model, size)
+            return model
+    
+    def _cache_model(self, key, model, size=None):
+        """Insert a model into the LRU and evict shards over the memory cap.
+        
+        Must be called with the lock held.
+        """
+        if size is None:
+            size = len(pickle.dumps(model))
+        self.models[key] = model
+        self.model_sizes[key] = size
+        self.resident_bytes += size
+        
+        # The general model is the fallback for everything and is never evicted
+        for old_key in list(self.models):
+            if self.resident_bytes <= self.max_memory_bytes:
+                break
+            if old_key == GENERAL_SHARD or old_key == key:
+                continue
+            del self.models[old_key]
+            self.resident_bytes -= self.model_sizes.pop(old_key)
+    
     def _extract_features_from_battle(self, battle):
         """Extract features from a battle object.
         
@@ -275,7 +486,10 @@ class OpponentModel:
             return {}
     
     def _load_models(self):
-        """Load trained models from disk."""
+        """Load the move encodings and the general model from disk.
+        
+        Species and format shards are loaded lazily by _get_model.
+        """
         try:
             # Load move encodings
             encoding_path = os.path.join(self.model_dir, "move_encodings.pkl")
@@ -284,12 +498,11 @@ class OpponentModel:
                     self.move_encodings, self.move_reverse_encodings = pickle.load(f)
             
             # Load general model
-            model_path = os.path.join(self.model_dir, "general_model.pkl")
-            if os.path.exists(model_path):
-                with open(model_path, 'rb') as f:
-                    self.models["general"] = pickle.load(f)
+            self._get_model(GENERAL_SHARD)
         except Exception as e:
             print(f"Error loading models: {e}")
-            self.models = {}
+            self.models = OrderedDict()
+            self.model_sizes = {}
+            self.resident_bytes = 0
             self.move_encodings = {}
-            self.move_reverse_encodings = {}
\ No newline at end of file
+            self.move_reverse_encodings = {}
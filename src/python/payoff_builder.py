@@ -1,10 +1,33 @@
 from poke_env.data import GenData
+from poke_env.environment.move_category import MoveCategory
 from opponent_model import OpponentModel
+from damage_table import DamageTable, OUR_SIDE, OPPONENT_SIDE
+from stochastic_damage import StochasticDamageModel, crit_chance, move_accuracy
+from stat_table import get_stat_table
+from moveset_knowledge import MovesetKnowledge
+import numpy as np
 import json
 import os
+import threading
+
+# Row label prefix for switch strategies, e.g. "switch:garchomp"
+SWITCH_PREFIX = "switch:"
+
+def switch_row_id(pokemon):
+    return SWITCH_PREFIX + pokemon.species
 
 class PayoffMatrixBuilder:
-    def __init__(self, opponent_model=None):
+    # Weight of the switched-in pokemon's best hit on the following turn
+    SWITCH_FOLLOWUP_WEIGHT = 0.5
+    # Process-pool workers never see battles finish, so cap per-battle tables
+    MAX_CACHED_BATTLES = 256
+    # Bonus per unit of KO probability in stochastic mode
+    KO_WEIGHT = 0.3
+    # Moves per set; unrevealed moves are guessed up to this many
+    MOVESET_SIZE = 4
+
+    def __init__(self, opponent_model=None, include_switches=True, stochastic_damage=False,
+                 risk_aversion=0.0, knowledge=None):
         # Load type effectiveness data
         data_path = os.path.join(os.path.dirname(__file__), '../../data/type_chart.json')
         with open(data_path, 'r') as f:
@@ -12,30 +35,32 @@ class PayoffMatrixBuilder:
         
         # Initialize opponent model
         self.opponent_model = opponent_model or OpponentModel()
+        
+        # Estimated stats for pokemon whose stats are hidden (opponents)
+        self.stat_table = get_stat_table()
+        
+        # Moves, items and abilities each species showed in earlier battles
+        self.knowledge = knowledge or MovesetKnowledge()
+        self._moves = {}  # move id -> Move, for moves only known by id
+        
+        self.include_switches = include_switches
+        # battle_tag -> DamageTable, kept until the battle finishes; thread-mode
+        # workers share the builder, so the dict is only changed under the lock
+        self.damage_tables = {}
+        self._tables_lock = threading.Lock()
+        
+        # Expected damage over rolls, accuracy and crits instead of one fixed number
+        self.stochastic_model = StochasticDamageModel() if stochastic_damage else None
+        # Penalty per standard deviation of our own damage (stochastic mode only)
+        self.risk_aversion = risk_aversion
     
-    def build_matrix(self, battle):
+    def build_matrix(self, battle, use_opponent_model=True, opponent_move_probs=None):
         our_moves = battle.available_moves
-        opponent_move_probs = self.opponent_model.predict_moves(battle)
-    
-        if not opponent_move_probs:
-            opponent_moves = []
-            if hasattr(battle.opponent_active_pokemon, 'moves'):
-                opponent_moves = list(battle.opponent_active_pokemon.moves.values())
-            
-            # If no opponent moves are known, make some assumptions
-            if not opponent_moves and battle.opponent_active_pokemon:
-                # Use possible moves based on opponent's type
-                opponent_types = battle.opponent_active_pokemon.types
-                opponent_moves = self._generate_possible_moves(opponent_types)
-            
-            # If we still have no moves, use a default move
-            if not opponent_moves:
-                from poke_env.environment.move import Move
-                opponent_moves = [Move("tackle", gen=9)]  # Default to tackle if no moves are available
-            
-            # Create uniform distribution
-            prob = 1.0 / len(opponent_moves)
-            opponent_move_probs = {move.id: prob for move in opponent_moves}
+        self.damage_table(battle).sync(battle)
+        opponent_moves = self.opponent_move_distribution(battle, use_opponent_model, opponent_move_probs)
+        
+        if self.stochastic_model is not None:
+            return self._build_stochastic_matrix(battle, our_moves, opponent_moves)
         
         payoff_matrix = {}
         
@@ -43,17 +68,7 @@ class PayoffMatrixBuilder:
             payoff_matrix[our_move.id] = {}
             
             # For each predicted opponent move
-            for opp_move_id, prob in opponent_move_probs.items():
-                # Find the move object
-                opp_move = None
-                if hasattr(battle.opponent_active_pokemon, 'moves'):
-                    opp_move = battle.opponent_active_pokemon.moves.get(opp_move_id)
-                
-                # If we don't have the move object, create a dummy one based on ID
-                if opp_move is None:
-                    from poke_env.environment.move import Move
-                    opp_move = Move(opp_move_id, gen=9)
-
+            for opp_move_id, opp_move, prob in opponent_moves:
                 payoff = self._calculate_move_vs_move_payoff(
                     our_move, 
                     opp_move, 
@@ -65,15 +80,232 @@ class PayoffMatrixBuilder:
                 # Weight the payoff by the probability
                 payoff_matrix[our_move.id][opp_move_id] = payoff * prob
         
+        if self.include_switches and battle.opponent_active_pokemon:
+            for bench_pokemon in battle.available_switches or []:
+                row = {}
+                for opp_move_id, opp_move, prob in opponent_moves:
+                    payoff = self._calculate_switch_payoff(
+                        bench_pokemon, opp_move, battle.opponent_active_pokemon, battle
+                    )
+                    row[opp_move_id] = payoff * prob
+                payoff_matrix[switch_row_id(bench_pokemon)] = row
+        
         return payoff_matrix
     
+    def opponent_move_distribution(self, battle, use_opponent_model=True, opponent_move_probs=None):
+        """Predicted moves of the opponent's active pokemon.
+        
+        Returns:
+            List of (move id, move object, probability)
+        """
+        # Skipping the model gives a prior over known, likely or guessed moves
+        if opponent_move_probs is None:
+            opponent_move_probs = self.opponent_model.predict_moves(battle) if use_opponent_model else {}
+        opponent_move_probs = self.reweight_by_moveset(battle.opponent_active_pokemon, opponent_move_probs)
+    
+        if not opponent_move_probs:
+            # Revealed moves, completed from the sets seen in earlier battles
+            opponent_moves = self.likely_moves(battle.opponent_active_pokemon)
+            if opponent_moves:
+                return opponent_moves
+            
+            # If the species was never seen, make some assumptions
+            if battle.opponent_active_pokemon:
+                # Use possible moves based on opponent's type
+                opponent_types = battle.opponent_active_pokemon.types
+                opponent_moves = self._generate_possible_moves(opponent_types)
+            
+            # If we still have no moves, use a default move
+            if not opponent_moves:
+                opponent_moves = [self._move("tackle")]  # Default to tackle if no moves are available
+            
+            # Create uniform distribution
+            prob = 1.0 / len(opponent_moves)
+            opponent_move_probs = {move.id: prob for move in opponent_moves}
+        
+        # Resolve each opponent move object once for every row
+        opponent_moves = []
+        for opp_move_id, prob in opponent_move_probs.items():
+            opp_move = None
+            if hasattr(battle.opponent_active_pokemon, 'moves'):
+                opp_move = battle.opponent_active_pokemon.moves.get(opp_move_id)
+            
+            # If we don't have the move object, create a dummy one based on ID
+            if opp_move is None:
+                opp_move = self._move(opp_move_id)
+            opponent_moves.append((opp_move_id, opp_move, prob))
+        return opponent_moves
+    
+    def reweight_by_moveset(self, pokemon, move_probs):
+        """Weight predicted moves by how likely the pokemon is to have them.
+        
+        The opponent model predicts from the battle state alone, so it can
+        favour moves the species never runs. Each prediction is multiplied by
+        1 for a revealed move or by the fraction of earlier battles in which
+        the species showed it; moves never seen on a species with known sets
+        drop out. Predictions for species never seen are returned unchanged.
+        
+        Returns:
+            {move id: probability}, empty if no predicted move is plausible
+        """
+        if not move_probs or pokemon is None:
+            return move_probs
+        plausibility = dict(self.knowledge.frequencies(pokemon.species))
+        plausibility.update({move_id: 1.0 for move_id in getattr(pokemon, 'moves', None) or {}})
+        if not plausibility:
+            return move_probs
+        
+        weighted = {move_id: prob * plausibility[move_id]
+                    for move_id, prob in move_probs.items() if plausibility.get(move_id)}
+        total = sum(weighted.values())
+        if not total:
+            return {}
+        return {move_id: weight / total for move_id, weight in weighted.items()}
+    
+    def likely_moves(self, pokemon):
+        """Revealed moves of an opponent plus the ones its species usually has.
+        
+        Revealed moves weigh 1. The set is filled up to MOVESET_SIZE with the
+        moves the species showed most often in earlier battles, each weighted
+        by the fraction of those battles it appeared in.
+        
+        Returns:
+            List of (move id, move object, probability); empty when nothing is known
+        """
+        if pokemon is None:
+            return []
+        revealed = getattr(pokemon, 'moves', None) or {}
+        weights = {move_id: 1.0 for move_id in revealed}
+        for move_id, frequency in self.knowledge.frequencies(pokemon.species).items():
+            if len(weights) >= self.MOVESET_SIZE:
+                break
+            weights.setdefault(move_id, frequency)
+        
+        total = sum(weights.values())
+        if not total:
+            return []
+        return [
+            (move_id, revealed.get(move_id) or self._move(move_id), weight / total)
+            for move_id, weight in weights.items()
+        ]
+    
+    def _move(self, move_id):
+        move = self._moves.get(move_id)
+        if move is None:
+            from poke_env.environment.move import Move
+            move = self._moves[move_id] = Move(move_id, gen=9)
+        return move
+    
+    def _build_stochastic_matrix(self, battle, our_moves, opponent_moves):
+        """Build the payoff matrix from damage distributions, vectorized over all cells.
+        
+        Python only gathers per-move base damage from the damage table (one
+        lookup per row and per column); rolls, accuracy, crits, HP capping and
+        KO chances are evaluated for the whole matrix in NumPy.
+        """
+        table = self.damage_table(battle)
+        our_pokemon = battle.active_pokemon
+        opp_pokemon = battle.opponent_active_pokemon
+        benches = list(battle.available_switches or []) if self.include_switches and opp_pokemon else []
+        n_moves = len(our_moves) if opp_pokemon else 0
+        defenders = ([our_pokemon] if n_moves else []) + benches
+        
+        row_ids = [move.id for move in our_moves[:n_moves]] + [switch_row_id(p) for p in benches]
+        if not row_ids or not opponent_moves:
+            return {}
+        
+        # Our attack per row (switch rows attack nobody this turn)
+        n_rows = len(row_ids)
+        our_base = np.zeros(n_rows)
+        our_accuracy = np.ones(n_rows)
+        our_crit = np.zeros(n_rows)
+        bonus = np.zeros(n_rows)
+        for i, move in enumerate(our_moves[:n_moves]):
+            damage, multiplier = table.lookup(move, our_pokemon, OUR_SIDE, opp_pokemon, OPPONENT_SIDE)
+            our_base[i] = damage
+            our_accuracy[i] = move_accuracy(move)
+            our_crit[i] = crit_chance(move)
+            bonus[i] = (0.2 if multiplier > 1 else 0.0) + (0.1 if getattr(move, 'status', None) else 0.0)
+        for k, bench_pokemon in enumerate(benches):
+            followup = 0.0
+            for move in bench_pokemon.moves.values():
+                damage, _ = table.lookup(move, bench_pokemon, OUR_SIDE, opp_pokemon, OPPONENT_SIDE)
+                followup = max(followup, damage)
+            bonus[n_moves + k] = self.SWITCH_FOLLOWUP_WEIGHT * followup
+        
+        # Opponent attack per (defender, column); move rows share the active defender
+        opp_base = np.array([
+            [table.lookup(opp_move, opp_pokemon, OPPONENT_SIDE, defender, OUR_SIDE)[0]
+             for _, opp_move, _ in opponent_moves]
+            for defender in defenders
+        ])
+        if n_moves:
+            opp_base = np.concatenate([np.repeat(opp_base[:1], n_moves - 1, axis=0), opp_base])
+        defender_hp = np.array([
+            (defenders[0] if i < n_moves else benches[i - n_moves]).current_hp_fraction
+            for i in range(n_rows)
+        ])
+        opp_accuracy = np.array([move_accuracy(move) for _, move, _ in opponent_moves])
+        opp_crit = np.array([crit_chance(move) for _, move, _ in opponent_moves])
+        probs = np.array([prob for _, _, prob in opponent_moves])
+        
+        ours = self.stochastic_model.evaluate(
+            our_base, our_accuracy, our_crit, opp_pokemon.current_hp_fraction
+        )
+        theirs = self.stochastic_model.evaluate(
+            opp_base, opp_accuracy[None, :], opp_crit[None, :], defender_hp[:, None]
+        )
+        
+        our_value = (ours.capped_expected + self.KO_WEIGHT * ours.ko_probability + bonus
+                     - self.risk_aversion * np.sqrt(ours.variance))
+        their_value = theirs.capped_expected + self.KO_WEIGHT * theirs.ko_probability
+        payoffs = (our_value[:, None] - their_value) * probs[None, :]
+        
+        column_ids = [opp_move_id for opp_move_id, _, _ in opponent_moves]
+        return {
+            row_id: dict(zip(column_ids, payoffs[i].tolist()))
+            for i, row_id in enumerate(row_ids)
+        }
+    
+    def damage_table(self, battle):
+        """Return the DamageTable for a battle, creating it on first use."""
+        with self._tables_lock:
+            table = self.damage_tables.get(battle.battle_tag)
+            if table is None:
+                if len(self.damage_tables) >= self.MAX_CACHED_BATTLES:
+                    self.damage_tables.pop(next(iter(self.damage_tables)))
+                table = self.damage_tables[battle.battle_tag] = DamageTable(self)
+            return table
+    
+    def forget_battle(self, battle_tag):
+        """Free the damage table of a finished battle."""
+        with self._tables_lock:
+            self.damage_tables.pop(battle_tag, None)
+    
+    def _calculate_switch_payoff(self, bench_pokemon, opp_move, opp_pokemon, battle):
+        """Payoff of switching to bench_pokemon while the opponent uses opp_move.
+        
+        The incoming pokemon takes the hit, then threatens its best attack on
+        the following turn. Both parts are read from the battle's damage table.
+        """
+        table = self.damage_table(battle)
+        incoming, _ = table.lookup(opp_move, opp_pokemon, OPPONENT_SIDE, bench_pokemon, OUR_SIDE)
+        
+        followup = 0.0
+        for move in bench_pokemon.moves.values():
+            damage, _ = table.lookup(move, bench_pokemon, OUR_SIDE, opp_pokemon, OPPONENT_SIDE)
+            followup = max(followup, damage)
+        
+        return self.SWITCH_FOLLOWUP_WEIGHT * followup - incoming
+    
     def _calculate_move_vs_move_payoff(self, our_move, opp_move, our_pokemon, opp_pokemon, battle):
         we_go_first = self._determines_move_order(our_move, opp_move, our_pokemon, opp_pokemon)
-        our_damage = self._calculate_move_damage(our_move, our_pokemon, opp_pokemon)
-        opp_damage = self._calculate_move_damage(opp_move, opp_pokemon, our_pokemon)
-        payoff = (our_damage / max(1, opp_pokemon.max_hp)) - (opp_damage / max(1, our_pokemon.max_hp))
+        table = self.damage_table(battle)
+        our_damage, our_multiplier = table.lookup(our_move, our_pokemon, OUR_SIDE, opp_pokemon, OPPONENT_SIDE)
+        opp_damage, _ = table.lookup(opp_move, opp_pokemon, OPPONENT_SIDE, our_pokemon, OUR_SIDE)
+        payoff = our_damage - opp_damage
 
-        if self._is_super_effective(our_move, opp_pokemon):
+        if our_multiplier > 1:
             payoff += 0.2
         
         if hasattr(our_move, 'status') and our_move.status:
@@ -89,19 +321,13 @@ class PayoffMatrixBuilder:
             return False
         
         # Equal priority, check Speed stat
-        our_speed = our_pokemon.stats.get('spe', 0)
-        opp_speed = opp_pokemon.stats.get('spe', 0)
-        
-        # Handle None values safely
-        if our_speed is None:
-            our_speed = 0
-        if opp_speed is None:
-            opp_speed = 0
+        our_speed = self._stat(our_pokemon, 'spe', 0)
+        opp_speed = self._stat(opp_pokemon, 'spe', 0)
             
         return our_speed >= opp_speed
     
     def _calculate_move_damage(self, move, attacker, defender):
-        if move.category == 2:  # Status move
+        if move.category == MoveCategory.STATUS:
             return 0
         
         # Basic damage formula (simplified)
@@ -109,18 +335,17 @@ class PayoffMatrixBuilder:
         power = move.base_power
         
         # Use the appropriate attack and defense stats
-        if move.category == 0:  # Physical
-            attack = attacker.stats.get('atk', 50)
-            defense = defender.stats.get('def', 50)
+        physical = move.category == MoveCategory.PHYSICAL
+        if physical:
+            attack = self._stat(attacker, 'atk', 50)
+            defense = self._stat(defender, 'def', 50)
         else:  # Special
-            attack = attacker.stats.get('spa', 50)
-            defense = defender.stats.get('spd', 50)
+            attack = self._stat(attacker, 'spa', 50)
+            defense = self._stat(defender, 'spd', 50)
         
-        # Handle None values safely
-        if attack is None:
-            attack = 50  # Default value
-        if defense is None:
-            defense = 50  # Default value
+        # Stat stages from boosts/drops
+        attack *= self._boost_multiplier(attacker, 'atk' if physical else 'spa')
+        defense *= self._boost_multiplier(defender, 'def' if physical else 'spd')
         
         # Calculate base damage (simplified formula)
         base_damage = ((2 * level / 5 + 2) * power * attack / defense) / 50 + 2
@@ -136,19 +361,44 @@ class PayoffMatrixBuilder:
         
         return damage
     
+    def _stat(self, pokemon, stat, default):
+        """Known stat of a pokemon, else the random-battle estimate for its species."""
+        value = (getattr(pokemon, 'stats', None) or {}).get(stat)
+        if value is None:
+            value = self.stat_table.lookup(pokemon.species, stat, pokemon.level or 100)
+        return default if value is None else value
+    
+    def _max_hp(self, pokemon):
+        """Max HP in stat points; opponents only report HP as a percentage."""
+        stats = getattr(pokemon, 'stats', None) or {}
+        # Our own pokemon always have their stats (minus HP) from the request
+        if stats.get('hp') is None and stats.get('atk') is None:
+            estimate = self.stat_table.lookup(pokemon.species, 'hp', pokemon.level or 100)
+            if estimate is not None:
+                return estimate
+        return max(1, pokemon.max_hp or 0)
+    
+    def _boost_multiplier(self, pokemon, stat):
+        stage = (getattr(pokemon, 'boosts', None) or {}).get(stat, 0)
+        return (2 + stage) / 2 if stage >= 0 else 2 / (2 - stage)
+    
     def _calculate_type_effectiveness(self, move, defender):
-        if move.category == 2:  # Status move
+        if move.category == MoveCategory.STATUS:
             return 1
         
-        move_type = move.type
+        # The chart is keyed by lowercase type names; poke_env types are enums
+        move_type = self._type_name(move.type)
         multiplier = 1
         
-        for defender_type in defender.types:
+        for defender_type in map(self._type_name, defender.types):
             if move_type in self.type_chart and defender_type in self.type_chart[move_type]:
                 multiplier *= self.type_chart[move_type][defender_type]
         
         return multiplier
     
+    def _type_name(self, pokemon_type):
+        return pokemon_type.name.lower() if hasattr(pokemon_type, 'name') else str(pokemon_type).lower()
+    
     def _is_super_effective(self, move, defender):
         effectiveness = self._calculate_type_effectiveness(move, defender)
         return effectiveness > 1
@@ -0,0 +1,252 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from anytime_decision import solve_payoff_matrix
+from battle_catalog import BattleCatalog
+from battle_snapshot import BattleSnapshot, PokemonSnapshot
+from payoff_builder import PayoffMatrixBuilder
+
+STAGES = ("predict", "build", "solve")
+
+# Per-process builder, created by the pool initializer
+_replay_builder = None
+
+
+def load_battle_file(filepath):
+    """Load one battle file written by BattleDataCollector.
+
+    Args:
+        filepath: Path to the JSON file
+
+    Returns:
+        Battle data dictionary, or None if the file is unreadable
+    """
+    try:
+        with open(filepath, 'r') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Error reading battle file {filepath}: {e}")
+        return None
+
+
+def snapshots_from_battle(battle_data):
+    """Rebuild the decision points of a logged battle.
+
+    BattleDataCollector records the move chosen on the previous turn, so the
+    move logged at turn i + 1 is the one picked for the state at turn i.
+
+    Args:
+        battle_data: Battle data dictionary
+
+    Returns:
+        List of (BattleSnapshot, logged move ID or None)
+    """
+    turns = battle_data.get("turns") or []
+    team_records = {
+        identifier: pokemon
+        for identifier, pokemon in (battle_data.get("our_team") or {}).items()
+        if pokemon
+    }
+    team = {identifier: PokemonSnapshot.from_record(pokemon) for identifier, pokemon in team_records.items()}
+
+    decisions = []
+    for i, turn in enumerate(turns):
+        active = PokemonSnapshot.from_record(turn.get("our_active"))
+        opponent = PokemonSnapshot.from_record(turn.get("opponent_active"))
+        if active is None or opponent is None:
+            continue
+
+        # Files captured from events carry the team's HP at each turn (the
+        # team itself is extracted when the battle ends); older files only
+        # have the team as it was on the first recorded turn
+        if "our_hp" in turn:
+            team = {
+                identifier: PokemonSnapshot.from_record(
+                    dict(pokemon, hp=turn["our_hp"].get(pokemon["species"], 1.0))
+                )
+                for identifier, pokemon in team_records.items()
+            }
+        switches = [
+            pokemon for pokemon in team.values()
+            if not pokemon.fainted and pokemon.species != active.species
+        ]
+        snapshot = BattleSnapshot(
+            battle_data.get("battle_id", "replay"),
+            turn=turn.get("turn", i),
+            format=battle_data.get("format"),
+            active_pokemon=active,
+            opponent_active_pokemon=opponent,
+            available_moves=list(active.moves.values()),
+            available_switches=switches,
+            team=team,
+        )
+
+        next_move = turns[i + 1].get("our_move") if i + 1 < len(turns) else None
+        decisions.append((snapshot, next_move["id"] if next_move else None))
+
+    return decisions
+
+
+def _init_replay_worker(payoff_options):
+    global _replay_builder
+    _replay_builder = PayoffMatrixBuilder(**payoff_options)
+
+
+def replay_battle_file(filepath):
+    """Run the decision pipeline over every turn of one battle file.
+
+    Returns:
+        List of per-turn dicts with stage timings and agreement with the log
+    """
+    builder = _replay_builder
+    battle_data = load_battle_file(filepath)
+    if not battle_data:
+        return []
+
+    results = []
+    decisions = snapshots_from_battle(battle_data)
+    for snapshot, logged_move in decisions:
+        try:
+            started = time.perf_counter()
+            opponent_move_probs = builder.opponent_model.predict_moves(snapshot)
+            predicted = time.perf_counter()
+            payoff_matrix = builder.build_matrix(snapshot, opponent_move_probs=opponent_move_probs)
+            built = time.perf_counter()
+            move_probabilities, _, _ = solve_payoff_matrix(payoff_matrix) if payoff_matrix else ({}, True, None)
+            solved = time.perf_counter()
+        except Exception as e:
+            print(f"Error replaying {filepath} turn {snapshot.turn}: {e}")
+            continue
+
+        chosen = max(move_probabilities, key=move_probabilities.get) if move_probabilities else None
+        results.append({
+            "predict": predicted - started,
+            "build": built - predicted,
+            "solve": solved - built,
+            "logged_move": logged_move,
+            "agrees": chosen == logged_move if logged_move else None,
+            "logged_probability": move_probabilities.get(logged_move, 0.0) if logged_move else None,
+        })
+
+    if decisions:
+        builder.forget_battle(decisions[0][0].battle_tag)
+    return results
+
+
+def run_replay(data_dir="logs/battle_data", workers=None, limit=None, payoff_options=None,
+               catalog=None, **filters):
+    """Replay logged battles offline across worker processes.
+
+    Args:
+        data_dir: Directory of BattleDataCollector files
+        workers: Number of worker processes (defaults to the CPU count)
+        limit: Maximum number of files to replay
+        payoff_options: PayoffMatrixBuilder keyword arguments
+        catalog: Optional BattleCatalog used to select only matching battles
+        **filters: BattleCatalog.battle_files filters, e.g. format
+
+    Returns:
+        Summary dictionary with throughput, per-stage latency and agreement
+    """
+    if catalog is not None:
+        battle_files = catalog.battle_files(**filters)
+    else:
+        battle_files = sorted(
+            os.path.join(data_dir, f) for f in os.listdir(data_dir) if f.endswith(".json")
+        )
+    if limit:
+        battle_files = battle_files[:limit]
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_replay_worker,
+        initargs=(dict(payoff_options or {}),)
+    ) as pool:
+        per_file = list(pool.map(replay_battle_file, battle_files, chunksize=4))
+    elapsed = time.perf_counter() - started
+
+    turns = [turn for results in per_file for turn in results]
+    labelled = [turn for turn in turns if turn["logged_move"]]
+
+    summary = {
+        "files": len(battle_files),
+        "files_replayed": sum(1 for results in per_file if results),
+        "decisions": len(turns),
+        "wall_seconds": elapsed,
+        "decisions_per_second": len(turns) / elapsed if elapsed > 0 else 0.0,
+        "latency_ms": {},
+        "labelled_decisions": len(labelled),
+        "agreement": None,
+        "mean_logged_probability": None,
+    }
+    for stage in STAGES:
+        samples = np.array([turn[stage] for turn in turns]) * 1000.0
+        if len(samples):
+            summary["latency_ms"][stage] = {
+                "mean": float(samples.mean()),
+                "p50": float(np.percentile(samples, 50)),
+                "p95": float(np.percentile(samples, 95)),
+            }
+    if labelled:
+        summary["agreement"] = sum(turn["agrees"] for turn in labelled) / len(labelled)
+        summary["mean_logged_probability"] = float(np.mean([turn["logged_probability"] for turn in labelled]))
+
+    return summary
+
+
+def print_report(summary):
+    """Print a replay summary in a readable form."""
+    print(f"Replayed {summary['files_replayed']}/{summary['files']} battle files, "
+          f"{summary['decisions']} decisions in {summary['wall_seconds']:.2f}s "
+          f"({summary['decisions_per_second']:.1f} decisions/s)")
+    for stage, latency in summary["latency_ms"].items():
+        print(f"  {stage:<8} mean {latency['mean']:.3f} ms  p50 {latency['p50']:.3f} ms  "
+              f"p95 {latency['p95']:.3f} ms")
+    if summary["agreement"] is not None:
+        print(f"Agreement with logged moves: {summary['agreement']:.1%} "
+              f"over {summary['labelled_decisions']} decisions "
+              f"(mean probability on logged move {summary['mean_logged_probability']:.3f})")
+    else:
+        print("No logged moves to compare against.")
+
+
+def main():
+    """Replay logged battles through the decision pipeline."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--data-dir", default="logs/battle_data")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--stochastic-damage", action="store_true")
+    parser.add_argument("--format", default=None, help="Only replay battles of this format")
+    parser.add_argument("--opponent-species", default=None,
+                        help="Only replay battles that faced this species")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args()
+
+    filters = {"format": args.format, "opponent_species": args.opponent_species}
+    catalog = None
+    if any(value is not None for value in filters.values()):
+        catalog = BattleCatalog(os.path.join(args.data_dir, "catalog.sqlite"))
+
+    summary = run_replay(
+        data_dir=args.data_dir,
+        workers=args.workers,
+        limit=args.limit,
+        payoff_options={"stochastic_damage": args.stochastic_damage},
+        catalog=catalog,
+        **filters
+    )
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_report(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import numpy as np
+from poke_env.data import GenData
+
+STATS = ("hp", "atk", "def", "spa", "spd", "spe")
+STAT_INDEX = {stat: i for i, stat in enumerate(STATS)}
+
+# Random battle sets use 31 IVs, 84 EVs in every stat and a neutral nature
+RANDOM_BATTLE_IV = 31
+RANDOM_BATTLE_EV = 84
+
+
+class StatTable:
+    """Estimated stats of every species under random-battle conventions.
+
+    Built once from GenData base stats. For each species the table stores the
+    level-independent part of the stat formula, 2 * base + IV + EV / 4, in an
+    int16 array of shape (n_species, 6); a lookup is a dict hit for the row
+    plus the level scaling, using the level Showdown reveals on switch-in.
+    """
+
+    def __init__(self, gen=9):
+        """Build the table.
+
+        Args:
+            gen: Generation whose pokedex provides the base stats
+        """
+        pokedex = GenData.from_gen(gen).pokedex
+        self.species_index = {}  # species id -> row
+        rows = []
+        for species, entry in pokedex.items():
+            base_stats = entry.get("baseStats")
+            if not base_stats:
+                continue
+            self.species_index[species] = len(rows)
+            rows.append([
+                2 * base_stats[stat] + RANDOM_BATTLE_IV + RANDOM_BATTLE_EV // 4
+                for stat in STATS
+            ])
+        self.stat_terms = np.array(rows, dtype=np.int16)
+
+    def lookup(self, species, stat, level=100):
+        """Estimated stat of a species at a level.
+
+        Args:
+            species: Species id, e.g. "garchomp"
+            stat: One of STATS
+            level: Pokemon level
+
+        Returns:
+            Stat value, or None for unknown species
+        """
+        row = self.species_index.get(species)
+        if row is None:
+            return None
+        term = int(self.stat_terms[row, STAT_INDEX[stat]])
+        if stat == "hp":
+            return term * level // 100 + level + 10
+        return term * level // 100 + 5
+
+
+_stat_tables = {}
+
+
+def get_stat_table(gen=9):
+    """Shared StatTable for a generation, built on first use."""
+    table = _stat_tables.get(gen)
+    if table is None:
+        table = _stat_tables[gen] = StatTable(gen)
+    return table
@@ -0,0 +1,89 @@
+import numpy as np
+
+# Showdown rolls a uniform integer in [85, 100] and divides by 100
+DAMAGE_ROLLS = np.arange(85, 101) / 100.0
+CRIT_MULTIPLIER = 1.5
+# Gen 7+ critical hit chance by crit stage (stage 3 and above always crits)
+CRIT_CHANCE_BY_STAGE = (1 / 24, 1 / 8, 1 / 2, 1.0)
+
+
+def crit_chance(move):
+    """Critical hit chance of a move.
+
+    poke_env reports Showdown's critRatio, which is 1 for an ordinary move
+    (0 when the move data omits it), 2 for high-crit moves such as Slash and
+    6 for moves that always crit such as Frost Breath; the stage is one less.
+    """
+    stage = int(getattr(move, 'crit_ratio', 0) or 0) - 1
+    return CRIT_CHANCE_BY_STAGE[min(max(stage, 0), len(CRIT_CHANCE_BY_STAGE) - 1)]
+
+
+def move_accuracy(move):
+    """Hit chance of a move as a float in [0, 1] (True means it never misses)."""
+    accuracy = getattr(move, 'accuracy', 1.0)
+    if accuracy is True or accuracy is None:
+        return 1.0
+    return float(accuracy) if accuracy <= 1 else accuracy / 100.0
+
+
+class DamageDistribution:
+    """Per-cell damage statistics, all arrays of the same shape."""
+
+    def __init__(self, expected, capped_expected, ko_probability, variance):
+        self.expected = expected
+        self.capped_expected = capped_expected
+        self.ko_probability = ko_probability
+        self.variance = variance
+
+
+class StochasticDamageModel:
+    """Closed-form damage distributions for whole payoff matrices at once.
+
+    Every hit enumerates the 16 damage rolls times crit/no crit (32 outcomes
+    with known probabilities) plus a miss, so the results are exact for the
+    simplified damage formula rather than sampled. Inputs are arrays of any
+    broadcastable shape; the outcome axis is added last and reduced away.
+    """
+
+    def __init__(self):
+        rolls = np.concatenate([DAMAGE_ROLLS, DAMAGE_ROLLS * CRIT_MULTIPLIER])
+        self._multipliers = rolls  # (32,)
+        self._roll_weight = 1.0 / len(DAMAGE_ROLLS)
+        self._crit_mask = np.concatenate([np.zeros(len(DAMAGE_ROLLS)), np.ones(len(DAMAGE_ROLLS))])
+
+    def evaluate(self, base_damage, accuracy, crit_probability, target_hp):
+        """Compute damage statistics for every cell.
+
+        Args:
+            base_damage: Max-roll, non-crit damage as a fraction of target max HP
+            accuracy: Hit chance in [0, 1]
+            crit_probability: Critical hit chance in [0, 1]
+            target_hp: Target's remaining HP as a fraction of max HP
+
+        Returns:
+            DamageDistribution with arrays shaped like the broadcast inputs
+        """
+        base_damage, accuracy, crit_probability, target_hp = np.broadcast_arrays(
+            *(np.asarray(x, dtype=float) for x in (base_damage, accuracy, crit_probability, target_hp))
+        )
+
+        # Outcome probabilities given a hit: (..., 32)
+        crit = crit_probability[..., None]
+        outcome_p = self._roll_weight * np.where(self._crit_mask == 1, crit, 1.0 - crit)
+        damage = base_damage[..., None] * self._multipliers
+        hit = accuracy
+
+        mean_given_hit = np.sum(outcome_p * damage, axis=-1)
+        square_given_hit = np.sum(outcome_p * damage ** 2, axis=-1)
+        capped_given_hit = np.sum(outcome_p * np.minimum(damage, target_hp[..., None]), axis=-1)
+        ko_given_hit = np.sum(outcome_p * (damage >= target_hp[..., None]), axis=-1)
+
+        expected = hit * mean_given_hit
+        variance = hit * square_given_hit - expected ** 2
+
+        return DamageDistribution(
+            expected=expected,
+            capped_expected=hit * capped_given_hit,
+            ko_probability=hit * ko_given_hit,
+            variance=np.maximum(variance, 0.0),
+        )
@@ -0,0 +1,347 @@
+import argparse
+import asyncio
+import inspect
+import itertools
+import json
+import multiprocessing
+import os
+import re
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from poke_env import AccountConfiguration, LocalhostServerConfiguration
+from poke_env.player import MaxBasePowerPlayer, RandomPlayer, SimpleHeuristicsPlayer
+
+from agent import GameTheoryAgent
+from data_collector import BattleDataCollector
+from moveset_knowledge import MovesetKnowledge
+
+PLAYER_CLASSES = {
+    "game_theory": GameTheoryAgent,
+    "random": RandomPlayer,
+    "max_damage": MaxBasePowerPlayer,
+    "heuristic": SimpleHeuristicsPlayer,
+}
+
+DEFAULT_CONFIGS = [
+    {"name": "game_theory", "player": "game_theory"},
+    {"name": "game_theory_stochastic", "player": "game_theory",
+     "options": {"payoff_options": {"stochastic_damage": True}}},
+    {"name": "game_theory_search", "player": "game_theory",
+     "options": {"search_options": {"max_depth": 3}}},
+    {"name": "random", "player": "random"},
+    {"name": "max_damage", "player": "max_damage"},
+    {"name": "heuristic", "player": "heuristic"},
+]
+
+INITIAL_ELO = 1500.0
+ELO_K = 16.0
+
+
+class LatencyRecorder:
+    """Mixin timing every choose_move call, including awaited decisions."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.decision_latencies = []
+
+    def choose_move(self, battle):
+        started = time.perf_counter()
+        choice = super().choose_move(battle)
+        if inspect.isawaitable(choice):
+            return self._timed(choice, started)
+        self.decision_latencies.append(time.perf_counter() - started)
+        return choice
+
+    async def _timed(self, choice, started):
+        try:
+            return await choice
+        finally:
+            self.decision_latencies.append(time.perf_counter() - started)
+
+
+def _timed_player(config, username, battle_format, data_dir):
+    player_class = PLAYER_CLASSES[config["player"]]
+    timed_class = type(f"Timed{player_class.__name__}", (LatencyRecorder, player_class), {})
+    player = timed_class(
+        account_configuration=AccountConfiguration(username, None),
+        server_configuration=LocalhostServerConfiguration,
+        battle_format=battle_format,
+        **config.get("options", {})
+    )
+    if isinstance(player, GameTheoryAgent):
+        # Benchmark games stay out of the training logs and the ladder knowledge base
+        player.data_collector = BattleDataCollector(data_dir)
+        player.payoff_builder.knowledge = MovesetKnowledge(os.path.join(data_dir, "moveset_knowledge.sqlite"))
+    return player
+
+
+async def _stop(player):
+    """Disconnect a player and release its pools (workers are reused across jobs)."""
+    if isinstance(player, GameTheoryAgent):
+        await player.stop()
+    else:
+        await player.ps_client.stop_listening()
+
+
+async def _play(player_a, player_b, n_battles):
+    try:
+        await player_a.battle_against(player_b, n_battles=n_battles)
+    finally:
+        for player in (player_a, player_b):
+            try:
+                await _stop(player)
+            except Exception as e:
+                print(f"Error stopping {player.username}: {e}")
+
+
+def _username(config, job, seat):
+    # Showdown names are at most 18 characters and must be unique while connected
+    return re.sub(r"[^A-Za-z0-9]", "", config["name"])[:10] + f"{job}{seat}"
+
+
+def play_matchup(job, config_a, config_b, n_battles, battle_format, data_dir):
+    """Play n_battles between two configurations (runs in a worker process).
+
+    Returns:
+        Dict with the score of each finished battle from config_a's side
+        (1, 0.5 for a tie or 0), the number of battles that ended without a
+        result (timeouts, disconnects) and the decision latencies of both
+        sides in seconds
+    """
+    player_a = _timed_player(config_a, _username(config_a, job, "a"), battle_format, data_dir)
+    player_b = _timed_player(config_b, _username(config_b, job, "b"), battle_format, data_dir)
+
+    asyncio.run(_play(player_a, player_b, n_battles))
+
+    scores = []
+    unfinished = 0
+    for battle in player_a.battles.values():
+        if battle.won:
+            scores.append(1.0)
+        elif battle.lost:
+            scores.append(0.0)
+        elif battle.finished:
+            scores.append(0.5)
+        else:
+            unfinished += 1
+
+    return {
+        "a": config_a["name"],
+        "b": config_b["name"],
+        "scores": scores,
+        "unfinished": unfinished,
+        "latencies": {
+            config_a["name"]: player_a.decision_latencies,
+            config_b["name"]: player_b.decision_latencies,
+        },
+    }
+
+
+def update_elo(ratings, a, b, score):
+    """Online Elo update for one game; score is from a's side."""
+    expected = 1.0 / (1.0 + 10 ** ((ratings[b] - ratings[a]) / 400.0))
+    ratings[a] += ELO_K * (score - expected)
+    ratings[b] -= ELO_K * (score - expected)
+
+
+def fit_bradley_terry(names, games, iterations=200):
+    """Order-independent ratings from all games (minorization-maximization).
+
+    Every pair also gets one virtual draw, which keeps ratings finite for
+    agents that never (or always) win.
+
+    Args:
+        names: Agent names
+        games: List of (a, b, score for a)
+
+    Returns:
+        Array of Elo-scaled ratings, mean INITIAL_ELO, in names order
+    """
+    index = {name: i for i, name in enumerate(names)}
+    n = len(names)
+    wins = np.zeros(n)
+    played = np.zeros((n, n))
+    for a, b, score in games:
+        i, j = index[a], index[b]
+        wins[i] += score
+        wins[j] += 1.0 - score
+        played[i, j] += 1
+        played[j, i] += 1
+    prior = 1.0 - np.eye(n)
+    wins = wins + 0.5 * prior.sum(axis=1)
+    played = played + prior
+
+    strength = np.ones(n)
+    for _ in range(iterations):
+        denominator = (played / (strength[:, None] + strength[None, :])).sum(axis=1)
+        strength = wins / denominator
+        strength /= np.exp(np.log(strength).mean())
+
+    elo = 400.0 * np.log10(strength)
+    return elo - elo.mean() + INITIAL_ELO
+
+
+def rating_intervals(names, games, samples=200, seed=0):
+    """Bootstrap 95% intervals of the Bradley-Terry ratings.
+
+    Returns:
+        Array of shape (len(names), 2) with the lower and upper bounds
+    """
+    rng = np.random.default_rng(seed)
+    draws = np.array([
+        fit_bradley_terry(names, [games[k] for k in rng.integers(0, len(games), len(games))])
+        for _ in range(samples)
+    ])
+    return np.percentile(draws, [2.5, 97.5], axis=0).T
+
+
+def run_tournament(configs, battles_per_pair=20, chunk_size=10, workers=None,
+                   battle_format="gen9randombattle", data_dir="logs/tournament", on_result=None):
+    """Round-robin every pair of configurations across worker processes.
+
+    Each pair's battles are split into chunks of chunk_size; every chunk is
+    one job with its own pair of accounts, so jobs run in parallel on the
+    local server.
+
+    Args:
+        configs: List of {"name", "player", "options"} dicts
+        battles_per_pair: Battles per pair of configurations
+        chunk_size: Battles per job
+        workers: Number of worker processes
+        battle_format: Showdown format
+        data_dir: Where game theory agents log battles and keep their moveset
+            knowledge, apart from the training data
+        on_result: Called as on_result(result, ratings) after every job
+
+    Returns:
+        Summary dictionary with ratings, intervals, records and latency;
+        battles that ended without a result are only counted in "unfinished"
+    """
+    names = [config["name"] for config in configs]
+    if len(set(names)) != len(names):
+        raise ValueError("Agent configuration names must be unique")
+
+    jobs = []
+    for config_a, config_b in itertools.combinations(configs, 2):
+        remaining = battles_per_pair
+        while remaining > 0:
+            jobs.append((config_a, config_b, min(chunk_size, remaining)))
+            remaining -= chunk_size
+
+    ratings = {name: INITIAL_ELO for name in names}
+    games = []
+    unfinished = 0
+    latencies = defaultdict(list)
+    started = time.perf_counter()
+
+    # Players need poke_env's background event loop thread, which forked
+    # workers would inherit without it running, so workers are spawned
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = [
+            pool.submit(play_matchup, job, config_a, config_b, n_battles, battle_format, data_dir)
+            for job, (config_a, config_b, n_battles) in enumerate(jobs)
+        ]
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"Matchup failed: {e}")
+                continue
+            for score in result["scores"]:
+                games.append((result["a"], result["b"], score))
+                update_elo(ratings, result["a"], result["b"], score)
+            unfinished += result["unfinished"]
+            for name, samples in result["latencies"].items():
+                latencies[name].extend(samples)
+            if on_result is not None:
+                on_result(result, ratings)
+
+    summary = {
+        "games": len(games),
+        "unfinished": unfinished,
+        "wall_seconds": time.perf_counter() - started,
+        "agents": {},
+    }
+    if not games:
+        return summary
+
+    elo = fit_bradley_terry(names, games)
+    intervals = rating_intervals(names, games)
+    for i, name in enumerate(names):
+        agent_games = [(a, b, s) for a, b, s in games if name in (a, b)]
+        points = sum(s if a == name else 1.0 - s for a, b, s in agent_games)
+        samples = np.array(latencies[name]) * 1000.0
+        summary["agents"][name] = {
+            "elo": float(elo[i]),
+            "elo_low": float(intervals[i, 0]),
+            "elo_high": float(intervals[i, 1]),
+            "online_elo": ratings[name],
+            "games": len(agent_games),
+            "score": points / len(agent_games) if agent_games else None,
+            "latency_ms": {
+                "mean": float(samples.mean()),
+                "p50": float(np.percentile(samples, 50)),
+                "p95": float(np.percentile(samples, 95)),
+            } if len(samples) else None,
+        }
+    return summary
+
+
+def print_standings(summary):
+    """Print ratings and decision latency side by side."""
+    print(f"{summary['games']} games in {summary['wall_seconds']:.1f}s"
+          + (f" ({summary['unfinished']} unfinished, not rated)" if summary["unfinished"] else ""))
+    print(f"{'agent':<24} {'elo':>6} {'95% CI':>15} {'score':>6} {'p50 ms':>8} {'p95 ms':>8}")
+    standings = sorted(summary["agents"].items(), key=lambda item: item[1]["elo"], reverse=True)
+    for name, agent in standings:
+        latency = agent["latency_ms"] or {"p50": float("nan"), "p95": float("nan")}
+        print(f"{name:<24} {agent['elo']:6.0f} [{agent['elo_low']:5.0f}, {agent['elo_high']:5.0f}] "
+              f"{agent['score']:6.1%} {latency['p50']:8.2f} {latency['p95']:8.2f}")
+
+
+def main():
+    """Run a round-robin tournament on a local Showdown server."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--config", default=None,
+                        help="JSON file with a list of {name, player, options} agent configurations")
+    parser.add_argument("--battles", type=int, default=20, help="Battles per pair of agents")
+    parser.add_argument("--chunk-size", type=int, default=10, help="Battles per worker job")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--format", default="gen9randombattle")
+    parser.add_argument("--data-dir", default="logs/tournament",
+                        help="Battle logs and moveset knowledge of the game theory agents")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args()
+
+    configs = DEFAULT_CONFIGS
+    if args.config:
+        with open(args.config, 'r') as f:
+            configs = json.load(f)
+
+    def report(result, ratings):
+        wins = sum(result["scores"])
+        standings = ", ".join(f"{name} {rating:.0f}" for name, rating in
+                              sorted(ratings.items(), key=lambda item: item[1], reverse=True))
+        unfinished = f" ({result['unfinished']} unfinished)" if result["unfinished"] else ""
+        print(f"{result['a']} vs {result['b']}: {wins:g}/{len(result['scores'])}{unfinished}  | {standings}")
+
+    summary = run_tournament(
+        configs,
+        battles_per_pair=args.battles,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        battle_format=args.format,
+        data_dir=args.data_dir,
+        on_result=None if args.json else report,
+    )
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_standings(summary)
+
+
+if __name__ == "__main__":
+    main()
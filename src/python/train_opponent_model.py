@@ -1,14 +1,38 @@
+import argparse
+import os
+
+from battle_catalog import BattleCatalog
 from opponent_model import OpponentModel
 
 def main():
     """Train the opponent model on collected battle data."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--data-dir", default="logs/battle_data")
+    parser.add_argument("--format", default=None, help="Only train on battles of this format")
+    parser.add_argument("--opponent-species", default=None, help="Only train on turns against this species")
+    parser.add_argument("--since", default=None, help="Only train on battles started on or after this ISO date")
+    parser.add_argument("--rebuild-index", action="store_true", help="Re-index every battle file first")
+    parser.add_argument("--workers", type=int, default=None, help="Processes fitting model shards in parallel")
+    args = parser.parse_args()
+
+    filters = {
+        "format": args.format,
+        "opponent_species": args.opponent_species,
+        "since": args.since,
+    }
+    catalog = None
+    if args.rebuild_index or any(value is not None for value in filters.values()):
+        catalog = BattleCatalog(os.path.join(args.data_dir, "catalog.sqlite"))
+        if args.rebuild_index:
+            print(f"Indexed {catalog.rebuild(args.data_dir)} battle files.")
+
     model = OpponentModel()
-    success = model.train()
-    
+    success = model.train(args.data_dir, catalog=catalog, workers=args.workers, **filters)
+
     if success:
         print("Opponent model trained successfully!")
     else:
         print("Failed to train opponent model. Check if you have battle data.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,29 @@
+import os
+import sys
+
+import pytest
+
+# The Python sources are plain modules, imported the way the agent imports them
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "src", "python"))
+
+
+@pytest.fixture
+def make_snapshot():
+    """Factory for a one-on-one BattleSnapshot: Garchomp against Gyarados."""
+    from poke_env.environment.move import Move
+    from poke_env.environment.pokemon_type import PokemonType
+
+    from battle_snapshot import BattleSnapshot, MoveSnapshot, PokemonSnapshot
+
+    def make(battle_tag="battle-test-1"):
+        moves = {move_id: MoveSnapshot.from_move(Move(move_id, gen=9))
+                 for move_id in ("earthquake", "dragonclaw")}
+        ours = PokemonSnapshot("garchomp", types=(PokemonType.DRAGON, PokemonType.GROUND),
+                               stats={"atk": 200, "def": 150, "spa": 120, "spd": 130, "spe": 170},
+                               moves=moves)
+        theirs = PokemonSnapshot("gyarados", types=(PokemonType.WATER, PokemonType.FLYING),
+                                 moves={"waterfall": MoveSnapshot.from_move(Move("waterfall", gen=9))})
+        return BattleSnapshot(battle_tag, turn=1, active_pokemon=ours, opponent_active_pokemon=theirs,
+                              available_moves=list(moves.values()), team={"garchomp": ours},
+                              opponent_team={"gyarados": theirs})
+    return make
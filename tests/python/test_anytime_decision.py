@@ -0,0 +1,74 @@
+import pytest
+
+# Full and partial solves go through the native module (build_cpp.sh)
+pytest.importorskip("nash_solver", exc_type=ImportError)
+
+from anytime_decision import AnytimeDecider, TurnDeadline, parse_timer_seconds
+from moveset_knowledge import MovesetKnowledge
+from payoff_builder import PayoffMatrixBuilder
+
+
+class _BrokenBuilder(PayoffMatrixBuilder):
+    def build_matrix(self, battle, use_opponent_model=True, opponent_move_probs=None):
+        raise RuntimeError("no matrix")
+
+
+@pytest.fixture
+def knowledge(tmp_path):
+    return MovesetKnowledge(str(tmp_path / "knowledge.sqlite"))
+
+
+def test_timer_seconds_are_read_from_the_inactive_message():
+    message = "|inactive|Time left: 150 sec this turn | 280 sec total".split("|")
+
+    assert parse_timer_seconds(message[2]) == 150
+    assert parse_timer_seconds("Battle timer is ON: inactive players will automatically lose when time's up.") is None
+
+
+def test_zero_budget_deadline_is_expired():
+    deadline = TurnDeadline(0.0)
+
+    assert deadline.expired()
+    assert deadline.remaining() == 0.0
+
+
+def test_full_solve_without_deadline(make_snapshot, knowledge):
+    decider = AnytimeDecider(PayoffMatrixBuilder(knowledge=knowledge))
+
+    payoff_matrix, move_probabilities, tier = decider.decide(make_snapshot())
+
+    assert tier == "full"
+    assert set(payoff_matrix) == {"earthquake", "dragonclaw"}
+    assert sum(move_probabilities.values()) == pytest.approx(1.0)
+
+
+def test_expired_deadline_reuses_the_cached_strategy(make_snapshot, knowledge):
+    decider = AnytimeDecider(PayoffMatrixBuilder(knowledge=knowledge))
+    _, full_strategy, _ = decider.decide(make_snapshot())
+
+    _, move_probabilities, tier = decider.decide(make_snapshot(), TurnDeadline(0.0))
+
+    assert tier == "cached"
+    assert move_probabilities == full_strategy
+
+
+def test_expired_deadline_without_cache_plays_the_uniform_prior(make_snapshot, knowledge):
+    decider = AnytimeDecider(PayoffMatrixBuilder(knowledge=knowledge))
+
+    payoff_matrix, move_probabilities, tier = decider.decide(make_snapshot(), TurnDeadline(0.0))
+
+    assert tier == "uniform_prior"
+    assert len(move_probabilities) == 1
+    assert set(move_probabilities) <= set(payoff_matrix)
+
+
+def test_heuristic_when_no_matrix_can_be_built(make_snapshot, knowledge):
+    decider = AnytimeDecider(_BrokenBuilder(knowledge=knowledge))
+
+    payoff_matrix, move_probabilities, tier = decider.decide(make_snapshot(), TurnDeadline(0.0))
+
+    assert tier == "heuristic"
+    assert payoff_matrix == {}
+    # Earthquake does nothing to a Flying type, so Dragon Claw is the best hit
+    assert move_probabilities == {"dragonclaw": 1.0}
+    assert decider.tier_counts["heuristic"] == 1
@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from battle_catalog import BattleCatalog, dump_battle_with_offsets
+
+
+def _turn(number, opponent_move):
+    return {
+        "turn": number,
+        "our_active": {"species": "garchomp"},
+        "opponent_active": {"species": "gyarados"},
+        "our_move": {"id": "earthquake"},
+        "opponent_move": {"id": opponent_move} if opponent_move else None,
+    }
+
+
+def _battle(battle_id, moves):
+    return {
+        "battle_id": battle_id,
+        "format": "gen9randombattle",
+        "result": "win",
+        "events": [["", "turn", "1"], ["", "move", "p2a: Gyarados", "Waterfall"]],
+        "turns": [_turn(i + 1, move) for i, move in enumerate(moves)],
+    }
+
+
+def _save(tmp_path, catalog, battle_data, offsets=None):
+    text, real_offsets = dump_battle_with_offsets(battle_data)
+    filepath = tmp_path / f"{battle_data['battle_id']}.json"
+    filepath.write_bytes(text.encode("ascii"))
+    catalog.add_battle(str(filepath), battle_data, offsets or real_offsets)
+    return text, real_offsets
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    return BattleCatalog(str(tmp_path / "catalog.sqlite"))
+
+
+def test_turn_offsets_round_trip_through_the_catalog(tmp_path, catalog):
+    battle_data = _battle("battle-1", ["waterfall", None, "dragondance"])
+
+    text, offsets = _save(tmp_path, catalog, battle_data)
+
+    assert json.loads(text) == battle_data
+    for (start, end), turn in zip(offsets, battle_data["turns"]):
+        assert json.loads(text.encode("ascii")[start:end]) == turn
+    assert catalog.query_turns() == [("battle-1", i, turn) for i, turn in enumerate(battle_data["turns"])]
+    assert [turn for _, _, turn in catalog.query_turns(with_opponent_move=True)] == [
+        battle_data["turns"][0], battle_data["turns"][2]
+    ]
+
+
+def test_training_pairs_stay_aligned_when_a_turn_is_unreadable(tmp_path, catalog):
+    broken = _battle("battle-1", ["waterfall", "waterfall", "dragondance", "bounce"])
+    _, offsets = _save(tmp_path, catalog, broken)
+    # Turn index 2 points at garbage, so both pairs that include it are lost
+    offsets[2] = (0, 5)
+    catalog.add_battle(str(tmp_path / "battle-1.json"), broken, offsets)
+    _save(tmp_path, catalog, _battle("battle-2", [None, "waterfall", None, "bounce"]))
+
+    pairs = catalog.training_pairs()
+
+    assert [(turn["turn"], next_turn["turn"]) for _, turn, next_turn in pairs] == [(1, 2), (1, 2), (3, 4)]
+    for battle_format, turn, next_turn in pairs:
+        assert battle_format == "gen9randombattle"
+        assert next_turn["turn"] == turn["turn"] + 1
+        assert next_turn["opponent_move"] is not None
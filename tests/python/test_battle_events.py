@@ -0,0 +1,65 @@
+from battle_events import BattleEventRecorder, parse_event, rebuild_turns
+
+PROTOCOL = """>battle-gen9randombattle-1
+|switch|p1a: Garchomp|Garchomp, L80, M|100/100
+|switch|p2a: Gyarados|Gyarados, L85, F|100/100
+|turn|1
+|move|p1a: Garchomp|Dragon Claw|p2a: Gyarados
+|-damage|p2a: Gyarados|55/100
+|move|p2a: Gyarados|Waterfall|p1a: Garchomp
+|-damage|p1a: Garchomp|40/100
+|turn|2
+|move|p2a: Gyarados|Waterfall|p1a: Garchomp
+|-damage|p1a: Garchomp|0 fnt
+|faint|p1a: Garchomp
+|win|opponent"""
+
+
+def _recorded_events():
+    recorder = BattleEventRecorder()
+    recorder.record([line.split("|") for line in PROTOCOL.splitlines()])
+    events, started_at = recorder.pop("battle-gen9randombattle-1")
+    assert started_at is not None
+    return events
+
+
+def test_messages_become_compact_events():
+    assert parse_event(["", "switch", "p2a: Gyarados", "Gyarados, L85, F", "55/100 par"]) == (
+        "switch", "p2", "gyarados", 0.55
+    )
+    assert parse_event(["", "move", "p1a: Garchomp", "Dragon Claw", "p2a: Gyarados"]) == (
+        "move", "p1", "dragonclaw"
+    )
+    assert parse_event(["", "-damage", "p1a: Garchomp", "0 fnt"]) == ("hp", "p1", 0.0)
+    assert parse_event(["", "chat", "someone", "hi"]) is None
+
+
+def test_turns_and_labels_are_rebuilt_from_events():
+    turns = rebuild_turns(_recorded_events(), "p1")
+
+    assert [turn["turn"] for turn in turns] == [1, 2, 3]
+
+    first, second, last = turns
+    assert first["our_active"]["species"] == "garchomp"
+    assert first["opponent_active"]["hp"] == 1.0
+    assert first["our_move"] is None and first["opponent_move"] is None
+
+    # Turn 2 starts after turn 1's moves, which label it
+    assert second["our_move"] == {"id": "dragonclaw"}
+    assert second["opponent_move"] == {"id": "waterfall"}
+    assert second["opponent_active"]["hp"] == 0.55
+    assert second["opponent_active"]["moves"] == {"waterfall": {"id": "waterfall"}}
+    assert second["our_hp"] == {"garchomp": 0.4}
+
+    # The win closes the last turn so its moves still label a state
+    assert last["our_move"] is None
+    assert last["opponent_move"] == {"id": "waterfall"}
+    assert last["our_hp"] == {"garchomp": 0.0}
+
+
+def test_opponent_side_is_resolved_from_the_player_role():
+    turns = rebuild_turns(_recorded_events(), "p2")
+
+    assert turns[1]["our_active"]["species"] == "gyarados"
+    assert turns[1]["our_move"] == {"id": "waterfall"}
+    assert turns[1]["opponent_active"]["moves"] == {"dragonclaw": {"id": "dragonclaw"}}
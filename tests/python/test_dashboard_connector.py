@@ -0,0 +1,54 @@
+import json
+import socket
+import threading
+import time
+
+from dashboard_connector import DashboardConnector
+
+
+def _listener():
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen()
+    return server, server.getsockname()[1]
+
+
+def test_states_arrive_as_newline_framed_json(make_snapshot):
+    server, port = _listener()
+    received = []
+
+    def serve():
+        conn, _ = server.accept()
+        with conn, conn.makefile() as lines:
+            received.extend(json.loads(line) for line in lines)
+
+    reader = threading.Thread(target=serve)
+    reader.start()
+    connector = DashboardConnector(port=port)
+    for _ in range(3):
+        connector.send_battle_state(make_snapshot(), {"earthquake": {"waterfall": 0.5}}, {"earthquake": 1.0})
+    connector.close()
+    reader.join(5)
+    server.close()
+
+    assert len(received) == 3
+    assert received[0]["battle_tag"] == "battle-test-1"
+    assert received[0]["active_pokemon"]["self"]["types"] == ["DRAGON", "GROUND"]
+    assert received[0]["active_pokemon"]["self"]["moves"][0]["category"] == "PHYSICAL"
+
+
+def test_stalled_dashboard_does_not_block_the_sender(make_snapshot):
+    # The listener accepts but never reads, so the socket buffers fill up
+    server, port = _listener()
+    connector = DashboardConnector(port=port)
+    payoff_matrix = {f"move{i}": {f"reply{j}": 0.0 for j in range(50)} for i in range(50)}
+
+    started = time.monotonic()
+    for _ in range(2 * DashboardConnector.MAX_QUEUED):
+        connector.send_battle_state(make_snapshot(), payoff_matrix, {})
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 2.0
+    assert connector.dropped > 0
+    server.close()
+    connector.close()
@@ -0,0 +1,67 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+# The worker pipeline solves with the native module (build_cpp.sh)
+pytest.importorskip("nash_solver", exc_type=ImportError)
+
+from anytime_decision import AnytimeDecider
+from decision_executor import DecisionExecutor
+
+
+class _CountingDecider:
+    """Stands in for AnytimeDecider and records how many decisions overlap."""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def decide(self, battle, deadline=None):
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(self.delay)
+        with self._lock:
+            self.running -= 1
+        return {}, {"earthquake": 1.0}, "full"
+
+
+def _decide_all(executor, snapshots):
+    async def run():
+        return await asyncio.gather(*(executor.decide(snapshot) for snapshot in snapshots))
+    try:
+        return asyncio.run(run())
+    finally:
+        executor.shutdown()
+
+
+def test_thread_pool_runs_the_shared_decider(make_snapshot):
+    decider = _CountingDecider(delay=0.0)
+
+    results = _decide_all(DecisionExecutor(mode="thread", decider=decider), [make_snapshot()])
+
+    assert results == [({}, {"earthquake": 1.0}, "full")]
+
+
+def test_process_pool_solves_snapshots_in_workers(make_snapshot):
+    snapshots = [make_snapshot(f"battle-test-{i}") for i in range(3)]
+
+    results = _decide_all(DecisionExecutor(mode="process", max_workers=2), snapshots)
+
+    for payoff_matrix, move_probabilities, tier in results:
+        assert tier in AnytimeDecider.TIERS
+        assert set(move_probabilities) == {"earthquake", "dragonclaw"}
+        assert sum(move_probabilities.values()) == pytest.approx(1.0)
+
+
+def test_max_in_flight_bounds_concurrent_decisions(make_snapshot):
+    decider = _CountingDecider()
+    executor = DecisionExecutor(mode="thread", max_workers=8, max_in_flight=2, decider=decider)
+
+    _decide_all(executor, [make_snapshot(f"battle-test-{i}") for i in range(6)])
+
+    assert decider.peak == 2
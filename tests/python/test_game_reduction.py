@@ -0,0 +1,66 @@
+import pytest
+
+# The native module must be built for this platform (build_cpp.sh)
+nash_solver = pytest.importorskip("nash_solver", exc_type=ImportError)
+
+MATCHING_PENNIES = [[1, -1], [-1, 1]]
+
+
+def test_duplicate_rows_share_their_probability():
+    solution = nash_solver.solve_zero_sum_game_reduced([[1, -1], [1, -1], [-1, 1]])
+
+    assert (solution.original_rows, solution.reduced_rows) == (3, 2)
+    assert solution.strategy[0] == pytest.approx(solution.strategy[1])
+    assert solution.strategy[0] + solution.strategy[1] == pytest.approx(0.5, abs=0.05)
+    assert solution.strategy[2] == pytest.approx(0.5, abs=0.05)
+
+
+def test_duplicate_columns_are_merged():
+    solution = nash_solver.solve_zero_sum_game_reduced([[1, -1, -1], [-1, 1, 1]])
+
+    assert (solution.original_cols, solution.reduced_cols) == (3, 2)
+    assert solution.strategy == pytest.approx([0.5, 0.5], abs=0.05)
+
+
+def test_dominated_rows_get_zero_probability():
+    solution = nash_solver.solve_zero_sum_game_reduced(MATCHING_PENNIES + [[-2, -2]])
+
+    assert solution.reduced_rows == 2
+    assert solution.strategy[2] == 0.0
+    assert solution.strategy[:2] == pytest.approx([0.5, 0.5], abs=0.05)
+
+
+def test_strict_dominance_keeps_weakly_dominated_rows():
+    # Row 1 ties row 0 against column 0, so it is only weakly dominated
+    matrix = [[2, 0], [2, -1], [0, 2]]
+
+    assert nash_solver.solve_zero_sum_game_reduced(matrix).reduced_rows == 2
+    assert nash_solver.solve_zero_sum_game_reduced(matrix, weak=False).reduced_rows == 3
+
+
+def test_iterated_elimination_expands_to_original_rows():
+    # Column 2 is dominated for the minimiser; then row 1 is dominated, and
+    # column 0 is the opponent's only reply left to row 0
+    matrix = [[2, 1, 3], [0, 0, 4], [1, 2, 5]]
+    solution = nash_solver.solve_zero_sum_game_reduced(matrix)
+
+    assert len(solution.strategy) == 3
+    assert sum(solution.strategy) == pytest.approx(1.0)
+    assert solution.strategy[1] == 0.0
+    assert solution.reduced_cols < 3
+
+
+def test_game_reduced_to_one_row_is_converged_without_budget():
+    solution = nash_solver.solve_zero_sum_game_reduced([[3, 1], [2, 0]], 0.0)
+
+    assert (solution.reduced_rows, solution.reduced_cols) == (1, 1)
+    assert solution.strategy == [1.0, 0.0]
+    assert solution.converged
+
+
+def test_reduced_solution_matches_full_solve():
+    full = nash_solver.solve_zero_sum_game([[3, 0], [0, 1]])
+    reduced = nash_solver.solve_zero_sum_game_reduced([[3, 0], [0, 1]])
+
+    assert reduced.strategy == pytest.approx(full)
+    assert reduced.strategy == pytest.approx([0.25, 0.75], abs=0.02)
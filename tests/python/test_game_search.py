@@ -0,0 +1,67 @@
+import pytest
+
+# Node games are solved with the native module (build_cpp.sh)
+pytest.importorskip("nash_solver", exc_type=ImportError)
+
+from battle_snapshot import BattleSnapshot, MoveSnapshot, PokemonSnapshot
+from game_search import WIN_VALUE, GameTree
+
+# HP fraction each move takes off, before accuracy and crits
+DAMAGE = {"strong": 0.6, "weak": 0.2, "hit": 0.35}
+
+
+class _FixedDamageTable:
+    def lookup(self, move, attacker, attacker_side, defender, defender_side):
+        return DAMAGE[move.id], 1.0
+
+
+class _FixedBuilder:
+    """Just what GameTree reads from a PayoffMatrixBuilder, with fixed damage."""
+
+    KO_WEIGHT = 0.3
+
+    def damage_table(self, battle):
+        return _FixedDamageTable()
+
+    def likely_moves(self, pokemon):
+        return []
+
+    def _stat(self, pokemon, stat, default):
+        return pokemon.stats.get(stat, default)
+
+
+def _tree(our_speed, our_hp, their_hp):
+    moves = {move_id: MoveSnapshot(move_id, base_power=80) for move_id in ("strong", "weak")}
+    ours = PokemonSnapshot("garchomp", stats={"spe": our_speed}, current_hp_fraction=our_hp, moves=moves)
+    hit = MoveSnapshot("hit", base_power=80)
+    theirs = PokemonSnapshot("gyarados", stats={"spe": 100}, current_hp_fraction=their_hp, moves={"hit": hit})
+    # The rest of their team is revealed and fainted, so a KO ends the battle
+    opponent_team = {"gyarados": theirs}
+    opponent_team.update({f"fainted{i}": PokemonSnapshot(f"fainted{i}", fainted=True) for i in range(5)})
+    battle = BattleSnapshot("battle-test-1", active_pokemon=ours, opponent_active_pokemon=theirs,
+                            available_moves=list(moves.values()), opponent_team=opponent_team)
+    return GameTree(_FixedBuilder(), battle, [("hit", hit, 1.0)])
+
+
+@pytest.mark.parametrize("depth", [1, 2, 3])
+def test_faster_side_takes_the_ko_before_being_ko_ed(depth):
+    # Weak leaves them alive, and their hit then knocks out our last pokemon
+    payoff_matrix, move_probabilities = _tree(our_speed=150, our_hp=0.3, their_hp=0.5).solve_root(depth)
+
+    assert payoff_matrix == {"strong": {"hit": WIN_VALUE}, "weak": {"hit": -WIN_VALUE}}
+    assert move_probabilities == {"strong": 1.0, "weak": 0.0}
+
+
+def test_slower_last_pokemon_loses_whatever_it_does():
+    payoff_matrix, _ = _tree(our_speed=50, our_hp=0.3, their_hp=1.0).solve_root(2)
+
+    assert payoff_matrix == {"strong": {"hit": -WIN_VALUE}, "weak": {"hit": -WIN_VALUE}}
+
+
+def test_one_turn_value_is_the_hp_balance():
+    tree = _tree(our_speed=150, our_hp=1.0, their_hp=1.0)
+
+    payoff_matrix, _ = tree.solve_root(1)
+
+    # With crits folded in, strong takes off 61 percent and hit 36
+    assert payoff_matrix["strong"]["hit"] == pytest.approx((64 - 39) / 100.0)
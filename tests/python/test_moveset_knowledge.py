@@ -0,0 +1,13 @@
+from moveset_knowledge import MovesetKnowledge
+
+
+def test_reload_if_changed_picks_up_other_writers(tmp_path):
+    db_path = str(tmp_path / "knowledge.sqlite")
+    writer = MovesetKnowledge(db_path)
+    reader = MovesetKnowledge(db_path)
+
+    writer.record_sets([("garchomp", ["earthquake"], None, None)])
+
+    assert reader.reload_if_changed()
+    assert reader.frequencies("garchomp") == {"earthquake": 1.0}
+    assert not reader.reload_if_changed()
@@ -0,0 +1,48 @@
+import pytest
+from poke_env.environment.move import Move
+from poke_env.environment.pokemon_type import PokemonType
+
+from battle_snapshot import MoveSnapshot, PokemonSnapshot
+from opponent_model import OpponentModel
+
+GARCHOMP_MOVES = ("earthquake", "dragonclaw", "swordsdance")
+
+
+class _Pairs:
+    """Stands in for BattleCatalog, returning fixed training pairs."""
+
+    def __init__(self, pairs):
+        self.pairs = pairs
+
+    def training_pairs(self, **filters):
+        return self.pairs
+
+
+def _turn(species, hp, opponent_move=None):
+    return {
+        "weather": "",
+        "our_active": {"species": "gyarados", "types": ["water", "flying"], "hp": 1.0},
+        "opponent_active": {"species": species, "types": ["dragon", "ground"], "hp": hp},
+        "opponent_move": {"id": opponent_move} if opponent_move else None,
+    }
+
+
+def test_species_shard_predicts_moves_not_revealed_yet(tmp_path, make_snapshot):
+    pairs = [
+        ("gen9randombattle", _turn("garchomp", 1.0 - i / 60), _turn("garchomp", 1.0, GARCHOMP_MOVES[i % 3]))
+        for i in range(60)
+    ]
+    model = OpponentModel(model_dir=str(tmp_path / "opponent"))
+    assert model.train(catalog=_Pairs(pairs), workers=1)
+
+    battle = make_snapshot()
+    battle.opponent_active_pokemon = PokemonSnapshot(
+        "garchomp", types=(PokemonType.DRAGON, PokemonType.GROUND), current_hp_fraction=0.5,
+        moves={"earthquake": MoveSnapshot.from_move(Move("earthquake", gen=9))}
+    )
+    move_probs = model.predict_moves(battle)
+
+    assert model._select_model(battle) is model._get_model(("species", "garchomp"))
+    assert set(move_probs) == set(GARCHOMP_MOVES)
+    assert move_probs["dragonclaw"] > 0 and move_probs["swordsdance"] > 0
+    assert sum(move_probs.values()) == pytest.approx(1.0)
@@ -0,0 +1,30 @@
+import pytest
+
+from battle_snapshot import PokemonSnapshot
+from moveset_knowledge import MovesetKnowledge
+from payoff_builder import PayoffMatrixBuilder
+
+
+@pytest.fixture
+def builder(tmp_path):
+    knowledge = MovesetKnowledge(str(tmp_path / "knowledge.sqlite"))
+    knowledge.record_sets([
+        ("garchomp", ["earthquake", "dragonclaw"], None, None),
+        ("garchomp", ["earthquake", "stoneedge"], None, None),
+    ])
+    return PayoffMatrixBuilder(knowledge=knowledge)
+
+
+def test_model_predictions_are_weighted_by_moveset_frequency(builder):
+    pokemon = PokemonSnapshot("garchomp")
+    predicted = {"earthquake": 0.25, "dragonclaw": 0.25, "surf": 0.5}
+
+    assert builder.reweight_by_moveset(pokemon, predicted) == pytest.approx(
+        {"earthquake": 2 / 3, "dragonclaw": 1 / 3}
+    )
+
+
+def test_predictions_for_unseen_species_are_kept(builder):
+    predicted = {"surf": 0.6, "icebeam": 0.4}
+
+    assert builder.reweight_by_moveset(PokemonSnapshot("lapras"), predicted) == predicted
@@ -0,0 +1,22 @@
+import pytest
+
+from stat_table import get_stat_table
+
+
+@pytest.mark.parametrize("stat, level, value", [
+    # Garchomp: 108 HP, 130 Atk, 102 Spe; 31 IVs, 84 EVs, neutral nature
+    ("hp", 100, 378),
+    ("atk", 100, 317),
+    ("hp", 80, 304),
+    ("spe", 80, 209),
+])
+def test_random_battle_stat_estimate(stat, level, value):
+    assert get_stat_table().lookup("garchomp", stat, level) == value
+
+
+def test_unknown_species_has_no_estimate():
+    assert get_stat_table().lookup("notapokemon", "atk", 100) is None
+
+
+def test_table_is_built_once_per_generation():
+    assert get_stat_table(9) is get_stat_table(9)
@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+from poke_env.environment.move import Move
+
+from battle_snapshot import MoveSnapshot
+from stochastic_damage import StochasticDamageModel, crit_chance
+
+
+@pytest.mark.parametrize("move_id, chance", [
+    ("tackle", 1 / 24),
+    ("slash", 1 / 8),
+    ("stoneedge", 1 / 8),
+    ("frostbreath", 1.0),
+])
+def test_crit_chance_follows_showdown_crit_ratio(move_id, chance):
+    move = Move(move_id, gen=9)
+
+    assert crit_chance(move) == pytest.approx(chance)
+    assert crit_chance(MoveSnapshot.from_move(move)) == pytest.approx(chance)
+
+
+def test_always_crit_move_deals_boosted_rolls():
+    distribution = StochasticDamageModel().evaluate(0.4, 1.0, crit_chance(Move("frostbreath", gen=9)), 1.0)
+
+    assert distribution.expected == pytest.approx(0.4 * 1.5 * np.mean(np.arange(85, 101) / 100.0))